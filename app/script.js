@@ -17,6 +17,7 @@ const modalOverlay = document.getElementById('modalOverlay');
 const closeModal = document.getElementById('closeModal');
 const closeModalBtn = document.getElementById('closeModalBtn');
 const downloadBtn = document.getElementById('downloadBtn');
+const uploadHint = document.getElementById('uploadHint');
 
 // Tabs
 const tabButtons = document.querySelectorAll('.tab-button');
@@ -25,6 +26,9 @@ const tabContents = document.querySelectorAll('.tab-content');
 // Configuração da API
 const API_BASE_URL = window.location.origin;
 
+// Extensões aceitas no upload, informadas pela API (vazia = validação apenas no servidor)
+let allowedExtensions = [];
+
 // Inicialização
 document.addEventListener('DOMContentLoaded', () => {
     setupTabs();
@@ -32,8 +36,31 @@ document.addEventListener('DOMContentLoaded', () => {
     setupTextInput();
     setupEvaluateButton();
     setupModal();
+    loadAllowedExtensions();
 });
 
+// Carrega as extensões aceitas pelo servidor
+async function loadAllowedExtensions() {
+    try {
+        const response = await fetch(`${API_BASE_URL}/api/evaluation/health`);
+        if (!response.ok) return;
+        const health = await response.json();
+        allowedExtensions = health.allowed_extensions || [];
+    } catch (error) {
+        console.warn('Não foi possível obter as extensões aceitas:', error);
+        return;
+    }
+
+    if (allowedExtensions.length > 0) {
+        fileInput.accept = allowedExtensions.join(',');
+        uploadHint.textContent = `${formatExtensions(allowedExtensions)} (máximo 10MB)`;
+    }
+}
+
+function formatExtensions(extensions) {
+    return extensions.map(ext => ext.replace('.', '').toUpperCase()).join(', ');
+}
+
 // Configuração das tabs
 function setupTabs() {
     tabButtons.forEach(button => {
@@ -108,12 +135,11 @@ function handleFileSelect(file) {
     if (!file) return;
     
     // Valida extensão
-    const allowedExtensions = ['.pdf', '.docx', '.txt'];
     const fileName = file.name.toLowerCase();
-    const isValid = allowedExtensions.some(ext => fileName.endsWith(ext));
+    const isValid = allowedExtensions.length === 0 || allowedExtensions.some(ext => fileName.endsWith(ext));
     
     if (!isValid) {
-        showError('Tipo de arquivo não permitido. Use PDF, DOCX ou TXT.');
+        showError(`Tipo de arquivo não permitido. Use ${formatExtensions(allowedExtensions)}.`);
         return;
     }
     
@@ -0,0 +1,198 @@
+"""
+Build dos assets estáticos: nomes com impressão digital, variantes gzip/Brotli e páginas reescritas
+
+Copia cada arquivo de `static/` (exceto HTML) para STATIC_BUILD_DIR com o hash do
+conteúdo no nome, reescreve as referências absolutas `/static/...` em CSS, JS e nas
+páginas servidas em `/`, `/home` e `/app`, e grava versões pré-comprimidas dos
+arquivos de texto (gzip nível 9 e, se o módulo `brotli` estiver instalado, Brotli
+qualidade 11). O servidor lê o `manifest.json` gerado na inicialização (ver
+`backend/utils/static_assets.py`); `python -m backend.serve` executa o build
+automaticamente quando os assets mudaram.
+
+Arquivos com impressão digital de builds anteriores são mantidos (clientes com a
+página antiga ainda os pedem); use `--clean` para recomeçar do zero.
+
+Uso:
+    python -m backend.build_assets [--clean]
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import time
+from typing import Dict, List
+from backend.config import settings
+from backend.utils.static_assets import (
+    ENCODINGS,
+    MANIFEST_FILE,
+    MANIFEST_VERSION,
+    content_hash,
+    fingerprinted_name,
+    iter_files
+)
+
+try:
+    import brotli  # requer: pip install brotli
+except ImportError:
+    brotli = None
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+
+# Páginas servidas pela aplicação (caminhos relativos a BASE_DIR), por rota
+PAGES = {
+    "/": "static/landing/index.html",
+    "/home": "static/home/index.html",
+    "/app": "app/index.html"
+}
+
+# Extensões cujas referências a `/static/...` são reescritas e que recebem variantes comprimidas
+TEXT_EXTENSIONS = {".css", ".js", ".html", ".svg", ".json", ".txt", ".xml", ".map"}
+# Ordem do build: um arquivo só pode referenciar os que já têm impressão digital
+BUILD_ORDER = {".css": 1, ".js": 2}
+
+# Variantes só são mantidas se economizarem pelo menos 5%
+MIN_COMPRESSION_RATIO = 0.95
+
+_REFERENCE = re.compile(r"/static/([A-Za-z0-9_./-]+)")
+
+
+def _rewrite(data: bytes, fingerprinted: Dict[str, str]) -> bytes:
+    """Troca `/static/<original>` por `/static/<nome com impressão digital>`"""
+    def replace(match: re.Match) -> str:
+        target = fingerprinted.get(match.group(1))
+        return f"/static/{target}" if target else match.group(0)
+    return _REFERENCE.sub(replace, data.decode("utf-8")).encode("utf-8")
+
+
+def _write(path: str, data: bytes):
+    """Grava um arquivo de forma atômica"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _emit(build_dir: str, relative: str, data: bytes, digest: str) -> Dict:
+    """
+    Grava o arquivo e suas variantes comprimidas no diretório do build
+
+    Returns:
+        Dict: Entrada do manifesto (arquivo, hash, tamanho e codificações disponíveis)
+    """
+    path = os.path.join(build_dir, relative)
+    _write(path, data)
+    entry = {"file": relative, "hash": digest, "size": len(data), "encodings": []}
+
+    if os.path.splitext(relative)[1].lower() not in TEXT_EXTENSIONS:
+        return entry
+    for encoding, suffix in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        compressed = _compress(data, encoding)
+        if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+            _write(path + suffix, compressed)
+            entry["encodings"].append(encoding)
+    return entry
+
+
+def build(build_dir: str = None, clean: bool = False) -> Dict:
+    """
+    Gera o build dos assets estáticos e grava o manifesto
+
+    Args:
+        build_dir: Diretório de saída (padrão: STATIC_BUILD_DIR)
+        clean: Remove o build anterior antes de gerar
+
+    Returns:
+        Dict: Manifesto gerado
+    """
+    build_dir = os.path.join(BASE_DIR, build_dir or settings.static_build_dir)
+    if clean and os.path.isdir(build_dir):
+        shutil.rmtree(build_dir)
+    if brotli is None:
+        print("Aviso: Módulo brotli não instalado; gerando apenas variantes gzip (pip install brotli)")
+
+    sources: List[str] = [
+        relative for relative in iter_files(STATIC_DIR)
+        if not relative.endswith(".html")
+    ]
+    sources.sort(key=lambda relative: BUILD_ORDER.get(os.path.splitext(relative)[1].lower(), 0))
+
+    fingerprinted: Dict[str, str] = {}
+    assets: Dict[str, Dict] = {}
+    for relative in sources:
+        with open(os.path.join(STATIC_DIR, relative), "rb") as file:
+            data = file.read()
+        if os.path.splitext(relative)[1].lower() in TEXT_EXTENSIONS:
+            data = _rewrite(data, fingerprinted)
+        digest = content_hash(data)
+        fingerprinted[relative] = fingerprinted_name(relative, digest)
+        assets[relative] = _emit(build_dir, fingerprinted[relative], data, digest)
+
+    pages: Dict[str, Dict] = {}
+    for page in PAGES.values():
+        source = os.path.join(BASE_DIR, page)
+        if not os.path.isfile(source):
+            print(f"Aviso: Página não encontrada: {page}")
+            continue
+        with open(source, "rb") as file:
+            data = _rewrite(file.read(), fingerprinted)
+        pages[page] = _emit(build_dir, f"pages/{page}", data, content_hash(data))
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "built_at": time.time(),
+        "assets": assets,
+        "pages": pages
+    }
+    _write(os.path.join(build_dir, MANIFEST_FILE), json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def is_stale(build_dir: str = None) -> bool:
+    """Indica se o build não existe ou é mais antigo que algum asset ou página de origem"""
+    path = os.path.join(BASE_DIR, build_dir or settings.static_build_dir, MANIFEST_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return True
+    if manifest.get("version") != MANIFEST_VERSION:
+        return True
+    sources = [os.path.join(STATIC_DIR, relative) for relative in iter_files(STATIC_DIR)]
+    sources += [os.path.join(BASE_DIR, page) for page in PAGES.values()]
+    built_at = manifest.get("built_at", 0)
+    return any(os.path.getmtime(source) > built_at for source in sources if os.path.isfile(source))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clean", action="store_true", help="Remove o build anterior antes de gerar")
+    args = parser.parse_args()
+
+    manifest = build(clean=args.clean)
+    original = sum(entry["size"] for entry in list(manifest["assets"].values()) + list(manifest["pages"].values()))
+    print(f"{len(manifest['assets'])} asset(s) e {len(manifest['pages'])} página(s) em {settings.static_build_dir} "
+          f"({original / 1024:.0f} KB sem compressão)")
+    for relative, entry in list(manifest["assets"].items()) + list(manifest["pages"].items()):
+        variants = []
+        for encoding, suffix in ENCODINGS:
+            if encoding in entry["encodings"]:
+                size = os.path.getsize(os.path.join(BASE_DIR, settings.static_build_dir, entry["file"] + suffix))
+                variants.append(f"{encoding} {size / 1024:.1f} KB")
+        print(f"  {entry['file']:<48}{entry['size'] / 1024:>8.1f} KB  {', '.join(variants)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,18 @@ class Settings(BaseSettings):
     
     # Configurações de arquivo
     max_file_size_mb: int = 10
-    allowed_file_types: List[str] = [".pdf", ".docx", ".txt"]
+    upload_chunk_size_kb: int = 1024
+    # Uploads até este tamanho são extraídos em memória; maiores vão para um arquivo temporário (lido com mmap)
+    upload_spool_max_memory_mb: int = 4
+    # Subconjunto dos formatos com extrator registrado (vazio = todos: PDF, DOCX, TXT, ODT, RTF, HTML e Markdown)
+    allowed_file_types: List[str] = []
+
+    # Extração de texto em pool de processos (0 = executa em thread)
+    extraction_workers: int = 2
+    extraction_max_tasks_per_worker: int = 50
+    extraction_timeout_seconds: float = 60.0
+    pdf_parallel_min_pages: int = 40  # PDFs a partir deste tamanho são divididos entre os workers (0 = desativado)
+    pdf_min_pages_per_chunk: int = 10
    
     # CORS
     allowed_origins: str = "http://localhost:8000,http://127.0.0.1:8000,http://localhost:3000,http://127.0.0.1:3000"
@@ -23,9 +34,126 @@ class Settings(BaseSettings):
         """Converte string de origens em lista"""
         return [origin.strip() for origin in self.allowed_origins.split(',')]
 
+    # Normalização do texto extraído antes do envio ao modelo
+    normalize_remove_repeated_lines: bool = True
+    normalize_repeated_line_min_count: int = 3
+    normalize_remove_page_numbers: bool = True
+    normalize_page_edge_lines: int = 2  # linhas no início e no fim de cada página de PDF examinadas
+    normalize_join_hyphenation: bool = True
+    normalize_collapse_whitespace: bool = True
+    normalize_truncate_references: bool = False
+    normalize_references_max_chars: int = 4000
+
     # Perplexity API
     perplexity_api_url: str = "https://api.perplexity.ai/chat/completions"
     perplexity_model: str = "sonar"
+    perplexity_timeout_seconds: float = 120.0
+    # Destinos no formato "url|modelo", separados por vírgula (vazio = apenas a URL e o modelo acima)
+    perplexity_targets: str = ""
+
+    # Roteamento por latência e requisições de cobertura (hedging) entre destinos
+    hedging_enabled: bool = True
+    hedge_percentile: float = 0.9
+    hedge_min_samples: int = 10
+    hedge_default_delay_seconds: float = 30.0
+    hedge_min_delay_seconds: float = 1.0
+    routing_latency_window: int = 100
+
+    # Continuações solicitadas ao modelo quando a resposta JSON vem truncada
+    json_continuation_max_attempts: int = 2
+
+    # Controle de taxa, novas tentativas e circuit breaker das chamadas à API
+    upstream_rate_limit_per_second: float = 0.0  # 0 = sem limite
+    upstream_rate_limit_burst: int = 5
+    upstream_max_retries: int = 3
+    upstream_backoff_base_seconds: float = 1.0
+    upstream_backoff_max_seconds: float = 30.0
+    upstream_retry_after_max_seconds: float = 60.0
+    upstream_breaker_failure_threshold: int = 5  # 0 = desativado
+    upstream_breaker_recovery_seconds: float = 30.0
+
+    # Cliente HTTP compartilhado (pool de conexões)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 60.0
+    http_connect_timeout_seconds: float = 10.0
+    http2_enabled: bool = False
+    http_warmup_enabled: bool = False
+    http_warmup_connections: int = 2
+
+    # Avaliação por seções (map-reduce) para documentos longos
+    map_reduce_enabled: bool = True
+    map_reduce_threshold_chars: int = 200000
+    map_reduce_chunk_chars: int = 15000
+    map_reduce_concurrency: int = 4
+    map_reduce_section_max_tokens: int = 1200
+
+    # Reavaliação incremental de versões revisadas (índice MinHash/LSH de documentos avaliados)
+    revision_index_enabled: bool = True
+    revision_index_path: str = ".cache/revisions.jsonl"
+    revision_index_max_entries: int = 5000
+    revision_minhash_permutations: int = 128
+    revision_lsh_bands: int = 32
+    revision_shingle_words: int = 5
+    revision_similarity_threshold: float = 0.5
+    revision_max_changed_fraction: float = 0.6  # acima disso, a versão é avaliada do zero
+
+    # Triagem de originalidade (índice local de shingles de um corpus de referência)
+    originality_corpus_dir: str = ""  # vazio = usa apenas um índice já construído, se existir
+    originality_index_dir: str = ".cache/originality"
+    originality_shingle_words: int = 7
+    originality_min_passage_words: int = 12
+    originality_max_gap_words: int = 3
+    originality_max_passages: int = 20
+    originality_max_document_fraction: float = 0.2  # shingles mais frequentes no corpus são ignorados
+    originality_passage_max_chars: int = 600
+
+    # Cache de avaliações (memória + disco)
+    evaluation_cache_enabled: bool = True
+    evaluation_cache_max_entries: int = 256
+    evaluation_cache_ttl_seconds: int = 7 * 24 * 3600
+    evaluation_cache_dir: str = ".cache/evaluations"
+    evaluation_cache_max_disk_entries: int = 5000
+
+    # Cache de texto extraído (por hash SHA-256 do arquivo)
+    extraction_cache_enabled: bool = True
+    extraction_cache_max_entries: int = 128
+    extraction_cache_max_memory_mb: int = 64
+    extraction_cache_ttl_seconds: int = 30 * 24 * 3600
+    extraction_cache_dir: str = ".cache/extractions"
+    extraction_cache_max_disk_entries: int = 2000
+
+    # Avaliação em lote (ZIP ou múltiplos arquivos)
+    batch_max_files: int = 60
+    batch_max_upload_mb: int = 200
+    batch_concurrency: int = 4
+
+    # Avaliações assíncronas (jobs)
+    job_workers: int = 2
+    job_queue_max_size: int = 100
+    job_retention_seconds: int = 3600
+    job_store_backend: str = "memory"  # memory | sqlite | shared (usa o estado compartilhado abaixo)
+    job_store_path: str = ".cache/jobs.sqlite3"
+    job_heartbeat_seconds: float = 10.0  # jobs de workers sem sinal por 3x este tempo são marcados como falhos
+
+    # Estado compartilhado entre workers (cache de avaliações, limite de taxa e jobs)
+    shared_state_backend: str = "none"  # none | sqlite | shm | redis
+    shared_state_path: str = ""  # vazio = .cache/shared_state.sqlite3 (sqlite) ou /dev/shm (shm)
+    shared_state_redis_url: str = "redis://127.0.0.1:6379/0"
+    shared_state_key_prefix: str = "veritas:"
+
+    # Compressão das respostas da API (gzip; Brotli se o pacote brotli estiver instalado)
+    response_compression_enabled: bool = True
+    response_compression_min_bytes: int = 1024
+    response_compression_gzip_level: int = 6
+
+    # Assets estáticos com impressão digital e pré-comprimidos (python -m backend.build_assets)
+    static_build_dir: str = "build/static"
+
+    # Servidor de produção (python -m backend.serve)
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # 0 = um worker por núcleo de CPU
 
     class Config:
         env_file = ".env"
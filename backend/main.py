@@ -2,13 +2,34 @@
 Aplicação principal FastAPI - Veritas.AI
 Sistema de Avaliação de TCC com IA
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import Response
 import os
+from backend.build_assets import PAGES
 from backend.config import settings
 from backend.routes import evaluation
+from backend.services.perplexity_client import open_http_client, close_http_client
+from backend.utils.upload_limit import UploadSizeLimitMiddleware
+from backend.utils.compression import ResponseCompressionMiddleware
+from backend.utils import metrics
+from backend.utils.static_assets import StaticAssets
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicializa e libera recursos compartilhados do processo"""
+    await open_http_client()
+    evaluation.extraction_pool.start()
+    await evaluation.evaluator_service.open_originality_index()
+    await evaluation.job_manager.start()
+    try:
+        yield
+    finally:
+        await evaluation.job_manager.stop()
+        evaluation.extraction_pool.shutdown()
+        await close_http_client()
 
 
 # Cria aplicação FastAPI
@@ -17,10 +38,44 @@ app = FastAPI(
     description="Sistema de Avaliação de TCC com IA - Banca Avaliadora Virtual",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
-# Configuração CORS
+# Comprime respostas JSON acima do tamanho mínimo (SSE e NDJSON são transmitidos sem compressão)
+if settings.response_compression_enabled:
+    app.add_middleware(
+        ResponseCompressionMiddleware,
+        minimum_size=settings.response_compression_min_bytes,
+        gzip_level=settings.response_compression_gzip_level,
+        excluded_paths=["/api/evaluation/stream", "/api/evaluation/batch"]
+    )
+
+# Rejeita uploads acima do limite antes de consumir o corpo da requisição
+# (folga para os cabeçalhos do multipart)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/evaluation/file": settings.max_file_size_mb * 1024 * 1024 + 64 * 1024,
+        "/api/evaluation/jobs/file": settings.max_file_size_mb * 1024 * 1024 + 64 * 1024,
+        "/api/evaluation/batch": settings.batch_max_upload_mb * 1024 * 1024
+    }
+)
+
+# Mede a duração total das requisições de avaliação
+app.add_middleware(
+    metrics.RequestTimingMiddleware,
+    endpoints={
+        "/api/evaluation/text": "text",
+        "/api/evaluation/stream": "stream",
+        "/api/evaluation/file": "file",
+        "/api/evaluation/batch": "batch"
+    }
+)
+
+# Configuração CORS (registrada por último: o middleware mais externo, de modo que
+# as respostas geradas pelos demais middlewares, como o 413 do limite de upload,
+# também recebem os cabeçalhos CORS)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins_list,
@@ -35,37 +90,50 @@ app.include_router(evaluation.router)
 # Paths dos diretórios
 base_path = os.path.dirname(os.path.dirname(__file__))
 static_path = os.path.join(base_path, "static")
-app_path = os.path.join(base_path, "app")
 
-# Serve arquivos estáticos
-if os.path.exists(static_path):
-    app.mount("/static", StaticFiles(directory=static_path), name="static")
+# Assets estáticos e páginas indexados em memória na importação (arquivos de origem são reindexados quando mudam)
+static_assets = StaticAssets(
+    static_dir=static_path,
+    build_dir=os.path.join(base_path, settings.static_build_dir),
+    pages=PAGES,
+    base_dir=base_path
+)
+static_assets.load()
+
 
+@app.api_route("/static/{asset_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_static(asset_path: str, request: Request):
+    """Serve arquivos estáticos (com impressão digital: cache imutável; demais: revalidação)"""
+    asset = await static_assets.aasset(f"/static/{asset_path}")
+    if asset is None:
+        return Response(status_code=404)
+    return static_assets.respond(request, asset)
 
-@app.get("/")
-async def serve_landing():
+
+@app.api_route("/", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_landing(request: Request):
     """Serve a landing page principal"""
-    landing_index = os.path.join(static_path, "landing", "index.html")
-    if os.path.exists(landing_index):
-        return FileResponse(landing_index)
+    page = await static_assets.apage("/")
+    if page is not None:
+        return static_assets.respond(request, page)
     return {"message": "Landing page não encontrada"}
 
 
-@app.get("/home")
-async def serve_home():
+@app.api_route("/home", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_home(request: Request):
     """Serve a página intermediária com opções"""
-    home_index = os.path.join(static_path, "home", "index.html")
-    if os.path.exists(home_index):
-        return FileResponse(home_index)
+    page = await static_assets.apage("/home")
+    if page is not None:
+        return static_assets.respond(request, page)
     return {"message": "Página home não encontrada"}
 
 
-@app.get("/app")
-async def serve_app():
+@app.api_route("/app", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_app(request: Request):
     """Serve a aplicação de avaliação"""
-    app_index = os.path.join(app_path, "index.html")
-    if os.path.exists(app_index):
-        return FileResponse(app_index)
+    page = await static_assets.apage("/app")
+    if page is not None:
+        return static_assets.respond(request, page)
     return {"message": "Aplicação não encontrada"}
 
 
@@ -82,13 +150,27 @@ async def root():
             "app": "/app",
             "health": "/api/evaluation/health",
             "evaluate_text": "/api/evaluation/text",
+            "evaluate_text_stream": "/api/evaluation/stream",
             "evaluate_file": "/api/evaluation/file",
+            "evaluate_batch": "/api/evaluation/batch",
+            "submit_text_job": "/api/evaluation/jobs/text",
+            "submit_file_job": "/api/evaluation/jobs/file",
+            "job_status": "/api/evaluation/jobs/{job_id}",
+            "upstream_stats": "/api/evaluation/upstream/stats",
+            "metrics": "/metrics",
             "docs": "/api/docs"
         }
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Expõe as métricas da aplicação no formato do Prometheus"""
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 if __name__ == "__main__":
+    # Desenvolvimento (um processo, recarga automática); em produção use `python -m backend.serve`
     import uvicorn
     uvicorn.run(
         "backend.main:app",
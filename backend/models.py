@@ -1,13 +1,15 @@
 """
 Modelos de dados para a aplicação Veritas.AI
 """
+from enum import Enum
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class TextEvaluationRequest(BaseModel):
     """Requisição de avaliação de texto direto"""
     text: str = Field(..., min_length=100, description="Texto do TCC a ser avaliado")
+    force_refresh: bool = Field(default=False, description="Ignora o cache e força uma nova avaliação")
 
 
 class EvaluatorResponse(BaseModel):
@@ -24,6 +26,14 @@ class FinalVerdict(BaseModel):
     recommendations: str = Field(..., description="Recomendações de melhoria")
 
 
+class RevisionInfo(BaseModel):
+    """Reaproveitamento da avaliação de uma versão anterior do mesmo TCC"""
+    previous_id: str = Field(..., description="Identificador da versão anterior")
+    similarity: float = Field(..., description="Similaridade estimada com a versão anterior (Jaccard, 0-1)")
+    reused_sections: List[str] = Field(default_factory=list, description="Seções inalteradas cujas análises foram reaproveitadas")
+    reevaluated_sections: List[str] = Field(default_factory=list, description="Seções alteradas ou novas enviadas ao modelo")
+
+
 class EvaluationResponse(BaseModel):
     """Resposta completa da avaliação"""
     evaluator_1: EvaluatorResponse = Field(..., description="Avaliador de Metodologia")
@@ -32,6 +42,27 @@ class EvaluationResponse(BaseModel):
     final_verdict: FinalVerdict = Field(..., description="Parecer final da banca")
     success: bool = Field(default=True, description="Status da avaliação")
     message: Optional[str] = Field(default=None, description="Mensagem adicional")
+    cached: bool = Field(default=False, description="Indica se a avaliação foi recuperada do cache")
+    processing: Optional[Dict[str, float]] = Field(default=None, description="Métricas de processamento do arquivo")
+    revision: Optional[RevisionInfo] = Field(default=None, description="Reavaliação incremental de uma versão revisada")
+
+
+class BatchItemResult(BaseModel):
+    """Resultado da avaliação de um documento de um lote"""
+    index: int = Field(..., description="Posição do documento no lote")
+    filename: str = Field(..., description="Nome do documento")
+    success: bool = Field(..., description="Indica se o documento foi avaliado com sucesso")
+    evaluation: Optional[EvaluationResponse] = Field(default=None, description="Avaliação do documento")
+    error: Optional[str] = Field(default=None, description="Mensagem de erro, se a avaliação falhou")
+    elapsed_seconds: float = Field(..., description="Tempo de processamento do documento")
+
+
+class BatchSummary(BaseModel):
+    """Resumo final de uma avaliação em lote"""
+    total: int = Field(..., description="Número de documentos no lote")
+    succeeded: int = Field(..., description="Documentos avaliados com sucesso")
+    failed: int = Field(..., description="Documentos com falha")
+    elapsed_seconds: float = Field(..., description="Tempo total do lote")
 
 
 class ErrorResponse(BaseModel):
@@ -40,3 +71,23 @@ class ErrorResponse(BaseModel):
     message: str = Field(..., description="Mensagem de erro")
     detail: Optional[str] = Field(default=None, description="Detalhes do erro")
 
+
+
+class JobStatus(str, Enum):
+    """Estados de um job de avaliação assíncrona"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobStatusResponse(BaseModel):
+    """Estado de um job de avaliação assíncrona"""
+    job_id: str = Field(..., description="Identificador do job")
+    status: JobStatus = Field(..., description="Estado atual do job")
+    queue_position: Optional[int] = Field(default=None, description="Posição na fila (apenas para jobs na fila)")
+    created_at: float = Field(..., description="Momento de criação (timestamp Unix)")
+    started_at: Optional[float] = Field(default=None, description="Início da execução (timestamp Unix)")
+    finished_at: Optional[float] = Field(default=None, description="Término da execução (timestamp Unix)")
+    error: Optional[str] = Field(default=None, description="Mensagem de erro, se o job falhou")
+    result: Optional[EvaluationResponse] = Field(default=None, description="Avaliação concluída")
@@ -1,27 +1,186 @@
 """
 Rotas para avaliação de TCC
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from fastapi.responses import JSONResponse
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from backend.models import (
     TextEvaluationRequest,
     EvaluationResponse,
-    ErrorResponse
+    ErrorResponse,
+    BatchItemResult,
+    BatchSummary,
+    JobStatus,
+    JobStatusResponse
 )
+from backend.services.cache import TieredCache, build_extraction_cache_key
 from backend.services.evaluator import EvaluatorService
+from backend.services.extraction_pool import ExtractionPool, ExtractionTimeoutError
 from backend.services.file_processor import FileProcessor
+from backend.services.text_normalizer import TextNormalizer
+from backend.services.jobs import JobManager, JobQueueFullError, create_job_store
+from backend.services.resilience import UpstreamUnavailableError
+from backend.services.routing import get_target_router
+from backend.services.shared_state import get_shared_state
 from backend.utils.helpers import (
-    save_upload_file,
-    cleanup_temp_file,
-    validate_file_size,
-    format_file_size
+    FileTooLargeError,
+    ReceivedFile,
+    read_upload_file,
+    expand_zip_file,
+    release_file,
+    format_sse_event,
+    hash_source
 )
+from backend.utils.metrics import QUEUE_DEPTH, STAGE_DURATION, observe_stage
+from backend.utils.responses import FastJSONResponse, dump_json
 from backend.config import settings
 
 
-router = APIRouter(prefix="/api/evaluation", tags=["Avaliação"])
+# Modelos retornados como `FastJSONResponse(modelo)` são serializados direto em bytes;
+# `response_model` segue documentando o esquema no OpenAPI
+router = APIRouter(prefix="/api/evaluation", tags=["Avaliação"], default_response_class=FastJSONResponse)
 evaluator_service = EvaluatorService()
 file_processor = FileProcessor()
+extraction_pool = ExtractionPool(
+    workers=settings.extraction_workers,
+    max_tasks_per_worker=settings.extraction_max_tasks_per_worker,
+    timeout_seconds=settings.extraction_timeout_seconds
+)
+job_manager = JobManager(
+    create_job_store(),
+    workers=settings.job_workers,
+    max_queue_size=settings.job_queue_max_size,
+    retention_seconds=settings.job_retention_seconds,
+    heartbeat_seconds=settings.job_heartbeat_seconds
+)
+extraction_cache = TieredCache(
+    max_entries=settings.extraction_cache_max_entries,
+    ttl_seconds=settings.extraction_cache_ttl_seconds,
+    directory=settings.extraction_cache_dir or None,
+    max_disk_entries=settings.extraction_cache_max_disk_entries,
+    max_memory_bytes=settings.extraction_cache_max_memory_mb * 1024 * 1024,
+    size_of=lambda value: len(value["text"]) * 2
+) if settings.extraction_cache_enabled else None
+
+# Profundidade das filas, calculada no momento da coleta das métricas
+QUEUE_DEPTH.set_function(lambda: job_manager.queue_depth, queue="jobs")
+QUEUE_DEPTH.set_function(lambda: extraction_pool.queue_depth, queue="extraction")
+
+
+def _validate_upload(file: UploadFile):
+    """
+    Valida o tipo de um arquivo enviado
+    
+    O tamanho é validado durante a leitura em blocos (`read_upload_file`) e, antes
+    disso, pelo `UploadSizeLimitMiddleware`.
+    
+    Args:
+        file: Arquivo enviado
+        
+    Raises:
+        HTTPException: Se o tipo não for permitido
+    """
+    # Valida tipo de arquivo
+    if not file_processor.is_allowed_file(file.filename):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de arquivo não permitido. Extensões aceitas: {', '.join(sorted(file_processor.ALLOWED_EXTENSIONS))}"
+        )
+
+
+def _observe_upload_spool(request: Request):
+    """Registra o tempo de recebimento e parsing do corpo multipart, anterior à rota"""
+    started_at = getattr(request.state, "request_started_at", None)
+    if started_at is not None:
+        STAGE_DURATION.observe(time.perf_counter() - started_at, stage="upload_spool")
+
+
+def _upstream_unavailable(error: UpstreamUnavailableError) -> HTTPException:
+    """Converte a indisponibilidade da API do modelo em HTTP 503 com `Retry-After`"""
+    headers = None
+    if error.retry_after is not None:
+        headers = {"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers=headers
+    )
+
+
+async def _extract_text(
+    source: Union[bytes, str],
+    filename: str,
+    sha256: Optional[str] = None
+) -> Tuple[str, str, Dict[str, float]]:
+    """
+    Extrai o texto de um arquivo, reaproveitando extrações anteriores do mesmo conteúdo
+    
+    Args:
+        source: Conteúdo em memória ou caminho do arquivo temporário
+        filename: Nome original do arquivo
+        sha256: Hash do conteúdo, se já calculado no upload
+        
+    Returns:
+        Tuple[str, str, Dict[str, float]]: (texto_extraído, tipo_arquivo, tempos)
+    """
+    cache_key = None
+    if extraction_cache is not None:
+        if sha256 is None:
+            sha256 = await asyncio.to_thread(hash_source, source)
+        cache_key = build_extraction_cache_key(sha256, filename)
+        cached = await extraction_cache.aget(cache_key)
+        if cached is not None:
+            return cached["text"], cached["file_type"], {"extraction_cache_hit": 1}
+    
+    # Processa arquivo e extrai texto (em processo separado)
+    text, file_type, timings = await extraction_pool.extract(source, filename)
+    STAGE_DURATION.observe(timings["extraction_queue_wait"], stage="extraction_queue_wait")
+    STAGE_DURATION.observe(timings["extraction_time"], stage="extraction")
+    
+    if cache_key is not None:
+        await extraction_cache.aset(cache_key, {"text": text, "file_type": file_type})
+        timings["extraction_cache_hit"] = 0
+    
+    return text, file_type, timings
+
+
+async def _evaluate_received_file(document: ReceivedFile, use_cache: bool = True) -> EvaluationResponse:
+    """
+    Extrai o texto de um arquivo recebido e realiza a avaliação
+    
+    Args:
+        document: Arquivo recebido (conteúdo ou arquivo temporário, nome, tamanho e hash)
+        use_cache: Se False, força uma nova avaliação (o texto extraído ainda pode vir do cache)
+        
+    Returns:
+        EvaluationResponse: Avaliação completa do TCC
+    """
+    filename = document.filename
+    text, file_type, timings = await _extract_text(document.source, filename, document.sha256)
+
+    # Remove ruído de extração (cabeçalhos, numeração de páginas, hifenização) em uma thread:
+    # as expressões regulares sobre o documento inteiro bloqueariam o loop de eventos
+    with observe_stage("normalization"):
+        text, normalization_stats = await asyncio.to_thread(TextNormalizer.normalize, text, file_type)
+    timings.update(normalization_stats)
+    
+    # Realiza avaliação
+    evaluation = await evaluator_service.evaluate(text, use_cache=use_cache)
+    
+    # Adiciona informação sobre o arquivo processado (mantendo o detalhe da avaliação incremental)
+    file_message = f"Arquivo {filename} ({file_type}) processado com sucesso"
+    if evaluation.cached:
+        evaluation.message = f"{file_message} (avaliação recuperada do cache)"
+    elif evaluation.revision is not None:
+        evaluation.message = f"{file_message}. {evaluation.message}"
+    else:
+        evaluation.message = file_message
+    evaluation.processing = timings
+    
+    return evaluation
 
 
 @router.post("/text", response_model=EvaluationResponse)
@@ -44,12 +203,17 @@ async def evaluate_text(request: TextEvaluationRequest):
             )
         
         # Realiza avaliação
-        evaluation = await evaluator_service.evaluate(request.text)
+        evaluation = await evaluator_service.evaluate(
+            request.text,
+            use_cache=not request.force_refresh
+        )
         
-        return evaluation
+        return FastJSONResponse(evaluation)
     
     except HTTPException:
         raise
+    except UpstreamUnavailableError as e:
+        raise _upstream_unavailable(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -57,54 +221,89 @@ async def evaluate_text(request: TextEvaluationRequest):
         )
 
 
+@router.post("/stream")
+async def evaluate_text_stream(request: TextEvaluationRequest):
+    """
+    Avalia texto de TCC com resposta em streaming (Server-Sent Events)
+    
+    Cada avaliador e o parecer final são enviados como eventos assim que gerados
+    (`evaluator_1`, `evaluator_2`, `evaluator_3`, `final_verdict`). O evento `result`
+    traz a avaliação completa validada; falhas são enviadas no evento `error`.
+    
+    Args:
+        request: Requisição contendo o texto do TCC
+        
+    Returns:
+        StreamingResponse: Fluxo `text/event-stream`
+    """
+    if len(request.text.strip()) < 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O texto deve conter pelo menos 100 caracteres"
+        )
+    
+    async def event_stream():
+        try:
+            async for event, data in evaluator_service.evaluate_stream(
+                request.text,
+                use_cache=not request.force_refresh
+            ):
+                yield format_sse_event(event, data)
+        except Exception as e:
+            yield format_sse_event("error", {
+                "success": False,
+                "message": f"Erro ao processar avaliação: {str(e)}"
+            })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/file", response_model=EvaluationResponse)
-async def evaluate_file(file: UploadFile = File(...)):
+async def evaluate_file(
+    request: Request,
+    file: UploadFile = File(...),
+    force_refresh: bool = Query(False, description="Ignora o cache e força uma nova avaliação")
+):
     """
     Avalia TCC a partir de arquivo enviado (PDF, DOCX, TXT)
     
     Args:
         file: Arquivo enviado (PDF, DOCX ou TXT)
+        force_refresh: Ignora o cache e força uma nova avaliação
         
     Returns:
         EvaluationResponse: Avaliação completa do TCC
     """
-    temp_file_path = None
+    upload = None
     
     try:
-        # Valida tipo de arquivo
-        if not file_processor.is_allowed_file(file.filename):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Tipo de arquivo não permitido. Extensões aceitas: {', '.join(file_processor.ALLOWED_EXTENSIONS)}"
-            )
-        
-        # Valida tamanho do arquivo
-        file.file.seek(0, 2)  # Move para o final do arquivo
-        file_size = file.file.tell()  # Obtém posição (tamanho)
-        file.file.seek(0)  # Volta ao início
-        
-        if not validate_file_size(file_size):
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Arquivo muito grande. Tamanho máximo: {settings.max_file_size_mb}MB. Tamanho enviado: {format_file_size(file_size)}"
-            )
-        
-        # Salva arquivo temporariamente
-        temp_file_path, original_filename = await save_upload_file(file)
+        _observe_upload_spool(request)
+        _validate_upload(file)
         
-        # Processa arquivo e extrai texto
-        text, file_type = file_processor.process_file(temp_file_path, original_filename)
-        
-        # Realiza avaliação
-        evaluation = await evaluator_service.evaluate(text)
+        # Recebe o arquivo (em memória ou, se grande, em arquivo temporário)
+        with observe_stage("upload_save"):
+            upload = await read_upload_file(file)
         
-        # Adiciona informação sobre o arquivo processado
-        evaluation.message = f"Arquivo {original_filename} ({file_type}) processado com sucesso"
-        
-        return evaluation
+        return FastJSONResponse(await _evaluate_received_file(upload, use_cache=not force_refresh))
     
     except HTTPException:
         raise
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except ExtractionTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    except UpstreamUnavailableError as e:
+        raise _upstream_unavailable(e)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -117,8 +316,292 @@ async def evaluate_file(file: UploadFile = File(...)):
         )
     finally:
         # Limpa arquivo temporário
-        if temp_file_path:
-            cleanup_temp_file(temp_file_path)
+        if upload is not None:
+            release_file(upload.source)
+
+
+async def _prepare_batch_documents(files: List[UploadFile]) -> List[ReceivedFile]:
+    """
+    Recebe os arquivos de um lote, expandindo arquivos ZIP
+    
+    Args:
+        files: Arquivos enviados (documentos e/ou ZIPs)
+        
+    Returns:
+        List[ReceivedFile]: Documentos do lote
+    """
+    max_batch_bytes = settings.batch_max_upload_mb * 1024 * 1024
+    documents: List[ReceivedFile] = []
+    
+    try:
+        for file in files:
+            is_zip = file_processor.get_file_extension(file.filename) == ".zip"
+            if not is_zip:
+                _validate_upload(file)
+            
+            upload = await read_upload_file(file, max_size_bytes=max_batch_bytes if is_zip else None)
+            
+            if not is_zip:
+                documents.append(upload)
+                continue
+            
+            try:
+                documents.extend(await asyncio.to_thread(
+                    expand_zip_file,
+                    upload.source,
+                    file_processor.ALLOWED_EXTENSIONS,
+                    settings.batch_max_files - len(documents),
+                    max_batch_bytes
+                ))
+            finally:
+                release_file(upload.source)
+    
+    except Exception:
+        for document in documents:
+            release_file(document.source)
+        raise
+    
+    if not documents:
+        raise ValueError("Nenhum documento válido encontrado no lote")
+    if len(documents) > settings.batch_max_files:
+        for document in documents:
+            release_file(document.source)
+        raise FileTooLargeError(f"O lote excede o máximo de {settings.batch_max_files} documentos")
+    
+    return documents
+
+
+@router.post("/batch")
+async def evaluate_batch(
+    files: List[UploadFile] = File(...),
+    force_refresh: bool = Query(False, description="Ignora o cache e força novas avaliações")
+):
+    """
+    Avalia um lote de TCCs (vários arquivos e/ou arquivos ZIP)
+    
+    Os documentos são avaliados em paralelo (limitado por `batch_concurrency`) e os
+    resultados são transmitidos em NDJSON, uma linha por documento, na ordem em que
+    terminam. Falhas em um documento não interrompem o lote. A última linha contém
+    o resumo (`summary`).
+    
+    Args:
+        files: Arquivos enviados (PDF, DOCX, TXT ou ZIP)
+        force_refresh: Ignora o cache e força novas avaliações
+        
+    Returns:
+        StreamingResponse: Fluxo `application/x-ndjson`
+    """
+    try:
+        documents = await _prepare_batch_documents(files)
+    except HTTPException:
+        raise
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar lote: {str(e)}"
+        )
+    
+    semaphore = asyncio.Semaphore(max(1, settings.batch_concurrency))
+    
+    async def evaluate_document(index: int, document: ReceivedFile) -> BatchItemResult:
+        filename = document.filename
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                evaluation = await _evaluate_received_file(document, use_cache=not force_refresh)
+                return BatchItemResult(
+                    index=index,
+                    filename=filename,
+                    success=True,
+                    evaluation=evaluation,
+                    elapsed_seconds=round(time.perf_counter() - started_at, 3)
+                )
+            except Exception as e:
+                return BatchItemResult(
+                    index=index,
+                    filename=filename,
+                    success=False,
+                    error=str(e),
+                    elapsed_seconds=round(time.perf_counter() - started_at, 3)
+                )
+            finally:
+                release_file(document.source)
+    
+    async def result_stream():
+        started_at = time.perf_counter()
+        tasks = [
+            asyncio.create_task(evaluate_document(index, document))
+            for index, document in enumerate(documents)
+        ]
+        succeeded = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                succeeded += int(result.success)
+                yield dump_json(result) + b"\n"
+            
+            summary = BatchSummary(
+                total=len(documents),
+                succeeded=succeeded,
+                failed=len(documents) - succeeded,
+                elapsed_seconds=round(time.perf_counter() - started_at, 3)
+            )
+            yield b'{"summary":' + dump_json(summary) + b"}\n"
+        finally:
+            # Cliente desconectado: cancela avaliações pendentes e remove temporários
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for document in documents:
+                release_file(document.source)
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+async def _submit_job(factory, cleanup=None) -> JobStatusResponse:
+    """
+    Enfileira um job de avaliação, convertendo fila cheia em HTTP 503
+    
+    Args:
+        factory: Função que executa a avaliação
+        cleanup: Função opcional chamada ao final do job
+        
+    Returns:
+        JobStatusResponse: Estado inicial do job
+    """
+    try:
+        job = await job_manager.submit(factory, cleanup)
+    except JobQueueFullError as e:
+        if cleanup:
+            cleanup()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return JobStatusResponse(**job)
+
+
+@router.post("/jobs/text", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_text_job(request: TextEvaluationRequest):
+    """
+    Enfileira a avaliação de um texto e retorna imediatamente o identificador do job
+    
+    Args:
+        request: Requisição contendo o texto do TCC
+        
+    Returns:
+        JobStatusResponse: Estado inicial do job
+    """
+    if len(request.text.strip()) < 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O texto deve conter pelo menos 100 caracteres"
+        )
+    
+    job = await _submit_job(
+        lambda: evaluator_service.evaluate(request.text, use_cache=not request.force_refresh)
+    )
+    return FastJSONResponse(job, status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.post("/jobs/file", response_model=JobStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_file_job(
+    file: UploadFile = File(...),
+    force_refresh: bool = Query(False, description="Ignora o cache e força uma nova avaliação")
+):
+    """
+    Enfileira a avaliação de um arquivo (PDF, DOCX, TXT) e retorna imediatamente o identificador do job
+    
+    Args:
+        file: Arquivo enviado (PDF, DOCX ou TXT)
+        force_refresh: Ignora o cache e força uma nova avaliação
+        
+    Returns:
+        JobStatusResponse: Estado inicial do job
+    """
+    _validate_upload(file)
+    
+    try:
+        upload = await read_upload_file(file)
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar arquivo: {str(e)}"
+        )
+    
+    job = await _submit_job(
+        lambda: _evaluate_received_file(upload, use_cache=not force_refresh),
+        cleanup=lambda: release_file(upload.source)
+    )
+    return FastJSONResponse(job, status_code=status.HTTP_202_ACCEPTED)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str):
+    """
+    Consulta o estado de um job de avaliação
+    
+    Args:
+        job_id: Identificador do job
+        
+    Returns:
+        JobStatusResponse: Estado, posição na fila e resultado (quando concluído)
+    """
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado ou expirado"
+        )
+    return FastJSONResponse(JobStatusResponse(**job))
+
+
+@router.get("/jobs/{job_id}/result", response_model=EvaluationResponse)
+async def get_job_result(job_id: str):
+    """
+    Obtém o resultado final de um job de avaliação
+    
+    Args:
+        job_id: Identificador do job
+        
+    Returns:
+        EvaluationResponse: Avaliação completa do TCC
+    """
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado ou expirado"
+        )
+    
+    if job["status"] == JobStatus.FAILED.value:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar avaliação: {job['error']}"
+        )
+    
+    if job["status"] != JobStatus.COMPLETED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Avaliação ainda não concluída (status: {job['status']})"
+        )
+    
+    return FastJSONResponse(EvaluationResponse(**job["result"]))
 
 
 @router.get("/health")
@@ -133,6 +616,45 @@ async def health_check():
         "status": "online",
         "service": "Veritas.AI - Banca Avaliadora de TCC",
         "version": "1.0.0",
-        "api_configured": bool(settings.perplexity_api_key)
+        "api_configured": bool(settings.perplexity_api_key),
+        "upstream_state": get_target_router().state(),
+        # Usado pelo frontend para montar o seletor de arquivos
+        "allowed_extensions": sorted(file_processor.ALLOWED_EXTENSIONS)
     }
 
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Retorna estatísticas do cache de avaliações
+    
+    Returns:
+        dict: Contadores de acertos e falhas do cache de avaliações, em `extraction`,
+        do cache de texto extraído, em `revisions`, do índice de versões revisadas,
+        em `originality`, do índice de originalidade e, em `shared_state`, do
+        armazenamento compartilhado entre workers
+    """
+    stats = evaluator_service.get_cache_stats()
+    stats["extraction"] = (
+        {"enabled": True, **extraction_cache.get_stats()} if extraction_cache is not None else {"enabled": False}
+    )
+    stats["revisions"] = evaluator_service.get_revision_stats()
+    stats["originality"] = evaluator_service.get_originality_stats()
+    shared_state = get_shared_state()
+    stats["shared_state"] = (
+        await asyncio.to_thread(shared_state.get_stats) if shared_state is not None else {"backend": "none"}
+    )
+    return stats
+
+
+@router.get("/upstream/stats")
+async def upstream_stats():
+    """
+    Retorna estatísticas das chamadas à API do modelo
+    
+    Returns:
+        dict: Requisições de cobertura e, por destino, latências recentes, taxa de erro,
+        tentativas, tempos de espera e estado do circuit breaker
+    """
+    return get_target_router().get_stats()
@@ -0,0 +1,90 @@
+"""
+Ponto de entrada de produção do Veritas.AI: vários workers uvicorn com estado compartilhado
+
+Cada worker é um processo independente (por padrão, um por núcleo de CPU). O cache
+de avaliações, o limite de taxa da API e o estado dos jobs ficam no armazenamento
+compartilhado configurado em SHARED_STATE_BACKEND; com mais de um worker e nenhum
+backend configurado, é usado um banco SQLite local em modo WAL.
+
+Uso:
+    python -m backend.serve [--workers N] [--host 0.0.0.0] [--port 8000]
+
+    # estado compartilhado em memória (/dev/shm) ou em um servidor compatível com Redis
+    SHARED_STATE_BACKEND=shm python -m backend.serve
+    SHARED_STATE_BACKEND=redis SHARED_STATE_REDIS_URL=redis://10.0.0.5:6379/0 python -m backend.serve
+"""
+import argparse
+import os
+import uvicorn
+from backend import build_assets
+from backend.config import settings
+from backend.services.originality import OriginalityIndex
+
+
+def configure_shared_state(workers: int):
+    """
+    Ajusta as variáveis de ambiente herdadas pelos workers para que compartilhem o estado
+
+    Args:
+        workers: Número de workers
+    """
+    if workers <= 1:
+        return
+    if settings.shared_state_backend.lower() == "none":
+        os.environ["SHARED_STATE_BACKEND"] = "sqlite"
+        print("SHARED_STATE_BACKEND não configurado: usando SQLite local para o estado compartilhado")
+    if settings.job_store_backend.lower() == "memory":
+        os.environ["JOB_STORE_BACKEND"] = "shared"
+        print("JOB_STORE_BACKEND=memory não é visível entre workers: usando o estado compartilhado")
+
+
+def prepare_originality_index():
+    """Constrói o índice de originalidade uma única vez, antes de iniciar os workers"""
+    if not settings.originality_corpus_dir:
+        return
+    try:
+        OriginalityIndex.from_settings()
+    except Exception as e:
+        print(f"Aviso: Falha ao preparar o índice de originalidade: {e}")
+
+
+def prepare_static_assets():
+    """Refaz o build dos assets estáticos se estiver ausente ou desatualizado, antes de iniciar os workers"""
+    try:
+        if build_assets.is_stale():
+            build_assets.build()
+            print(f"Assets estáticos gerados em {settings.static_build_dir}")
+    except Exception as e:
+        print(f"Aviso: Falha ao gerar os assets estáticos (servindo os arquivos originais): {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.server_workers,
+        help="Número de processos (0 = um por núcleo de CPU)"
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    configure_shared_state(workers)
+    prepare_originality_index()
+    prepare_static_assets()
+
+    print(f"Iniciando {workers} worker(s) em http://{args.host}:{args.port}")
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level=args.log_level
+    )
+
+
+if __name__ == "__main__":
+    main()
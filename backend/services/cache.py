@@ -0,0 +1,406 @@
+"""
+Cache em dois níveis (memória + disco) para resultados de avaliação e de extração
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from backend.services.shared_state import SharedState
+
+
+class TieredCache:
+    """
+    Cache LRU em memória com TTL, apoiado por um nível em disco que
+    sobrevive a reinicializações do servidor.
+
+    Com vários workers, o segundo nível pode ser o armazenamento compartilhado
+    (`SharedState`) no lugar do disco: uma entrada gravada por um worker passa a
+    ser encontrada pelos demais, inclusive em outras máquinas.
+
+    Os valores devem ser serializáveis em JSON.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 0,
+        directory: Optional[str] = None,
+        max_disk_entries: int = 0,
+        max_memory_bytes: int = 0,
+        size_of: Optional[Callable[[Any], int]] = None,
+        shared: Optional[SharedState] = None,
+        namespace: str = "cache"
+    ):
+        """
+        Args:
+            max_entries: Número máximo de entradas mantidas em memória
+            ttl_seconds: Tempo de vida das entradas (0 = sem expiração)
+            directory: Diretório do nível em disco (None = desativado)
+            max_disk_entries: Limite de arquivos em disco (0 = ilimitado)
+            max_memory_bytes: Limite aproximado de memória do nível em memória (0 = apenas por entradas)
+            size_of: Função que estima o tamanho em bytes de um valor (necessária com `max_memory_bytes`)
+            shared: Armazenamento compartilhado usado como segundo nível no lugar do disco (None = disco)
+            namespace: Prefixo das chaves no armazenamento compartilhado
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.max_memory_bytes = max_memory_bytes if size_of is not None else 0
+        self.size_of = size_of
+        self.shared = shared
+        self.namespace = namespace
+
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._memory_sizes: Dict[str, int] = {}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expired": 0
+        }
+
+        if self.shared is not None:
+            self.directory = None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _is_expired(self, created_at: float) -> bool:
+        """Verifica se uma entrada criada em `created_at` já expirou"""
+        return bool(self.ttl_seconds) and (time.time() - created_at) > self.ttl_seconds
+
+    def _disk_path(self, key: str) -> str:
+        """Caminho do arquivo em disco para a chave (particionado por prefixo)"""
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _memory_put(self, key: str, created_at: float, value: Any):
+        """Insere no nível em memória respeitando os limites de entradas e de bytes"""
+        self._memory_pop(key)
+        self._memory[key] = (created_at, value)
+        if self.max_memory_bytes:
+            size = self.size_of(value)
+            self._memory_sizes[key] = size
+            self._memory_bytes += size
+
+        while len(self._memory) > self.max_entries or (
+            self.max_memory_bytes and self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1
+        ):
+            self._memory_pop(next(iter(self._memory)))
+            self._stats["evictions"] += 1
+
+    def _memory_pop(self, key: str):
+        """Remove uma entrada do nível em memória"""
+        if self._memory.pop(key, None) is not None:
+            self._memory_bytes -= self._memory_sizes.pop(key, 0)
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Lê uma entrada do nível em disco"""
+        if not self.directory:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+            return entry["created_at"], entry["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Aviso: Entrada de cache corrompida removida ({path}): {e}")
+            self._disk_delete(key)
+            return None
+
+    def _disk_set(self, key: str, created_at: float, value: Any):
+        """Grava uma entrada no nível em disco de forma atômica"""
+        if not self.directory:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"created_at": created_at, "value": value}, file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Aviso: Não foi possível gravar cache em disco ({path}): {e}")
+            return
+
+        self._disk_writes += 1
+        if self.max_disk_entries and self._disk_writes % 64 == 0:
+            self._prune_disk()
+
+    def _disk_delete(self, key: str):
+        """Remove uma entrada do nível em disco"""
+        if not self.directory:
+            return
+        try:
+            os.unlink(self._disk_path(key))
+        except OSError:
+            pass
+
+    def _shared_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Lê uma entrada do armazenamento compartilhado"""
+        try:
+            raw = self.shared.get(f"{self.namespace}:{key}")
+            if raw is None:
+                return None
+            entry = json.loads(raw)
+            return entry["created_at"], entry["value"]
+        except Exception as e:
+            print(f"Aviso: Falha ao ler o cache compartilhado ({key}): {e}")
+            return None
+
+    def _shared_set(self, key: str, created_at: float, value: Any):
+        """Grava uma entrada no armazenamento compartilhado (expira com o TTL do cache)"""
+        try:
+            self.shared.set(
+                f"{self.namespace}:{key}",
+                json.dumps({"created_at": created_at, "value": value}, ensure_ascii=False),
+                self.ttl_seconds
+            )
+        except Exception as e:
+            print(f"Aviso: Falha ao gravar o cache compartilhado ({key}): {e}")
+
+    def _shared_delete(self, key: str):
+        """Remove uma entrada do armazenamento compartilhado"""
+        try:
+            self.shared.delete(f"{self.namespace}:{key}")
+        except Exception as e:
+            print(f"Aviso: Falha ao remover entrada do cache compartilhado ({key}): {e}")
+
+    def _second_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        return self._shared_get(key) if self.shared is not None else self._disk_get(key)
+
+    def _second_set(self, key: str, created_at: float, value: Any):
+        if self.shared is not None:
+            self._shared_set(key, created_at, value)
+        else:
+            self._disk_set(key, created_at, value)
+
+    def _second_delete(self, key: str):
+        if self.shared is not None:
+            self._shared_delete(key)
+        else:
+            self._disk_delete(key)
+
+    def _prune_disk(self):
+        """Remove as entradas mais antigas do disco acima do limite configurado"""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+
+        entries.sort()
+        removed = 0
+        for _, path in entries[:excess]:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._stats["evictions"] += removed
+
+    def _memory_get(self, key: str) -> Optional[Any]:
+        """Busca um valor no nível em memória (chamar com o lock adquirido)"""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created_at, value = entry
+        if not self._is_expired(created_at):
+            self._memory.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return value
+        self._memory_pop(key)
+        self._stats["expired"] += 1
+        return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Busca um valor no cache (memória e, em seguida, disco ou armazenamento compartilhado)
+
+        O lock protege apenas o nível em memória: a leitura do segundo nível (E/S de
+        disco ou de rede) não bloqueia os acessos concorrentes à memória.
+
+        Args:
+            key: Chave do cache
+
+        Returns:
+            Optional[Any]: Valor armazenado ou None se ausente/expirado
+        """
+        with self._lock:
+            value = self._memory_get(key)
+        if value is not None:
+            return value
+
+        entry = self._second_get(key)
+        if entry is not None:
+            created_at, value = entry
+            if not self._is_expired(created_at):
+                with self._lock:
+                    self._memory_put(key, created_at, value)
+                    self._stats["shared_hits" if self.shared is not None else "disk_hits"] += 1
+                return value
+            self._second_delete(key)
+
+        with self._lock:
+            if entry is not None:
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        """
+        Armazena um valor nos dois níveis do cache
+
+        Args:
+            key: Chave do cache
+            value: Valor serializável em JSON
+        """
+        created_at = time.time()
+        with self._lock:
+            self._memory_put(key, created_at, value)
+            self._stats["writes"] += 1
+        self._second_set(key, created_at, value)
+
+    def delete(self, key: str):
+        """Remove uma chave dos dois níveis do cache"""
+        with self._lock:
+            self._memory_pop(key)
+        self._second_delete(key)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Versão assíncrona de `get`
+
+        Acertos em memória retornam diretamente; a consulta ao segundo nível roda em
+        uma thread, sem bloquear o event loop.
+        """
+        if self.shared is None and not self.directory:
+            return self.get(key)
+        with self._lock:
+            value = self._memory_get(key)
+        if value is not None:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any):
+        """Versão assíncrona de `set` (a gravação no segundo nível roda em uma thread)"""
+        if self.shared is None and not self.directory:
+            self.set(key, value)
+        else:
+            await asyncio.to_thread(self.set, key, value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retorna contadores de uso do cache
+
+        Returns:
+            Dict: Acertos, falhas, gravações e taxa de acerto
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self.max_memory_bytes:
+                stats["memory_bytes"] = self._memory_bytes
+
+        hits = stats["memory_hits"] + stats["disk_hits"] + stats["shared_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza o texto para fins de identificação de conteúdo
+
+    Aplica normalização Unicode (NFC) e colapsa espaços em branco, de modo que
+    reenvios do mesmo texto com diferenças apenas de formatação gerem a mesma chave.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        str: Texto normalizado
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def build_evaluation_cache_key(
+    text: str,
+    model: str,
+    temperature: float,
+    prompt_version: str,
+    originality_fingerprint: str = ""
+) -> str:
+    """
+    Gera a chave de cache de uma avaliação a partir do conteúdo e dos parâmetros do modelo
+
+    Args:
+        text: Texto do TCC
+        model: Nome do modelo utilizado
+        temperature: Temperatura da geração
+        prompt_version: Versão do prompt de avaliação
+        originality_fingerprint: Impressão digital do índice de originalidade (vazio = sem triagem)
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, repr(float(temperature)), normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    if originality_fingerprint:
+        # A triagem altera o prompt: um corpus diferente produz outra avaliação
+        digest.update(f"originality:{originality_fingerprint}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Incrementar quando a extração de texto mudar, invalidando textos extraídos em cache
+EXTRACTION_CACHE_VERSION = "3"
+
+
+def build_extraction_cache_key(file_sha256: str, filename: str) -> str:
+    """
+    Gera a chave de cache do texto extraído de um arquivo
+
+    Args:
+        file_sha256: Hash SHA-256 do conteúdo do arquivo
+        filename: Nome do arquivo (a extensão determina o extrator)
+
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    digest = hashlib.sha256()
+    for part in (EXTRACTION_CACHE_VERSION, extension, file_sha256):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
@@ -1,100 +1,580 @@
 """
 Serviço de avaliação que orquestra o processo de análise de TCC
 """
-from typing import Dict, Any
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import numpy as np
+from backend.config import settings
+from backend.services.cache import TieredCache, build_evaluation_cache_key
+from backend.services.originality import OriginalityIndex, OriginalityReport
 from backend.services.perplexity_client import PerplexityClient
-from backend.models import (
-    EvaluationResponse,
-    EvaluatorResponse,
-    FinalVerdict
-)
+from backend.services.resilience import UpstreamUnavailableError
+from backend.services.revisions import DocumentSection, RevisionIndex, RevisionMatch, document_sections, section_hash
+from backend.services.sections import plan_section_chunks
+from backend.services.shared_state import get_shared_state
+from backend.utils.json_repair import JsonRepairError, loads_tolerant, merge_continuation
+from backend.utils.json_stream import JsonObjectStream
+from backend.utils.metrics import EVALUATIONS_IN_FLIGHT, JSON_RESPONSES, observe_stage
+from pydantic import ValidationError
+from backend.models import EvaluationResponse, RevisionInfo
+
+
+class _StreamAbandoned(Exception):
+    """A avaliação em streaming aguardada foi interrompida pelo cliente que a iniciou"""
 
 
 class EvaluatorService:
     """Serviço responsável pela orquestração da avaliação de TCCs"""
     
+    STREAM_SECTIONS = ("evaluator_1", "evaluator_2", "evaluator_3", "final_verdict")
+    
     def __init__(self):
         self.perplexity_client = PerplexityClient()
+        self.cache: Optional[TieredCache] = None
+        
+        if settings.evaluation_cache_enabled:
+            self.cache = TieredCache(
+                max_entries=settings.evaluation_cache_max_entries,
+                ttl_seconds=settings.evaluation_cache_ttl_seconds,
+                directory=settings.evaluation_cache_dir or None,
+                max_disk_entries=settings.evaluation_cache_max_disk_entries,
+                shared=get_shared_state(),
+                namespace="evaluation"
+            )
+        
+        # Índice de documentos avaliados para reavaliação incremental de versões revisadas
+        self.revisions: Optional[RevisionIndex] = None
+        if settings.revision_index_enabled:
+            self.revisions = RevisionIndex.from_settings()
+        
+        # Índice de originalidade do corpus de referência (aberto no startup por `open_originality_index`)
+        self.originality: Optional[OriginalityIndex] = None
+        
+        # Avaliações em andamento por chave de conteúdo (agrupamento de requisições idênticas)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._coalesced = 0
+    
+    def get_cache_key(self, text: str) -> str:
+        """
+        Calcula a chave de cache (hash de conteúdo) de uma avaliação
+        
+        Args:
+            text: Texto completo do TCC
+            
+        Returns:
+            str: Chave derivada do texto normalizado, modelo, temperatura e versão do prompt
+        """
+        client = self.perplexity_client
+        return build_evaluation_cache_key(
+            text,
+            model=client.model,
+            temperature=client.temperature,
+            prompt_version=client.prompt_version,
+            originality_fingerprint=self.originality.fingerprint if self.originality is not None else ""
+        )
+    
+    async def open_originality_index(self):
+        """Abre o índice de originalidade, construindo-o se o corpus configurado tiver mudado"""
+        try:
+            self.originality = await asyncio.to_thread(OriginalityIndex.from_settings)
+        except Exception as e:
+            print(f"Aviso: Triagem de originalidade desativada: {e}")
+            self.originality = None
+    
+    def get_originality_stats(self) -> Dict[str, Any]:
+        """Retorna informações do índice de originalidade"""
+        if self.originality is None:
+            return {"enabled": False}
+        return self.originality.get_stats()
     
-    async def evaluate(self, text: str) -> EvaluationResponse:
+    async def _screen_originality(self, text: str) -> Optional[OriginalityReport]:
+        """
+        Compara o texto com o corpus de referência
+        
+        Args:
+            text: Texto completo do TCC
+            
+        Returns:
+            Optional[OriginalityReport]: Trechos suspeitos (None sem índice de originalidade)
+        """
+        if self.originality is None:
+            return None
+        with observe_stage("originality_screen"):
+            return await asyncio.to_thread(
+                self.originality.screen,
+                text,
+                min_passage_words=settings.originality_min_passage_words,
+                max_gap_words=settings.originality_max_gap_words,
+                max_passages=settings.originality_max_passages,
+                max_document_fraction=settings.originality_max_document_fraction,
+                passage_max_chars=settings.originality_passage_max_chars
+            )
+    
+    def get_revision_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do índice de versões revisadas"""
+        if self.revisions is None:
+            return {"enabled": False}
+        return self.revisions.get_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache de avaliações e das avaliações em andamento"""
+        coalescing = {"in_flight": len(self._in_flight), "coalesced": self._coalesced}
+        if self.cache is None:
+            return {"enabled": False, **coalescing}
+        return {"enabled": True, **self.cache.get_stats(), **coalescing}
+    
+    async def evaluate(self, text: str, use_cache: bool = True) -> EvaluationResponse:
         """
         Avalia o texto do TCC usando a API do Perplexity
         
+        Requisições simultâneas para o mesmo conteúdo (mesma chave de cache) são
+        agrupadas: apenas uma chamada à API é feita e todos os solicitantes recebem
+        o mesmo resultado ou o mesmo erro.
+        
+        Args:
+            text: Texto completo do TCC
+            use_cache: Se False, ignora o cache e força uma nova avaliação
+                (o resultado novo ainda é armazenado)
+            
+        Returns:
+            EvaluationResponse: Resposta estruturada com avaliação completa
+        """
+        cache_key = self.get_cache_key(text)
+        
+        if use_cache and self.cache is not None:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                evaluation_response = EvaluationResponse.model_validate(cached)
+                evaluation_response.message = "Avaliação recuperada do cache"
+                evaluation_response.cached = True
+                return evaluation_response
+        
+        while True:
+            task = self._in_flight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(self._evaluate_uncached(text, cache_key, reuse=use_cache))
+                self._in_flight[cache_key] = task
+                task.add_done_callback(lambda done, key=cache_key: self._release_in_flight(key, done))
+            else:
+                self._coalesced += 1
+            
+            try:
+                # `shield` impede que o cancelamento de um solicitante cancele a chamada compartilhada
+                evaluation_response = await asyncio.shield(task)
+            except _StreamAbandoned:
+                # O streaming aguardado foi interrompido: avalia por conta própria
+                continue
+            
+            # Cada solicitante recebe sua própria cópia (as rotas ajustam mensagem e tempos)
+            return evaluation_response.model_copy(deep=True)
+    
+    def _release_in_flight(self, cache_key: str, task: asyncio.Future):
+        """Remove a avaliação concluída do registro de chamadas em andamento"""
+        if self._in_flight.get(cache_key) is task:
+            del self._in_flight[cache_key]
+        if not task.cancelled():
+            # Marca o erro como tratado mesmo que todos os solicitantes tenham desistido
+            task.exception()
+    
+    async def _evaluate_uncached(self, text: str, cache_key: str, reuse: bool = True) -> EvaluationResponse:
+        """
+        Realiza a avaliação junto à API e armazena o resultado no cache
+        
+        Se o documento for uma versão revisada de um trabalho já avaliado, apenas as
+        seções alteradas são enviadas ao modelo (ver `RevisionIndex`).
+        
         Args:
             text: Texto completo do TCC
+            cache_key: Chave de cache do conteúdo
+            reuse: Se False, não reaproveita avaliações de versões anteriores
             
         Returns:
             EvaluationResponse: Resposta estruturada com avaliação completa
         """
+        EVALUATIONS_IN_FLIGHT.inc()
         try:
-            # Chama a API do Perplexity
-            raw_evaluation = await self.perplexity_client.evaluate_text(text)
+            signature, sections, match = await self._find_previous_version(text, cache_key, reuse)
+            originality = await self._screen_originality(text)
+            analyses: Dict[str, Dict[str, Any]] = {}
+            revision: Optional[RevisionInfo] = None
             
-            # Valida e estrutura a resposta
-            evaluation_response = self._parse_evaluation(raw_evaluation)
+            # Chama a API do Perplexity (por seções, só com as seções alteradas ou em uma única chamada)
+            if self.should_use_map_reduce(text):
+                raw_evaluation, analyses, revision = await self._evaluate_map_reduce(text, match, originality)
+            else:
+                plan = self._plan_revision(text, sections, match) if match is not None else None
+                if plan is not None:
+                    changed, unchanged, revision = plan
+                    raw_evaluation = await self.perplexity_client.revise_evaluation(
+                        match.record["evaluation"], changed, unchanged, originality
+                    )
+                else:
+                    raw_evaluation = await self.perplexity_client.evaluate_text(text, originality)
             
-            return evaluation_response
+            # Valida e estrutura a resposta
+            with observe_stage("validation"):
+                evaluation_response = self._parse_evaluation(raw_evaluation)
         
+        except UpstreamUnavailableError:
+            raise
         except Exception as e:
             raise Exception(f"Erro durante avaliação: {str(e)}")
+        finally:
+            EVALUATIONS_IN_FLIGHT.dec()
+        
+        if revision is not None:
+            evaluation_response.revision = revision
+            evaluation_response.message = (
+                f"Avaliação incremental concluída: {len(revision.reused_sections)} seção(ões) reaproveitada(s) "
+                f"da versão anterior e {len(revision.reevaluated_sections)} reavaliada(s)"
+            )
+        
+        evaluated = evaluation_response.model_dump(mode="json")
+        if self.cache is not None:
+            await self.cache.aset(cache_key, evaluated)
+        if signature is not None:
+            await self._register_version(cache_key, signature, sections, evaluated, analyses)
+        
+        return evaluation_response
     
-    def _parse_evaluation(self, raw_data: Dict[str, Any]) -> EvaluationResponse:
+    async def _find_previous_version(
+        self,
+        text: str,
+        cache_key: str,
+        reuse: bool = True
+    ) -> Tuple[Optional[np.ndarray], List[DocumentSection], Optional[RevisionMatch]]:
         """
-        Converte dados brutos da API em modelo estruturado
+        Calcula a assinatura MinHash e as seções do documento e procura uma versão anterior
         
         Args:
-            raw_data: Dados brutos da API
+            text: Texto completo do TCC
+            cache_key: Chave de cache do conteúdo (o próprio documento é ignorado)
+            reuse: Se False, não procura a versão anterior (apenas prepara o registro do documento)
             
         Returns:
-            EvaluationResponse: Modelo validado
+            Tuple: (assinatura, seções, versão anterior) — (None, [], None) com o índice desativado
+        """
+        if self.revisions is None:
+            return None, [], None
+        def lookup() -> Tuple[np.ndarray, List[DocumentSection], Optional[RevisionMatch]]:
+            signature = self.revisions.signature(text)
+            match = self.revisions.find(signature, exclude=cache_key) if reuse else None
+            return signature, document_sections(text), match
+        
+        # Assinatura, hashes das seções e busca no índice rodam fora do event loop
+        with observe_stage("revision_lookup"):
+            return await asyncio.to_thread(lookup)
+    
+    async def _register_version(
+        self,
+        cache_key: str,
+        signature: np.ndarray,
+        sections: List[DocumentSection],
+        evaluated: Dict[str, Any],
+        analyses: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """Registra o documento avaliado no índice de versões (gravação e compactação em uma thread)"""
+        evaluation = {section: evaluated[section] for section in self.STREAM_SECTIONS}
+        await asyncio.to_thread(self.revisions.add, cache_key, signature, sections, evaluation, analyses)
+    
+    @staticmethod
+    def _plan_revision(
+        text: str,
+        sections: List[DocumentSection],
+        match: RevisionMatch
+    ) -> Optional[Tuple[List[Tuple[str, str]], List[str], RevisionInfo]]:
+        """
+        Separa as seções alteradas das inalteradas em relação à versão anterior
+        
+        Args:
+            text: Texto completo do TCC
+            sections: Seções do documento
+            match: Versão anterior encontrada no índice
+            
+        Returns:
+            Optional[Tuple]: (seções alteradas como (título, texto), títulos inalterados,
+            resumo do reaproveitamento) ou None se a reavaliação incremental não compensar
+        """
+        previous = match.record.get("sections") or {}
+        if not sections or not previous:
+            return None
+        
+        changed = [section for section in sections if previous.get(section.id) != section.hash]
+        unchanged = [section for section in sections if previous.get(section.id) == section.hash]
+        changed_chars = sum(len(section.text) for section in changed)
+        if not unchanged or changed_chars > settings.revision_max_changed_fraction * len(text):
+            return None
+        
+        revision = RevisionInfo(
+            previous_id=match.document_id[:16],
+            similarity=round(match.similarity, 3),
+            reused_sections=[section.title for section in unchanged],
+            reevaluated_sections=[section.title for section in changed]
+        )
+        return [(section.title, section.text) for section in changed], revision.reused_sections, revision
+    
+    @staticmethod
+    def should_use_map_reduce(text: str) -> bool:
+        """Indica se o texto deve ser avaliado por seções (map-reduce)"""
+        return settings.map_reduce_enabled and len(text) > settings.map_reduce_threshold_chars
+    
+    async def _evaluate_map_reduce(
+        self,
+        text: str,
+        match: Optional[RevisionMatch] = None,
+        originality: Optional[OriginalityReport] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]], Optional[RevisionInfo]]:
         """
+        Avalia um documento longo por seções
+        
+        Cada seção (ou trecho limitado dela) é analisada em paralelo com um prompt
+        menor; as análises parciais são então consolidadas no formato da avaliação
+        completa. Trechos idênticos aos de uma versão anterior reaproveitam a análise
+        já feita; apenas os alterados e a consolidação vão ao modelo.
+        
+        Args:
+            text: Texto completo do TCC
+            match: Versão anterior do documento, se houver
+            originality: Triagem de originalidade (enviada na consolidação)
+            
+        Returns:
+            Tuple: (dados brutos da avaliação consolidada, análises por hash de trecho,
+            resumo do reaproveitamento ou None)
+        """
+        chunks = plan_section_chunks(text, settings.map_reduce_chunk_chars)
+        hashes = [section_hash(section.title, section.text) for section in chunks]
+        previous = (match.record.get("analyses") or {}) if match is not None else {}
+        semaphore = asyncio.Semaphore(max(1, settings.map_reduce_concurrency))
+        
+        async def analyze(title: str, chunk: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.perplexity_client.evaluate_section(title, chunk)
+        
+        tasks = {
+            index: asyncio.ensure_future(analyze(section.title, section.text))
+            for index, (section, chunk_hash) in enumerate(zip(chunks, hashes))
+            if chunk_hash not in previous
+        }
         try:
-            # Extrai dados dos avaliadores
-            evaluator_1 = EvaluatorResponse(
-                name=raw_data["evaluator_1"]["name"],
-                analysis=raw_data["evaluator_1"]["analysis"],
-                score=float(raw_data["evaluator_1"]["score"])
+            results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        except BaseException:
+            # Uma seção falhou: cancela as demais para não desperdiçar chamadas
+            for task in tasks.values():
+                task.cancel()
+            raise
+        
+        section_analyses: List[Dict[str, Any]] = [
+            results[index] if index in results else previous[chunk_hash]
+            for index, chunk_hash in enumerate(hashes)
+        ]
+        
+        revision = None
+        if match is not None and len(results) < len(chunks):
+            revision = RevisionInfo(
+                previous_id=match.document_id[:16],
+                similarity=round(match.similarity, 3),
+                reused_sections=[chunks[index].title for index in range(len(chunks)) if index not in results],
+                reevaluated_sections=[chunks[index].title for index in sorted(results)]
             )
+        
+        raw_evaluation = await self.perplexity_client.reduce_evaluations(section_analyses, originality)
+        return raw_evaluation, dict(zip(hashes, section_analyses)), revision
+    
+    async def evaluate_stream(self, text: str, use_cache: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Avalia o texto do TCC em modo streaming
+        
+        Emite cada avaliador e o parecer final assim que o respectivo objeto JSON
+        é concluído pelo modelo e, por fim, a avaliação completa validada.
+        
+        Assim como em `evaluate`, requisições simultâneas para o mesmo conteúdo são
+        agrupadas: as que chegam durante o streaming recebem o resultado dele. Se o
+        cliente que iniciou o streaming desconectar, elas avaliam por conta própria.
+        
+        Args:
+            text: Texto completo do TCC
+            use_cache: Se False, ignora o cache e força uma nova avaliação
             
-            evaluator_2 = EvaluatorResponse(
-                name=raw_data["evaluator_2"]["name"],
-                analysis=raw_data["evaluator_2"]["analysis"],
-                score=float(raw_data["evaluator_2"]["score"])
-            )
+        Yields:
+            Tuple[str, Any]: (evento, dados) — eventos `evaluator_1`, `evaluator_2`,
+            `evaluator_3`, `final_verdict` (dict) e `result` (EvaluationResponse)
+        """
+        cache_key = self.get_cache_key(text)
+        
+        if use_cache and self.cache is not None:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                evaluation_response = EvaluationResponse.model_validate(cached)
+                evaluation_response.message = "Avaliação recuperada do cache"
+                evaluation_response.cached = True
+                for section in self.STREAM_SECTIONS:
+                    yield section, cached[section]
+                yield "result", evaluation_response
+                return
+        
+        task = self._in_flight.get(cache_key)
+        while task is not None:
+            # Mesmo conteúdo já em avaliação: aguarda a chamada em andamento
+            self._coalesced += 1
+            try:
+                evaluation_response = (await asyncio.shield(task)).model_copy(deep=True)
+            except _StreamAbandoned:
+                task = self._in_flight.get(cache_key)
+                continue
+            evaluated = evaluation_response.model_dump(mode="json")
+            for section in self.STREAM_SECTIONS:
+                yield section, evaluated[section]
+            yield "result", evaluation_response
+            return
+        
+        # Registra este streaming como a avaliação em andamento do conteúdo: requisições
+        # idênticas (em streaming ou não) aguardam o resultado em vez de chamar a API
+        shared = asyncio.get_running_loop().create_future()
+        self._in_flight[cache_key] = shared
+        shared.add_done_callback(lambda done, key=cache_key: self._release_in_flight(key, done))
+        try:
+            async with aclosing(self._stream_uncached(text, cache_key, shared)) as events:
+                async for event in events:
+                    yield event
+        except BaseException as e:
+            if not shared.done():
+                # Cancelamento ou desconexão do cliente: quem aguarda avalia por conta própria
+                shared.set_exception(e if isinstance(e, Exception) else _StreamAbandoned())
+            raise
+    
+    async def _stream_uncached(
+        self,
+        text: str,
+        cache_key: str,
+        shared: asyncio.Future
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Avalia o texto em streaming junto à API e publica o resultado em `shared`
+        
+        Args:
+            text: Texto completo do TCC
+            cache_key: Chave de cache do conteúdo
+            shared: Futuro aguardado pelas requisições idênticas simultâneas
             
-            evaluator_3 = EvaluatorResponse(
-                name=raw_data["evaluator_3"]["name"],
-                analysis=raw_data["evaluator_3"]["analysis"],
-                score=float(raw_data["evaluator_3"]["score"])
-            )
+        Yields:
+            Tuple[str, Any]: Eventos de `evaluate_stream`
+        """
+        parser = JsonObjectStream()
+        emitted = set()
+        EVALUATIONS_IN_FLIGHT.inc()
+        try:
+            originality = await self._screen_originality(text)
+            async for chunk in self.perplexity_client.stream_evaluation(text, originality):
+                for key, value in parser.feed(chunk):
+                    if key in self.STREAM_SECTIONS:
+                        emitted.add(key)
+                        yield key, value
             
-            # Extrai parecer final
-            final_verdict = FinalVerdict(
-                summary=raw_data["final_verdict"]["summary"],
-                final_score=float(raw_data["final_verdict"]["final_score"]),
-                recommendations=raw_data["final_verdict"]["recommendations"]
-            )
+            # Resposta interrompida: solicita a continuação em vez de uma nova avaliação
+            continuations = 0
+            while not parser.done and "{" in parser.text and continuations < settings.json_continuation_max_attempts:
+                continuations += 1
+                partial = parser.text
+                merged = merge_continuation(partial, await self.perplexity_client.continue_evaluation(text, partial, originality))
+                if merged.startswith(partial):
+                    events = parser.feed(merged[len(partial):])
+                else:
+                    # O modelo recomeçou a resposta
+                    parser = JsonObjectStream()
+                    events = parser.feed(merged)
+                for key, value in events:
+                    if key in self.STREAM_SECTIONS and key not in emitted:
+                        emitted.add(key)
+                        yield key, value
             
-            # Valida a nota final
-            calculated_score = evaluator_1.score + evaluator_2.score + evaluator_3.score
+            raw_evaluation = self._stream_members(parser, continuations)
             
-            # Se a diferença for significativa, usa a nota calculada
-            if abs(calculated_score - final_verdict.final_score) > 0.5:
-                final_verdict.final_score = min(calculated_score, 10.0)
+            # Valida a resposta completa com as mesmas regras do modo não-streaming
+            with observe_stage("validation"):
+                evaluation_response = self._parse_evaluation(raw_evaluation)
+        
+        except UpstreamUnavailableError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro durante avaliação: {str(e)}")
+        finally:
+            EVALUATIONS_IN_FLIGHT.dec()
+        
+        evaluated = evaluation_response.model_dump(mode="json")
+        if self.cache is not None:
+            await self.cache.aset(cache_key, evaluated)
+        if self.revisions is not None:
+            signature, sections, _ = await self._find_previous_version(text, cache_key, reuse=False)
+            await self._register_version(cache_key, signature, sections, evaluated)
+        shared.set_result(evaluation_response.model_copy(deep=True))
+        
+        # Seções recuperadas apenas pela correção do JSON completo
+        for section in self.STREAM_SECTIONS:
+            if section not in emitted:
+                yield section, evaluated[section]
+        yield "result", evaluation_response
+    
+    def _stream_members(self, parser: JsonObjectStream, continuations: int) -> Dict[str, Any]:
+        """
+        Obtém os dados da avaliação recebida em streaming
+        
+        Usa os membros já interpretados pelo parser incremental; se algum ficou de
+        fora (JSON malformado ou truncado), reinterpreta o texto completo de forma tolerante.
+        
+        Args:
+            parser: Parser incremental com a resposta recebida
+            continuations: Continuações solicitadas ao modelo
+            
+        Returns:
+            Dict: Dados brutos da avaliação
+        """
+        if parser.done and all(section in parser.members for section in self.STREAM_SECTIONS):
+            JSON_RESPONSES.inc(outcome="continued" if continuations else "direct")
+            return parser.members
+        
+        try:
+            with observe_stage("json_parse"):
+                data, method = loads_tolerant(parser.text, allow_truncated=True)
+        except JsonRepairError as e:
+            JSON_RESPONSES.inc(outcome="failed")
+            raise Exception(f"Erro ao parsear resposta JSON da IA: {str(e)}\nConteúdo: {parser.text[:500]}")
+        
+        JSON_RESPONSES.inc(outcome="continued" if continuations and method != "closed" else method)
+        return {**data, **parser.members} if isinstance(data, dict) else parser.members
+    
+    def _parse_evaluation(self, raw_data: Dict[str, Any]) -> EvaluationResponse:
+        """
+        Valida os dados brutos da API diretamente no modelo estruturado
+        
+        Args:
+            raw_data: Dados brutos da API
             
-            return EvaluationResponse(
-                evaluator_1=evaluator_1,
-                evaluator_2=evaluator_2,
-                evaluator_3=evaluator_3,
-                final_verdict=final_verdict,
-                success=True,
-                message="Avaliação concluída com sucesso"
+        Returns:
+            EvaluationResponse: Modelo validado
+        """
+        try:
+            evaluation_response = EvaluationResponse.model_validate({
+                **{section: raw_data[section] for section in self.STREAM_SECTIONS if section in raw_data},
+                "success": True,
+                "message": "Avaliação concluída com sucesso"
+            })
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
             )
+            raise Exception(f"Estrutura de resposta inválida. {problems}")
         
-        except KeyError as e:
-            raise Exception(f"Estrutura de resposta inválida. Campo faltando: {str(e)}")
-        except ValueError as e:
-            raise Exception(f"Erro ao converter valores numéricos: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Erro ao processar resposta da avaliação: {str(e)}")
-
+        # Valida a nota final
+        final_verdict = evaluation_response.final_verdict
+        calculated_score = (
+            evaluation_response.evaluator_1.score
+            + evaluation_response.evaluator_2.score
+            + evaluation_response.evaluator_3.score
+        )
+        
+        # Se a diferença for significativa, usa a nota calculada
+        if abs(calculated_score - final_verdict.final_score) > 0.5:
+            final_verdict.final_score = min(calculated_score, 10.0)
+        
+        return evaluation_response
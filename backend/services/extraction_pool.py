@@ -0,0 +1,258 @@
+"""
+Pool de processos para extração de texto fora do event loop
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+from backend.config import settings
+from backend.services.extractors import DocumentSource
+from backend.services.file_processor import FileProcessor
+
+
+def _timed_call(func: Callable, *args) -> Tuple[Any, float, float]:
+    """
+    Executa uma função dentro de um processo do pool, medindo o tempo
+
+    Returns:
+        Tuple[Any, float, float]: (resultado, início, fim) — instantes em timestamp Unix
+    """
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at, time.time()
+
+
+def _transferable(source: DocumentSource) -> Union[bytes, str]:
+    """
+    Converte o conteúdo para um tipo enviável a outro processo
+
+    Bytes e caminhos seguem como estão; memoryview, bytearray e arquivos abertos são
+    copiados para bytes.
+    """
+    if isinstance(source, (bytes, str)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+class ExtractionTimeoutError(Exception):
+    """Erro lançado quando a extração excede o tempo limite"""
+
+
+class ExtractionPool:
+    """
+    Executa `FileProcessor.process_file` em um `ProcessPoolExecutor`
+
+    Evita que o parsing síncrono de PDF/DOCX bloqueie o event loop. Conteúdos em
+    memória são enviados aos processos junto com a tarefa; arquivos grandes, pelo
+    caminho (e mapeados em memória pelo extrator). Os processos
+    são reciclados após um número configurável de tarefas para limitar o
+    crescimento de memória, e extrações que excedem o tempo limite têm o processo
+    encerrado.
+    """
+
+    def __init__(self, workers: int = 2, max_tasks_per_worker: int = 50, timeout_seconds: float = 60.0):
+        """
+        Args:
+            workers: Número de processos (0 = executa em thread, sem isolamento)
+            max_tasks_per_worker: Tarefas por processo antes de reciclá-lo (0 = sem reciclagem)
+            timeout_seconds: Tempo limite de cada extração
+        """
+        self.workers = workers
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.timeout_seconds = timeout_seconds
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Cria um novo executor com a configuração atual"""
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            max_tasks_per_child=self.max_tasks_per_worker or None
+        )
+
+    def start(self):
+        """Inicializa o pool (chamado no startup da aplicação)"""
+        with self._lock:
+            if self.workers > 0 and self._executor is None:
+                self._executor = self._create_executor()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Encerra o pool (chamado no shutdown da aplicação)
+
+        Args:
+            wait: Se True, aguarda as extrações em andamento terminarem
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending = set()
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    @property
+    def queue_depth(self) -> int:
+        """Número de extrações submetidas e ainda não concluídas"""
+        return len(self._pending)
+
+    def _submit(self, func: Callable, *args) -> Tuple[ProcessPoolExecutor, Future]:
+        """Submete uma tarefa ao executor atual"""
+        self.start()
+        with self._lock:
+            executor = self._executor
+            future = executor.submit(_timed_call, func, *args)
+            self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return executor, future
+
+    def _replace_executor(self, executor: ProcessPoolExecutor, terminate: bool):
+        """
+        Substitui um executor problemático por um novo
+
+        Args:
+            executor: Executor a ser aposentado
+            terminate: Se True, encerra seus processos após as demais tarefas terminarem
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._create_executor()
+            others = {future for future in self._pending if not future.done()}
+
+        def _retire():
+            if terminate:
+                # Dá às demais extrações do executor antigo a chance de concluir
+                wait(others, timeout=self.timeout_seconds)
+                for process in list((getattr(executor, "_processes", None) or {}).values()):
+                    process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        threading.Thread(target=_retire, name="extraction-pool-retire", daemon=True).start()
+
+    async def _run(self, filename: str, func: Callable, *args) -> Tuple[Any, float, float]:
+        """
+        Executa uma função de extração no pool, aplicando o tempo limite
+
+        Args:
+            filename: Nome do arquivo (para mensagens de erro)
+            func: Função a executar (deve ser serializável via pickle)
+
+        Returns:
+            Tuple[Any, float, float]: (resultado, início, fim)
+        """
+        if self.workers <= 0:
+            return await asyncio.wait_for(
+                asyncio.to_thread(_timed_call, func, *args),
+                timeout=self.timeout_seconds
+            )
+
+        executor, future = self._submit(func, *args)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout=self.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            if not future.cancel():
+                # Extração já em execução: recicla o processo travado
+                self._replace_executor(executor, terminate=True)
+            raise ExtractionTimeoutError(
+                f"Tempo limite de extração excedido ({self.timeout_seconds:g}s) para {filename}"
+            )
+        except BrokenProcessPool:
+            self._replace_executor(executor, terminate=False)
+            raise Exception(f"Processo de extração interrompido inesperadamente ao processar {filename}")
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Divide as páginas de um PDF em intervalos contíguos, um por worker"""
+        chunks = max(1, min(self.workers, page_count // max(1, settings.pdf_min_pages_per_chunk)))
+        size, remainder = divmod(page_count, chunks)
+        ranges = []
+        start = 0
+        for index in range(chunks):
+            end = start + size + (1 if index < remainder else 0)
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    async def _extract_pdf_parallel(self, source: DocumentSource, filename: str) -> Optional[Tuple[str, float, float]]:
+        """
+        Extrai um PDF longo dividindo intervalos de páginas entre os workers
+
+        Returns:
+            Optional[Tuple[str, float, float]]: (texto, início, fim), ou None se o PDF
+            for curto demais para compensar a divisão
+        """
+        try:
+            page_count, _, _ = await self._run(filename, FileProcessor.count_pdf_pages, source)
+            if page_count < settings.pdf_parallel_min_pages:
+                return None
+
+            results = await asyncio.gather(*(
+                self._run(filename, FileProcessor.extract_pdf_page_range, source, start, end)
+                for start, end in self._page_ranges(page_count)
+            ))
+
+            # Junta as páginas na ordem original em uma única operação
+            pages = (page for range_pages, _, _ in results for page in range_pages)
+            try:
+                text = FileProcessor.join_pdf_pages(pages)
+            except Exception as e:
+                raise Exception(f"Erro ao extrair texto do PDF: {str(e)}")
+            FileProcessor.validate_extracted_text(text)
+
+        except ExtractionTimeoutError:
+            raise
+        except Exception as e:
+            raise Exception(f"Erro ao processar arquivo {filename}: {str(e)}")
+
+        started_at = min(started for _, started, _ in results)
+        finished_at = max(finished for _, _, finished in results)
+        return text, started_at, finished_at
+
+    async def extract(self, source: DocumentSource, filename: str) -> Tuple[str, str, Dict[str, float]]:
+        """
+        Extrai o texto de um arquivo em um processo separado
+
+        PDFs longos têm suas páginas divididas entre os workers disponíveis.
+
+        Args:
+            source: Conteúdo do arquivo (bytes, memoryview, arquivo aberto ou caminho)
+            filename: Nome original do arquivo
+
+        Returns:
+            Tuple[str, str, Dict[str, float]]: (texto_extraído, tipo_arquivo, tempos) — tempos
+            contém `extraction_queue_wait` e `extraction_time`, em segundos
+        """
+        submitted_at = time.time()
+        parallel = None
+        if self.workers > 0:
+            source = _transferable(source)
+
+        if (
+            self.workers > 1
+            and settings.pdf_parallel_min_pages > 0
+            and FileProcessor.is_allowed_file(filename)
+            and FileProcessor.get_file_extension(filename) == ".pdf"
+        ):
+            parallel = await self._extract_pdf_parallel(source, filename)
+
+        if parallel is not None:
+            text, started_at, finished_at = parallel
+            file_type = "PDF"
+        else:
+            (text, file_type), started_at, finished_at = await self._run(
+                filename, FileProcessor.process_file, source, filename
+            )
+
+        timings = {
+            "extraction_queue_wait": round(max(0.0, started_at - submitted_at), 4),
+            "extraction_time": round(finished_at - started_at, 4)
+        }
+        return text, file_type, timings
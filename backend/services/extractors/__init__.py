@@ -0,0 +1,273 @@
+"""
+Registro de extratores de texto por formato de arquivo
+
+Cada extrator fica em um módulo próprio, importado apenas no primeiro uso: as
+dependências pesadas (como o PyPDF2) não são carregadas por workers que só
+avaliam texto. O formato é escolhido pela extensão do arquivo e confirmado pelos
+primeiros bytes do conteúdo (magic bytes).
+
+Cada módulo de extrator expõe `extract(source: DocumentSource) -> str`. O conteúdo
+pode estar em memória (bytes, memoryview ou arquivo aberto), sem passar pelo disco,
+ou em um arquivo, mapeado em memória (mmap) quando grande.
+"""
+import importlib
+import io
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from types import ModuleType
+from typing import BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from backend.config import settings
+
+
+# Conteúdo de um documento: caminho de arquivo, bytes em memória ou arquivo binário aberto
+DocumentSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+# Separador de páginas no texto extraído de PDFs (o normalizador usa os limites de
+# página para remover cabeçalhos, rodapés e numeração e o troca por uma linha em branco)
+PAGE_BREAK = "\f"
+
+# Bytes lidos do início do arquivo para reconhecer o formato
+SNIFF_BYTES = 2048
+
+# Arquivos em disco a partir deste tamanho são mapeados em memória em vez de lidos
+MMAP_MIN_BYTES = 1024 * 1024
+
+
+class ExtractorSpec(NamedTuple):
+    """Formato de arquivo suportado e o módulo que extrai seu texto"""
+    name: str
+    extensions: Tuple[str, ...]
+    module: str
+    sniff: Optional[Callable[[bytes], bool]] = None
+    requirement: Optional[str] = None
+
+
+def _is_pdf(head: bytes) -> bool:
+    return b"%PDF-" in head[:1024]
+
+
+def _is_zip(head: bytes) -> bool:
+    return head.startswith(b"PK\x03\x04")
+
+
+def _is_odt(head: bytes) -> bool:
+    # O primeiro membro de um pacote OpenDocument é `mimetype`, sem compressão
+    return _is_zip(head) and head[30:38] == b"mimetype" and b"opendocument.text" in head[38:100]
+
+
+def _is_docx(head: bytes) -> bool:
+    return _is_zip(head) and (b"[Content_Types].xml" in head or b"word/" in head)
+
+
+def _is_rtf(head: bytes) -> bool:
+    return head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"{\\rtf")
+
+
+def _is_html(head: bytes) -> bool:
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:64].lower()
+    return start.startswith(b"<!doctype html") or start.startswith(b"<html")
+
+
+_REGISTRY: Dict[str, ExtractorSpec] = {}
+_BY_EXTENSION: Dict[str, ExtractorSpec] = {}
+_loaded: Dict[str, ModuleType] = {}
+_load_lock = threading.Lock()
+
+
+def _map_file(file: BinaryIO) -> Optional[mmap.mmap]:
+    """Mapeia um arquivo aberto em memória (somente leitura), se for grande o bastante"""
+    size = os.fstat(file.fileno()).st_size
+    if size < MMAP_MIN_BYTES:
+        return None
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@contextmanager
+def open_source(source: DocumentSource) -> Iterator[BinaryIO]:
+    """
+    Abre o conteúdo de um documento como fluxo binário com seek (para zipfile, PyPDF2 etc.)
+
+    Bytes e memoryviews são lidos em memória; arquivos grandes em disco são mapeados
+    com mmap; arquivos já abertos são reposicionados no início e não são fechados.
+
+    Args:
+        source: Caminho, bytes, memoryview ou arquivo binário aberto
+
+    Yields:
+        BinaryIO: Fluxo posicionado no início do conteúdo
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            mapped = _map_file(file)
+            if mapped is None:
+                yield file
+            else:
+                with mapped:
+                    yield mapped
+    else:
+        source.seek(0)
+        yield source
+
+
+@contextmanager
+def source_buffer(source: DocumentSource) -> Iterator[Union[bytes, bytearray, memoryview, mmap.mmap]]:
+    """
+    Conteúdo de um documento como buffer contíguo, sem cópia quando já está em memória
+
+    Args:
+        source: Caminho, bytes, memoryview ou arquivo binário aberto
+
+    Yields:
+        Objeto com o protocolo de buffer (bytes, memoryview ou mmap)
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield source
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            mapped = _map_file(file)
+            if mapped is None:
+                yield file.read()
+            else:
+                with mapped:
+                    yield mapped
+    else:
+        source.seek(0)
+        yield source.read()
+
+
+def read_head(source: DocumentSource, size: int = SNIFF_BYTES) -> bytes:
+    """Primeiros `size` bytes do conteúdo (para reconhecer o formato)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size])
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            return file.read(size)
+    source.seek(0)
+    return source.read(size)
+
+
+def register(spec: ExtractorSpec):
+    """
+    Registra um extrator (substitui o registro anterior de mesmo nome)
+
+    Args:
+        spec: Formato, extensões, módulo e reconhecimento por magic bytes
+    """
+    previous = _REGISTRY.get(spec.name)
+    if previous is not None:
+        for extension in previous.extensions:
+            _BY_EXTENSION.pop(extension, None)
+    _REGISTRY[spec.name] = spec
+    for extension in spec.extensions:
+        _BY_EXTENSION[extension.lower()] = spec
+
+
+register(ExtractorSpec("PDF", (".pdf",), "backend.services.extractors.pdf", _is_pdf, "PyPDF2"))
+register(ExtractorSpec("DOCX", (".docx",), "backend.services.extractors.docx", _is_docx))
+register(ExtractorSpec("ODT", (".odt",), "backend.services.extractors.odt", _is_odt))
+register(ExtractorSpec("RTF", (".rtf",), "backend.services.extractors.rtf", _is_rtf))
+register(ExtractorSpec("HTML", (".html", ".htm"), "backend.services.extractors.html", _is_html))
+register(ExtractorSpec("MD", (".md", ".markdown"), "backend.services.extractors.markdown"))
+register(ExtractorSpec("TXT", (".txt",), "backend.services.extractors.txt"))
+
+
+def registered_extensions() -> List[str]:
+    """Extensões de todos os extratores registrados"""
+    return sorted(_BY_EXTENSION)
+
+
+def allowed_extensions() -> List[str]:
+    """
+    Extensões aceitas: as de `Settings.allowed_file_types` que têm extrator registrado
+
+    Returns:
+        List[str]: Extensões (todas as registradas, se a configuração estiver vazia)
+    """
+    if not settings.allowed_file_types:
+        return registered_extensions()
+    configured = {extension.lower() if extension.startswith(".") else f".{extension.lower()}"
+                  for extension in settings.allowed_file_types}
+    return sorted(extension for extension in _BY_EXTENSION if extension in configured)
+
+
+def spec_for_extension(extension: str) -> Optional[ExtractorSpec]:
+    """Extrator registrado para uma extensão (ex.: ".pdf"), se houver"""
+    return _BY_EXTENSION.get(extension.lower())
+
+
+def sniff_format(head: bytes, candidates: Optional[List[str]] = None) -> Optional[ExtractorSpec]:
+    """
+    Reconhece o formato pelos primeiros bytes do conteúdo
+
+    Args:
+        head: Início do arquivo (ver `SNIFF_BYTES`)
+        candidates: Extensões consideradas (None = todas as registradas)
+
+    Returns:
+        Optional[ExtractorSpec]: Formato reconhecido, ou None (ex.: texto puro)
+    """
+    allowed = set(candidates) if candidates is not None else None
+    for spec in _REGISTRY.values():
+        if spec.sniff is None:
+            continue
+        if allowed is not None and not allowed.intersection(spec.extensions):
+            continue
+        if spec.sniff(head):
+            return spec
+    return None
+
+
+def detect(source: DocumentSource, extension: str) -> ExtractorSpec:
+    """
+    Escolhe o extrator de um documento
+
+    O conteúdo prevalece sobre a extensão quando identifica outro formato aceito
+    (ex.: um PDF salvo como .txt); sem assinatura reconhecida, vale a extensão.
+
+    Args:
+        source: Conteúdo do documento (caminho, bytes ou arquivo aberto)
+        extension: Extensão do nome original (ex.: ".pdf")
+
+    Returns:
+        ExtractorSpec: Extrator escolhido
+
+    Raises:
+        ValueError: Se a extensão não tiver extrator registrado
+    """
+    by_extension = spec_for_extension(extension)
+    if by_extension is None:
+        raise ValueError(f"Extensão não suportada: {extension}")
+
+    by_content = sniff_format(read_head(source), allowed_extensions())
+    return by_content or by_extension
+
+
+def load(spec: ExtractorSpec) -> ModuleType:
+    """
+    Importa (na primeira chamada) o módulo de um extrator
+
+    Raises:
+        RuntimeError: Se uma dependência do extrator não estiver instalada
+    """
+    module = _loaded.get(spec.name)
+    if module is not None:
+        return module
+    with _load_lock:
+        module = _loaded.get(spec.name)
+        if module is None:
+            try:
+                module = importlib.import_module(spec.module)
+            except ImportError as e:
+                hint = f" (pip install {spec.requirement})" if spec.requirement else ""
+                raise RuntimeError(f"Extrator {spec.name} indisponível: {e}{hint}")
+            _loaded[spec.name] = module
+    return module
+
+
+def loaded_extractors() -> List[str]:
+    """Nomes dos extratores já importados neste processo"""
+    return sorted(_loaded)
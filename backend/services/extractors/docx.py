@@ -0,0 +1,203 @@
+"""
+Extração de texto de DOCX lendo `word/document.xml` diretamente do pacote OOXML
+
+O XML é lido do zip em fluxo (ElementTree.iterparse), sem montar o modelo de
+objetos do python-docx: cada parágrafo e cada linha de tabela é descartado assim
+que seu texto é emitido, de modo que a memória usada não cresce com o documento.
+
+O texto de cada bloco segue as regras do python-docx 1.1 (usado antes desta
+implementação): parágrafos e tabelas do corpo, sem tabelas aninhadas nem
+conteúdo dentro de controles de conteúdo ou revisões; células mescladas repetem o
+texto uma vez por coluna da grade. Parágrafos e células são emitidos na ordem do
+documento.
+"""
+import posixpath
+import zipfile
+from collections import deque
+from typing import Deque, Iterator, Optional, IO
+from xml.etree import ElementTree
+from backend.services.extractors import DocumentSource, open_source
+
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_OFFICE_DOCUMENT_REL = "/officeDocument"
+DEFAULT_DOCUMENT_PART = "word/document.xml"
+
+
+def _w(tag: str) -> str:
+    return f"{{{_W_NS}}}{tag}"
+
+
+_BODY = _w("body")
+_P = _w("p")
+_R = _w("r")
+_HYPERLINK = _w("hyperlink")
+_TBL = _w("tbl")
+_TBL_GRID = _w("tblGrid")
+_GRID_COL = _w("gridCol")
+_TR = _w("tr")
+_TC = _w("tc")
+_TC_PR = _w("tcPr")
+_GRID_SPAN = _w("gridSpan")
+_V_MERGE = _w("vMerge")
+_VAL = _w("val")
+_TYPE = _w("type")
+
+# Conteúdo de uma run e seu equivalente em texto (w:t e w:br são tratados à parte)
+_T = _w("t")
+_BR = _w("br")
+_RUN_CHARACTERS = {
+    _w("tab"): "\t",
+    _w("ptab"): "\t",
+    _w("cr"): "\n",
+    _w("noBreakHyphen"): "-"
+}
+
+
+def _run_text(run: ElementTree.Element) -> str:
+    parts = []
+    for child in run:
+        if child.tag == _T:
+            parts.append(child.text or "")
+        elif child.tag == _BR:
+            # Quebras de página e de coluna não viram texto
+            if child.get(_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        else:
+            parts.append(_RUN_CHARACTERS.get(child.tag, ""))
+    return "".join(parts)
+
+
+def _paragraph_text(paragraph: ElementTree.Element) -> str:
+    """Texto das runs e hyperlinks filhos diretos do parágrafo"""
+    parts = []
+    for child in paragraph:
+        if child.tag == _R:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            parts.extend(_run_text(run) for run in child if run.tag == _R)
+    return "".join(parts)
+
+
+class _TableState:
+    """
+    Células de uma tabela do corpo, emitidas linha a linha
+
+    Reproduz a grade do python-docx: cada célula ocupa `gridSpan` colunas (repetindo
+    o texto), uma continuação de mesclagem vertical repete a célula da linha de cima
+    e cada linha tem exatamente o número de colunas da grade.
+    """
+
+    def __init__(self):
+        self.columns = 0
+        self.rows = 0
+        self.emitted = 0
+        self.recent: Deque[str] = deque()
+        self.pending: Deque[str] = deque()
+
+    def set_columns(self, columns: int):
+        self.columns = columns
+        self.recent = deque(maxlen=max(columns, 1))
+
+    def add_row(self, row: ElementTree.Element) -> Iterator[str]:
+        for cell in row:
+            if cell.tag != _TC:
+                continue
+            span, continues = 1, False
+            properties = cell.find(_TC_PR)
+            if properties is not None:
+                grid_span = properties.find(_GRID_SPAN)
+                if grid_span is not None:
+                    span = int(grid_span.get(_VAL, "1"))
+                v_merge = properties.find(_V_MERGE)
+                continues = v_merge is not None and v_merge.get(_VAL, "continue") == "continue"
+            text = "\n".join(_paragraph_text(p) for p in cell if p.tag == _P)
+
+            for index in range(span):
+                if continues and self.columns and len(self.recent) == self.columns:
+                    value = self.recent[0]
+                elif index > 0:
+                    value = self.recent[-1]
+                else:
+                    value = text
+                self.recent.append(value)
+                self.pending.append(value)
+
+        self.rows += 1
+        limit = self.rows * self.columns
+        while self.pending and self.emitted < limit:
+            value = self.pending.popleft()
+            self.emitted += 1
+            if value.strip():
+                yield value
+
+
+def document_part_name(archive: zipfile.ZipFile) -> str:
+    """Nome do documento principal no pacote, pela relação officeDocument de `_rels/.rels`"""
+    try:
+        with archive.open("_rels/.rels") as rels:
+            for relationship in ElementTree.parse(rels).getroot().iter(f"{{{_REL_NS}}}Relationship"):
+                if relationship.get("Type", "").endswith(_OFFICE_DOCUMENT_REL):
+                    target = posixpath.normpath(relationship.get("Target", "").lstrip("/"))
+                    if target in archive.NameToInfo:
+                        return target
+    except KeyError:
+        pass
+    return DEFAULT_DOCUMENT_PART
+
+
+def iter_blocks(source: IO[bytes]) -> Iterator[str]:
+    """
+    Percorre `document.xml` em fluxo e gera o texto de parágrafos e células, em ordem
+
+    Args:
+        source: XML do documento principal
+
+    Yields:
+        str: Texto não vazio de cada parágrafo do corpo ou célula de tabela
+    """
+    stack = []
+    body: Optional[ElementTree.Element] = None
+    table: Optional[_TableState] = None
+
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parent = stack[-1] if stack else None
+            stack.append(element)
+            if element.tag == _BODY and parent is not None and len(stack) == 2:
+                body = element
+            elif element.tag == _TBL and parent is body is not None:
+                table = _TableState()
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if body is None:
+            continue
+
+        if parent is body:
+            if element.tag == _P:
+                text = _paragraph_text(element)
+                if text.strip():
+                    yield text
+            elif element.tag == _TBL:
+                table = None
+            # Descarta o bloco já processado (e qualquer outro filho do corpo)
+            body.remove(element)
+        elif table is not None and len(stack) == 3 and parent.tag == _TBL:
+            if element.tag == _TBL_GRID:
+                table.set_columns(sum(1 for column in element if column.tag == _GRID_COL))
+            elif element.tag == _TR:
+                yield from table.add_row(element)
+                parent.remove(element)
+
+
+def extract(source: DocumentSource) -> str:
+    """Extrai texto de arquivo DOCX"""
+    try:
+        with open_source(source) as stream, zipfile.ZipFile(stream) as archive:
+            with archive.open(document_part_name(archive)) as document:
+                return "\n\n".join(iter_blocks(document))
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do DOCX: {str(e)}")
@@ -0,0 +1,108 @@
+"""
+Extração de texto de HTML com o parser da biblioteca padrão
+"""
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+from backend.services.extractors import DocumentSource, source_buffer
+from backend.services.extractors.txt import ENCODINGS
+
+
+# Elementos cujo conteúdo não é texto do documento
+_SKIPPED_TAGS = frozenset({"script", "style", "head", "template", "noscript", "svg", "iframe", "object"})
+
+# Elementos que delimitam parágrafos
+_BLOCK_TAGS = frozenset({
+    "p", "div", "br", "li", "ul", "ol", "dl", "dt", "dd", "h1", "h2", "h3", "h4", "h5", "h6",
+    "table", "tr", "td", "th", "caption", "thead", "tbody", "tfoot", "section", "article",
+    "header", "footer", "main", "aside", "nav", "blockquote", "pre", "figure", "figcaption",
+    "hr", "address", "details", "summary"
+})
+
+_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w-]+)", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class _TextCollector(HTMLParser):
+    """Coleta o texto visível, um parágrafo por elemento de bloco"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs: List[str] = []
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._pre_depth = 0
+
+    def _flush(self):
+        text = "".join(self._current)
+        if not self._pre_depth:
+            text = _WHITESPACE_RE.sub(" ", text)
+        text = text.strip()
+        if text:
+            self.paragraphs.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            if tag == "pre":
+                self._pre_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self._flush()
+            if tag == "pre":
+                self._pre_depth = max(0, self._pre_depth - 1)
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def decode_html(data) -> str:
+    """Decodifica o HTML pela codificação declarada em <meta charset> ou, na falta dela, por `ENCODINGS`"""
+    match = _CHARSET_RE.search(data[:4096])
+    encodings = ([match.group(1).decode("ascii")] if match else []) + list(ENCODINGS)
+    for encoding in encodings:
+        try:
+            return str(data, encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return str(data, "utf-8", "replace")
+
+
+def html_to_text(html: str) -> str:
+    """
+    Converte HTML em texto puro
+
+    Args:
+        html: Documento HTML
+
+    Returns:
+        str: Parágrafos separados por linha em branco
+    """
+    collector = _TextCollector()
+    collector.feed(html)
+    collector.close()
+    return "\n\n".join(collector.paragraphs)
+
+
+def extract(source: DocumentSource) -> str:
+    """Extrai texto de arquivo HTML"""
+    try:
+        with source_buffer(source) as data:
+            return html_to_text(decode_html(data))
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do HTML: {str(e)}")
@@ -0,0 +1,111 @@
+"""
+Extração de texto de Markdown: remove a marcação e mantém o conteúdo
+"""
+import re
+from typing import List
+from backend.services.extractors import DocumentSource
+from backend.services.extractors.txt import read_text
+
+
+_FRONT_MATTER_RE = re.compile(r"\A---\s*\n.*?\n(---|\.\.\.)\s*\n", re.DOTALL)
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.*?)\s*#*\s*$")
+_SETEXT_RE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+_RULE_RE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+_REFERENCE_DEFINITION_RE = re.compile(r"^\s{0,3}\[[^\]]+\]:\s+\S+.*$")
+_BLOCKQUOTE_RE = re.compile(r"^\s{0,3}(>\s?)+")
+_LIST_MARKER_RE = re.compile(r"^(\s*)([-*+]|\d{1,9}[.)])\s+(\[[ xX]\]\s+)?")
+_TABLE_SEPARATOR_RE = re.compile(r"^\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+
+_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_LINK_RE = re.compile(r"\[([^\]]+)\](\([^)]*\)|\[[^\]]*\])")
+_AUTOLINK_RE = re.compile(r"<((?:https?|mailto):[^>\s]+)>")
+_HTML_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+_INLINE_CODE_RE = re.compile(r"`+([^`]+?)`+")
+_STRONG_RE = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_EMPHASIS_RE = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+_STRIKE_RE = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+_ESCAPE_RE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!|>~])")
+
+
+def _inline(text: str) -> str:
+    """Remove a marcação de linha (links, imagens, ênfase, código)"""
+    text = _IMAGE_RE.sub(r"\1", text)
+    text = _LINK_RE.sub(r"\1", text)
+    text = _AUTOLINK_RE.sub(r"\1", text)
+    text = _HTML_TAG_RE.sub("", text)
+    text = _INLINE_CODE_RE.sub(r"\1", text)
+    text = _STRONG_RE.sub(r"\2", text)
+    text = _EMPHASIS_RE.sub(r"\2", text)
+    text = _STRIKE_RE.sub(r"\1", text)
+    return _ESCAPE_RE.sub(r"\1", text)
+
+
+def markdown_to_text(markdown: str) -> str:
+    """
+    Converte Markdown em texto puro
+
+    Títulos viram linhas próprias (reconhecidas pela divisão em seções), blocos
+    de código são mantidos sem os delimitadores e linhas de tabela têm as
+    células separadas por tabulação.
+
+    Args:
+        markdown: Documento Markdown
+
+    Returns:
+        str: Parágrafos separados por linha em branco
+    """
+    markdown = _FRONT_MATTER_RE.sub("", markdown.replace("\r\n", "\n"))
+    paragraphs: List[str] = []
+    current: List[str] = []
+    in_code = False
+
+    def flush():
+        if current:
+            paragraphs.append("\n".join(current))
+            current.clear()
+
+    for line in markdown.split("\n"):
+        if _FENCE_RE.match(line):
+            flush()
+            in_code = not in_code
+            continue
+        if in_code:
+            current.append(line)
+            continue
+        if not line.strip():
+            flush()
+            continue
+
+        heading = _HEADING_RE.match(line)
+        if heading:
+            flush()
+            paragraphs.append(_inline(heading.group(1)))
+            continue
+        if _SETEXT_RE.match(line) and current:
+            # Sublinhado de título: a linha anterior é o título
+            title = current.pop()
+            flush()
+            paragraphs.append(title)
+            continue
+        if _RULE_RE.match(line) or _REFERENCE_DEFINITION_RE.match(line) or _TABLE_SEPARATOR_RE.match(line):
+            continue
+
+        line = _BLOCKQUOTE_RE.sub("", line)
+        line = _LIST_MARKER_RE.sub(r"\1", line).strip()
+        if "|" in line and line.startswith("|"):
+            line = "\t".join(cell.strip() for cell in line.strip("|").split("|"))
+        line = _inline(line)
+        if line:
+            current.append(line)
+    flush()
+
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph.strip())
+
+
+def extract(source: DocumentSource) -> str:
+    """Extrai texto de arquivo Markdown"""
+    try:
+        return markdown_to_text(read_text(source))
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do Markdown: {str(e)}")
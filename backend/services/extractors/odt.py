@@ -0,0 +1,66 @@
+"""
+Extração de texto de ODT (OpenDocument Text) com zipfile e ElementTree, sem dependências externas
+"""
+import zipfile
+from typing import List
+from xml.etree import ElementTree
+from backend.services.extractors import DocumentSource, open_source
+
+
+_TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+_OFFICE_NS = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+
+_PARAGRAPH_TAGS = {f"{{{_TEXT_NS}}}p", f"{{{_TEXT_NS}}}h"}
+_SPACE_TAG = f"{{{_TEXT_NS}}}s"
+_TAB_TAG = f"{{{_TEXT_NS}}}tab"
+_LINE_BREAK_TAG = f"{{{_TEXT_NS}}}line-break"
+
+# Conteúdo fora do corpo do texto: notas de rodapé, comentários e alterações rastreadas
+# (a extração de DOCX também não inclui notas nem comentários)
+_SKIPPED_TAGS = {
+    f"{{{_TEXT_NS}}}note",
+    f"{{{_TEXT_NS}}}tracked-changes",
+    f"{{{_OFFICE_NS}}}annotation"
+}
+
+
+def _paragraph_text(element: ElementTree.Element) -> str:
+    """Texto de um parágrafo, com espaços, tabulações e quebras de linha codificados como elementos"""
+    parts = [element.text or ""]
+    for child in element:
+        if child.tag == _SPACE_TAG:
+            parts.append(" " * int(child.get(f"{{{_TEXT_NS}}}c", "1")))
+        elif child.tag == _TAB_TAG:
+            parts.append("\t")
+        elif child.tag == _LINE_BREAK_TAG:
+            parts.append("\n")
+        elif child.tag not in _SKIPPED_TAGS:
+            parts.append(_paragraph_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _collect(element: ElementTree.Element, paragraphs: List[str]):
+    """Percorre o documento em ordem, coletando parágrafos e títulos (inclusive de tabelas e listas)"""
+    for child in element:
+        if child.tag in _PARAGRAPH_TAGS:
+            text = _paragraph_text(child)
+            if text.strip():
+                paragraphs.append(text)
+        elif child.tag not in _SKIPPED_TAGS:
+            _collect(child, paragraphs)
+
+
+def extract(source: DocumentSource) -> str:
+    """Extrai texto de arquivo ODT"""
+    try:
+        with open_source(source) as stream, zipfile.ZipFile(stream) as archive:
+            with archive.open("content.xml") as content:
+                root = ElementTree.parse(content).getroot()
+
+        body = root.find(f"{{{_OFFICE_NS}}}body")
+        paragraphs: List[str] = []
+        _collect(body if body is not None else root, paragraphs)
+        return "\n\n".join(paragraphs)
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do ODT: {str(e)}")
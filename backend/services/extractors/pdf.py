@@ -0,0 +1,86 @@
+"""
+Extração de texto de PDF (PyPDF2)
+"""
+from typing import Iterable, Iterator, List, Optional
+import PyPDF2
+from backend.services.extractors import PAGE_BREAK, DocumentSource, open_source
+
+
+def count_pages(source: DocumentSource) -> int:
+    """Retorna o número de páginas de um arquivo PDF"""
+    try:
+        with open_source(source) as file:
+            return len(PyPDF2.PdfReader(file).pages)
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do PDF: {str(e)}")
+
+
+def iter_pages(source: DocumentSource, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """
+    Extrai o texto das páginas de um PDF, uma a uma, à medida que são decodificadas
+
+    Páginas vazias ou com erro de extração são ignoradas.
+
+    Args:
+        source: Conteúdo do PDF (caminho, bytes ou arquivo aberto)
+        start: Índice da primeira página (0-based)
+        end: Índice final exclusivo (None = até a última página)
+
+    Yields:
+        str: Texto de cada página com conteúdo
+    """
+    with open_source(source) as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        total_pages = len(pdf_reader.pages)
+        end = total_pages if end is None else min(end, total_pages)
+
+        for page_num in range(start, end):
+            try:
+                page_text = pdf_reader.pages[page_num].extract_text()
+            except Exception as e:
+                print(f"Aviso: Erro ao extrair página {page_num + 1}: {e}")
+                continue
+
+            if page_text and page_text.strip():
+                yield page_text
+
+
+def extract_page_range(source: DocumentSource, start: int, end: int) -> List[str]:
+    """
+    Extrai o texto de um intervalo de páginas de um PDF
+
+    Args:
+        source: Conteúdo do PDF (caminho, bytes ou arquivo aberto)
+        start: Índice da primeira página (0-based)
+        end: Índice final exclusivo
+
+    Returns:
+        List[str]: Texto de cada página com conteúdo, em ordem
+    """
+    try:
+        return list(iter_pages(source, start, end))
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do PDF: {str(e)}")
+
+
+def join_pages(pages: Iterable[str]) -> str:
+    """
+    Monta o texto final do PDF a partir das páginas (em uma única junção)
+
+    As páginas são separadas por `PAGE_BREAK` entre linhas próprias.
+
+    Raises:
+        Exception: Se nenhuma página contiver texto
+    """
+    text = f"\n{PAGE_BREAK}\n".join(page.replace(PAGE_BREAK, "\n") for page in pages).strip()
+    if not text:
+        raise Exception("Não foi possível extrair texto do PDF. O arquivo pode estar vazio ou protegido.")
+    return text
+
+
+def extract(source: DocumentSource) -> str:
+    """Extrai texto de arquivo PDF usando PyPDF2"""
+    try:
+        return join_pages(iter_pages(source))
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do PDF: {str(e)}")
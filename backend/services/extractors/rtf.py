@@ -0,0 +1,124 @@
+"""
+Extração de texto de RTF, sem dependências externas
+"""
+import codecs
+import re
+from typing import List
+from backend.services.extractors import DocumentSource, source_buffer
+from backend.services.extractors.txt import decode_text
+
+
+_TOKEN_RE = re.compile(
+    r"\\([a-zA-Z]{1,32})(-?\d{1,10})? ?"  # palavra de controle com parâmetro opcional
+    r"|\\'([0-9a-fA-F]{2})"  # caractere pelo código na página de código do documento
+    r"|\\([^a-zA-Z])"  # símbolo de controle (\\, \{, \}, \~, \*...)
+    r"|([{}])"
+    r"|[\r\n]+"
+    r"|([^\\{}\r\n]+)"
+)
+
+# Destinos cujo conteúdo não faz parte do texto do documento
+_IGNORED_DESTINATIONS = frozenset({
+    "fonttbl", "colortbl", "stylesheet", "listtable", "listoverridetable", "info", "pict",
+    "object", "header", "headerl", "headerr", "headerf", "footer", "footerl", "footerr",
+    "footerf", "footnote", "annotation", "themedata", "colorschememapping", "latentstyles",
+    "datastore", "xmlnstbl", "rsidtbl", "generator", "fldinst", "filetbl", "revtbl", "bkmkstart",
+    "bkmkend", "nonshppict", "mmathPr", "pgdsctbl", "userprops", "wgrffmtfilter"
+})
+
+_SPECIAL_WORDS = {
+    "par": "\n", "sect": "\n", "page": "\n", "line": "\n", "row": "\n", "cell": "\n",
+    "tab": "\t", "emdash": "\u2014", "endash": "\u2013", "bullet": "\u2022",
+    "lquote": "\u2018", "rquote": "\u2019", "ldblquote": "\u201c", "rdblquote": "\u201d",
+    "emspace": " ", "enspace": " ", "qmspace": " "
+}
+
+_SPECIAL_SYMBOLS = {"~": "\u00a0", "-": "", "_": "-", "\\": "\\", "{": "{", "}": "}", "\n": "\n", "\r": "\n"}
+
+
+def rtf_to_text(rtf: str) -> str:
+    """
+    Converte um documento RTF em texto puro
+
+    Args:
+        rtf: Conteúdo RTF (ASCII de 7 bits, como exige o formato)
+
+    Returns:
+        str: Texto com uma linha por parágrafo
+    """
+    encoding = "cp1252"
+    out: List[str] = []
+    pending_bytes = bytearray()
+    # Pilha de grupos: (ignorar conteúdo, caracteres de substituição após \uN)
+    stack: List[tuple] = []
+    ignorable = False
+    uc_skip = 1
+    skip = 0
+
+    def flush_bytes():
+        if pending_bytes:
+            out.append(pending_bytes.decode(encoding, errors="replace"))
+            pending_bytes.clear()
+
+    for match in _TOKEN_RE.finditer(rtf):
+        word, parameter, hex_code, symbol, brace, text = match.groups()
+
+        if hex_code is not None:
+            if skip:
+                skip -= 1
+            elif not ignorable:
+                pending_bytes.append(int(hex_code, 16))
+            continue
+        flush_bytes()
+
+        if brace == "{":
+            skip = 0
+            stack.append((ignorable, uc_skip))
+        elif brace == "}":
+            skip = 0
+            if stack:
+                ignorable, uc_skip = stack.pop()
+        elif symbol is not None:
+            skip = 0
+            if symbol == "*":
+                ignorable = True
+            elif not ignorable:
+                out.append(_SPECIAL_SYMBOLS.get(symbol, ""))
+        elif word is not None:
+            skip = 0
+            if word in _IGNORED_DESTINATIONS:
+                ignorable = True
+            elif word == "ansicpg" and parameter:
+                try:
+                    encoding = codecs.lookup(f"cp{parameter}").name
+                except LookupError:
+                    pass
+            elif word == "uc" and parameter:
+                uc_skip = int(parameter)
+            elif word == "u" and parameter:
+                if not ignorable:
+                    code = int(parameter)
+                    out.append(chr(code + 65536 if code < 0 else code))
+                skip = uc_skip
+            elif not ignorable and word in _SPECIAL_WORDS:
+                out.append(_SPECIAL_WORDS[word])
+        elif text is not None:
+            if skip:
+                consumed = min(skip, len(text))
+                text = text[consumed:]
+                skip -= consumed
+            if not ignorable and text:
+                out.append(text)
+    flush_bytes()
+    return "".join(out)
+
+
+def extract(source: DocumentSource) -> str:
+    """Extrai texto de arquivo RTF"""
+    try:
+        with source_buffer(source) as data:
+            text = rtf_to_text(decode_text(data, ("latin-1",)))
+        paragraphs = [line.strip() for line in text.split("\n")]
+        return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+    except Exception as e:
+        raise Exception(f"Erro ao extrair texto do RTF: {str(e)}")
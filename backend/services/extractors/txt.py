@@ -0,0 +1,51 @@
+"""
+Extração de texto puro (TXT) com detecção de codificação
+"""
+from backend.services.extractors import DocumentSource, source_buffer
+
+# Codificações tentadas, em ordem
+ENCODINGS = ('utf-8', 'latin-1', 'iso-8859-1', 'cp1252')
+
+
+def decode_text(data, encodings=ENCODINGS) -> str:
+    """
+    Decodifica um buffer tentando as codificações em ordem, sem reler o conteúdo
+
+    As quebras de linha são normalizadas para "\\n" (como na leitura em modo texto).
+
+    Args:
+        data: bytes, memoryview ou mmap
+        encodings: Codificações tentadas
+
+    Raises:
+        Exception: Se nenhuma codificação decodificar o conteúdo
+    """
+    for encoding in encodings:
+        try:
+            text = str(data, encoding)
+        except UnicodeDecodeError:
+            continue
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    raise Exception("Não foi possível decodificar o arquivo TXT")
+
+
+def read_text(source: DocumentSource) -> str:
+    """
+    Lê um documento de texto tentando as codificações de `ENCODINGS`
+
+    Raises:
+        Exception: Se nenhuma codificação decodificar o conteúdo
+    """
+    with source_buffer(source) as data:
+        return decode_text(data)
+
+
+def extract(source: DocumentSource) -> str:
+    """Extrai texto de arquivo TXT"""
+    try:
+        return read_text(source)
+    except Exception as e:
+        raise Exception(f"Erro ao ler arquivo TXT: {str(e)}")
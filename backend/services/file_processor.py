@@ -1,17 +1,22 @@
 """
-Serviço de processamento de arquivos (PDF, DOCX, TXT)
+Serviço de processamento de arquivos (PDF, DOCX, TXT, ODT, RTF, HTML e Markdown)
+
+A extração de cada formato é feita pelo extrator registrado em
+`backend.services.extractors`, importado apenas no primeiro uso. Os métodos de
+extração aceitam o conteúdo em memória (bytes, memoryview ou arquivo aberto) ou o
+caminho de um arquivo em disco.
 """
-import os
-from typing import Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
-import PyPDF2
-from docx import Document
+from backend.services import extractors
+from backend.services.extractors import DocumentSource
 
 
 class FileProcessor:
     """Classe para processar diferentes tipos de arquivos"""
     
-    ALLOWED_EXTENSIONS = {'.pdf', '.docx', '.txt'}
+    # Extensões aceitas (extratores registrados, filtrados por `Settings.allowed_file_types`)
+    ALLOWED_EXTENSIONS = set(extractors.allowed_extensions())
     
     @staticmethod
     def get_file_extension(filename: str) -> str:
@@ -24,81 +29,100 @@ class FileProcessor:
         return FileProcessor.get_file_extension(filename) in FileProcessor.ALLOWED_EXTENSIONS
     
     @staticmethod
-    def extract_text_from_pdf(file_path: str) -> str:
-        """
-        Extrai texto de arquivo PDF usando PyPDF2
+    def _pdf():
+        return extractors.load(extractors.spec_for_extension(".pdf"))
+    
+    @classmethod
+    def count_pdf_pages(cls, source: DocumentSource) -> int:
+        """Retorna o número de páginas de um arquivo PDF"""
+        return cls._pdf().count_pages(source)
+    
+    @classmethod
+    def iter_pdf_pages(cls, source: DocumentSource, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
         """
-        text = ""
+        Extrai o texto das páginas de um PDF, uma a uma, à medida que são decodificadas
         
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Extrai texto de todas as páginas
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text and page_text.strip():
-                            text += page_text + "\n\n"
-                    except Exception as e:
-                        print(f"Aviso: Erro ao extrair página {page_num + 1}: {e}")
-                        continue
-            
-            if not text.strip():
-                raise Exception("Não foi possível extrair texto do PDF. O arquivo pode estar vazio ou protegido.")
+        Args:
+            source: Conteúdo do PDF (caminho, bytes ou arquivo aberto)
+            start: Índice da primeira página (0-based)
+            end: Índice final exclusivo (None = até a última página)
             
-            return text.strip()
+        Yields:
+            str: Texto de cada página com conteúdo
+        """
+        return cls._pdf().iter_pages(source, start, end)
+    
+    @classmethod
+    def extract_pdf_page_range(cls, source: DocumentSource, start: int, end: int) -> List[str]:
+        """
+        Extrai o texto de um intervalo de páginas de um PDF
+        
+        Usado para dividir a extração de PDFs longos entre vários processos.
+        
+        Args:
+            source: Conteúdo do PDF (caminho, bytes ou arquivo aberto)
+            start: Índice da primeira página (0-based)
+            end: Índice final exclusivo
             
-        except Exception as e:
-            raise Exception(f"Erro ao extrair texto do PDF: {str(e)}")
+        Returns:
+            List[str]: Texto de cada página com conteúdo, em ordem
+        """
+        return cls._pdf().extract_page_range(source, start, end)
+    
+    @classmethod
+    def join_pdf_pages(cls, pages: Iterable[str]) -> str:
+        """
+        Monta o texto final do PDF a partir das páginas (em uma única junção)
+        
+        Raises:
+            Exception: Se nenhuma página contiver texto
+        """
+        return cls._pdf().join_pages(pages)
     
     @staticmethod
-    def extract_text_from_docx(file_path: str) -> str:
+    def extract_text(source: DocumentSource, extension: str) -> str:
+        """Extrai o texto com o extrator registrado para a extensão (ex.: ".docx")"""
+        spec = extractors.spec_for_extension(extension)
+        if spec is None:
+            raise ValueError(f"Extensão não suportada: {extension}")
+        return extractors.load(spec).extract(source)
+    
+    @classmethod
+    def extract_text_from_pdf(cls, source: DocumentSource) -> str:
+        """Extrai texto de arquivo PDF usando PyPDF2"""
+        return cls.extract_text(source, ".pdf")
+    
+    @classmethod
+    def extract_text_from_docx(cls, source: DocumentSource) -> str:
         """Extrai texto de arquivo DOCX"""
-        try:
-            doc = Document(file_path)
-            text = []
-            
-            # Extrai texto dos parágrafos
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text.append(paragraph.text)
-            
-            # Extrai texto das tabelas
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text.append(cell.text)
-            
-            return "\n\n".join(text)
-        except Exception as e:
-            raise Exception(f"Erro ao extrair texto do DOCX: {str(e)}")
+        return cls.extract_text(source, ".docx")
+    
+    @classmethod
+    def extract_text_from_txt(cls, source: DocumentSource) -> str:
+        """Extrai texto de arquivo TXT (decodificado uma única vez, em memória)"""
+        return cls.extract_text(source, ".txt")
     
     @staticmethod
-    def extract_text_from_txt(file_path: str) -> str:
-        """Extrai texto de arquivo TXT"""
-        try:
-            encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
-            
-            for encoding in encodings:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as file:
-                        return file.read()
-                except UnicodeDecodeError:
-                    continue
-            
-            raise Exception("Não foi possível decodificar o arquivo TXT")
-        except Exception as e:
-            raise Exception(f"Erro ao ler arquivo TXT: {str(e)}")
+    def validate_extracted_text(text: str):
+        """
+        Verifica se o texto extraído é suficiente para a análise
+        
+        Raises:
+            ValueError: Se o texto estiver vazio ou for muito curto
+        """
+        if not text or len(text.strip()) < 100:
+            raise ValueError("O arquivo está vazio ou contém muito pouco texto para análise")
     
     @classmethod
-    def process_file(cls, file_path: str, filename: str) -> Tuple[str, str]:
+    def process_file(cls, source: DocumentSource, filename: str) -> Tuple[str, str]:
         """
         Processa arquivo e retorna o texto extraído
         
+        O extrator é escolhido pela extensão e confirmado pelos primeiros bytes do
+        conteúdo (ex.: um PDF enviado como .txt é extraído como PDF).
+        
         Args:
-            file_path: Caminho do arquivo
+            source: Conteúdo do arquivo (bytes, memoryview, arquivo aberto ou caminho)
             filename: Nome original do arquivo
             
         Returns:
@@ -107,26 +131,12 @@ class FileProcessor:
         if not cls.is_allowed_file(filename):
             raise ValueError(f"Tipo de arquivo não permitido. Extensões permitidas: {cls.ALLOWED_EXTENSIONS}")
         
-        extension = cls.get_file_extension(filename)
-        
         try:
-            if extension == '.pdf':
-                text = cls.extract_text_from_pdf(file_path)
-                file_type = "PDF"
-            elif extension == '.docx':
-                text = cls.extract_text_from_docx(file_path)
-                file_type = "DOCX"
-            elif extension == '.txt':
-                text = cls.extract_text_from_txt(file_path)
-                file_type = "TXT"
-            else:
-                raise ValueError(f"Extensão não suportada: {extension}")
+            spec = extractors.detect(source, cls.get_file_extension(filename))
+            text = extractors.load(spec).extract(source)
+            cls.validate_extracted_text(text)
             
-            if not text or len(text.strip()) < 100:
-                raise ValueError("O arquivo está vazio ou contém muito pouco texto para análise")
-            
-            return text, file_type
+            return text, spec.name
         
         except Exception as e:
             raise Exception(f"Erro ao processar arquivo {filename}: {str(e)}")
-
@@ -0,0 +1,603 @@
+"""
+Fila de avaliações assíncronas (jobs) com armazenamento de estado plugável
+"""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from backend.config import settings
+from backend.models import EvaluationResponse, JobStatus
+from backend.services.shared_state import SharedState, get_shared_state, json_updater
+
+
+JobFactory = Callable[[], Awaitable[EvaluationResponse]]
+JobCleanup = Optional[Callable[[], None]]
+
+
+# Erro registrado em jobs cujo worker foi encerrado antes de concluí-los
+ORPHANED_JOB_ERROR = "Job interrompido: o servidor ou o worker que o executava foi reiniciado"
+
+
+class JobQueueFullError(Exception):
+    """Erro lançado quando a fila de avaliações atingiu a capacidade máxima"""
+
+
+class JobStore(ABC):
+    """
+    Interface de armazenamento do estado dos jobs
+
+    Cada job é representado por um dicionário com as chaves: job_id, seq, status,
+    owner, created_at, started_at, finished_at, error e result (dict serializável).
+    `owner` identifica o worker que executa o job; cada worker renova periodicamente
+    seu sinal de vida (`heartbeat`), e jobs de workers sem sinal são marcados como falhos.
+    """
+
+    @abstractmethod
+    def create(self, job: Dict[str, Any]):
+        """Registra um novo job"""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields):
+        """Atualiza campos de um job existente"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna o job ou None se não existir"""
+
+    @abstractmethod
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Posição (1-based) do job entre os jobs ainda na fila"""
+
+    @abstractmethod
+    def count_by_status(self, status: JobStatus) -> int:
+        """Número de jobs com o status indicado"""
+
+    @abstractmethod
+    def delete_finished_before(self, timestamp: float) -> int:
+        """Remove jobs concluídos/falhos finalizados antes de `timestamp`"""
+
+    @abstractmethod
+    def heartbeat(self, owner: str, ttl_seconds: float):
+        """Registra que o worker `owner` está ativo pelos próximos `ttl_seconds` (<= 0 = encerrado)"""
+
+    @abstractmethod
+    def fail_unfinished(self, error: str) -> int:
+        """Marca como falhos os jobs pendentes cujo worker não está mais ativo"""
+
+    def close(self):
+        pass
+
+
+class InMemoryJobStore(JobStore):
+    """Armazena o estado dos jobs em memória (escopo do processo)"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any]):
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != JobStatus.QUEUED.value:
+                return None
+            ahead = sum(
+                1 for other in self._jobs.values()
+                if other["status"] == JobStatus.QUEUED.value and other["seq"] < job["seq"]
+            )
+            return ahead + 1
+
+    def count_by_status(self, status: JobStatus) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] == status.value)
+
+    def delete_finished_before(self, timestamp: float) -> int:
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < timestamp
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+    def heartbeat(self, owner: str, ttl_seconds: float):
+        pass
+
+    def fail_unfinished(self, error: str) -> int:
+        return 0
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Armazena o estado dos jobs em um banco SQLite local
+
+    O banco (modo WAL) pode ser compartilhado pelos workers de uma mesma máquina.
+    """
+
+    _COLUMNS = ("job_id", "seq", "status", "owner", "created_at", "started_at", "finished_at", "error", "result")
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Caminho do arquivo do banco de dados
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT,
+                result TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_seq ON jobs (status, seq)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_workers (owner TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+
+        # Bancos criados antes da coluna `owner`
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "owner" not in columns:
+            try:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            except sqlite3.OperationalError:
+                # Outro worker adicionou a coluna ao mesmo tempo
+                pass
+
+    def create(self, job: Dict[str, Any]):
+        values = [job.get(column) for column in self._COLUMNS]
+        values[-1] = json.dumps(values[-1]) if values[-1] is not None else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                values
+            )
+
+    def update(self, job_id: str, **fields):
+        if not fields:
+            return
+        if fields.get("result") is not None:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?",
+                [*fields.values(), job_id]
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self._COLUMNS, row))
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COUNT(*) FROM jobs
+                WHERE status = ? AND seq <= (
+                    SELECT seq FROM jobs WHERE job_id = ? AND status = ?
+                )
+                """,
+                (JobStatus.QUEUED.value, job_id, JobStatus.QUEUED.value)
+            ).fetchone()
+        return row[0] or None
+
+    def count_by_status(self, status: JobStatus) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?",
+                (status.value,)
+            ).fetchone()
+        return row[0]
+
+    def delete_finished_before(self, timestamp: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (timestamp,)
+            )
+        return cursor.rowcount
+
+    def heartbeat(self, owner: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            if ttl_seconds > 0:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO job_workers (owner, expires_at) VALUES (?, ?)",
+                    (owner, now + ttl_seconds)
+                )
+            else:
+                self._conn.execute("DELETE FROM job_workers WHERE owner = ?", (owner,))
+            self._conn.execute("DELETE FROM job_workers WHERE expires_at <= ?", (now,))
+
+    def fail_unfinished(self, error: str) -> int:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE jobs SET status = ?, error = ?, finished_at = ?
+                WHERE status IN (?, ?) AND (
+                    owner IS NULL OR owner NOT IN (SELECT owner FROM job_workers WHERE expires_at > ?)
+                )
+                """,
+                (JobStatus.FAILED.value, error, now, JobStatus.QUEUED.value, JobStatus.RUNNING.value, now)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SharedStateJobStore(JobStore):
+    """
+    Armazena o estado dos jobs no armazenamento compartilhado entre workers (`SharedState`)
+
+    Cada job fica em uma chave própria. Os jobs não finalizados são listados em um
+    índice atualizado de forma atômica, usado para a posição na fila e as contagens;
+    jobs finalizados saem do índice e expiram após o tempo de retenção.
+    """
+
+    _INDEX_KEY = "jobs:unfinished"
+    _WORKERS_KEY = "jobs:workers"
+    _UNFINISHED = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+    def __init__(self, state: SharedState, retention_seconds: float = 3600):
+        """
+        Args:
+            state: Armazenamento compartilhado
+            retention_seconds: Tempo de retenção de jobs finalizados
+        """
+        self.state = state
+        self.retention_seconds = retention_seconds
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def _track(self, job_id: str, job: Optional[Dict[str, Any]]):
+        """Inclui o job no índice de não finalizados, ou o remove dele"""
+        def apply(index: Dict[str, Any]):
+            if job is not None and job["status"] in self._UNFINISHED:
+                index[job_id] = [job["seq"], job["status"], job.get("owner")]
+            else:
+                index.pop(job_id, None)
+            return index, None
+
+        self.state.update(self._INDEX_KEY, json_updater(apply))
+
+    def _unfinished(self) -> Dict[str, List[Any]]:
+        raw = self.state.get(self._INDEX_KEY)
+        return json.loads(raw) if raw else {}
+
+    def create(self, job: Dict[str, Any]):
+        self.state.set(self._key(job["job_id"]), json.dumps(job, ensure_ascii=False))
+        self._track(job["job_id"], job)
+
+    def update(self, job_id: str, **fields):
+        if not fields:
+            return
+
+        def apply(job: Dict[str, Any]):
+            if not job:
+                return None, None
+            job.update(fields)
+            return job, job
+
+        finished = fields.get("status") not in (None, *self._UNFINISHED)
+        job = self.state.update(
+            self._key(job_id),
+            json_updater(apply),
+            self.retention_seconds if finished else 0
+        )
+        if "status" in fields:
+            self._track(job_id, job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.state.get(self._key(job_id))
+        return json.loads(raw) if raw else None
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        index = self._unfinished()
+        entry = index.get(job_id)
+        if entry is None or entry[1] != JobStatus.QUEUED.value:
+            return None
+        return 1 + sum(
+            1 for seq, status, _ in index.values()
+            if status == JobStatus.QUEUED.value and seq < entry[0]
+        )
+
+    def count_by_status(self, status: JobStatus) -> int:
+        """Contagem de jobs no estado (apenas `queued` e `running`; os finalizados não são indexados)"""
+        return sum(1 for _, job_status, _ in self._unfinished().values() if job_status == status.value)
+
+    def delete_finished_before(self, timestamp: float) -> int:
+        # Jobs finalizados expiram pelo tempo de vida das chaves
+        return 0
+
+    def heartbeat(self, owner: str, ttl_seconds: float):
+        now = time.time()
+
+        def apply(workers: Dict[str, float]):
+            workers = {name: expires_at for name, expires_at in workers.items() if expires_at > now}
+            if ttl_seconds > 0:
+                workers[owner] = now + ttl_seconds
+            else:
+                workers.pop(owner, None)
+            return workers, None
+
+        self.state.update(self._WORKERS_KEY, json_updater(apply))
+
+    def fail_unfinished(self, error: str) -> int:
+        now = time.time()
+        raw = self.state.get(self._WORKERS_KEY)
+        alive = {name for name, expires_at in (json.loads(raw) if raw else {}).items() if expires_at > now}
+        orphaned = [job_id for job_id, (_, _, owner) in self._unfinished().items() if owner not in alive]
+        for job_id in orphaned:
+            self.update(job_id, status=JobStatus.FAILED.value, error=error, finished_at=now)
+        return len(orphaned)
+
+
+def create_job_store() -> JobStore:
+    """
+    Cria o armazenamento de jobs configurado em `Settings.job_store_backend`
+
+    Returns:
+        JobStore: Implementação em memória, SQLite ou no estado compartilhado entre workers
+    """
+    backend = settings.job_store_backend.lower()
+    if backend == "memory":
+        return InMemoryJobStore()
+    if backend == "sqlite":
+        return SQLiteJobStore(settings.job_store_path)
+    if backend == "shared":
+        state = get_shared_state()
+        if state is None:
+            raise ValueError("JOB_STORE_BACKEND=shared requer SHARED_STATE_BACKEND diferente de none")
+        return SharedStateJobStore(state, settings.job_retention_seconds)
+    raise ValueError(f"Backend de jobs não suportado: {settings.job_store_backend}")
+
+
+class JobManager:
+    """
+    Executa avaliações em segundo plano com um pool limitado de workers
+
+    As chamadas ao `JobStore` (E/S de disco ou de rede) rodam em threads, fora do
+    event loop.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 2,
+        max_queue_size: int = 100,
+        retention_seconds: float = 3600,
+        heartbeat_seconds: float = 10.0
+    ):
+        """
+        Args:
+            store: Armazenamento do estado dos jobs
+            workers: Número de avaliações executadas em paralelo
+            max_queue_size: Capacidade máxima da fila (0 = ilimitada)
+            retention_seconds: Tempo de retenção de jobs finalizados
+            heartbeat_seconds: Intervalo de renovação do sinal de vida do processo
+                (jobs de processos sem sinal por 3x esse tempo são marcados como falhos)
+        """
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_queue_size = max_queue_size
+        self.retention_seconds = retention_seconds
+        self.heartbeat_seconds = max(1.0, heartbeat_seconds)
+
+        # Identifica este processo como executor dos jobs que aceita (a fila é local ao processo)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seq = 0
+
+    async def start(self):
+        """Inicia os workers e a rotina de limpeza (chamado no startup da aplicação)"""
+        if self._tasks:
+            return
+
+        await asyncio.to_thread(self.store.heartbeat, self.owner, self.heartbeat_seconds * 3)
+        await asyncio.to_thread(self.store.fail_unfinished, ORPHANED_JOB_ERROR)
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._cleanup_loop(), name="job-cleanup"))
+
+    async def stop(self):
+        """Interrompe os workers (chamado no shutdown da aplicação)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Libera recursos de jobs que não chegaram a executar
+        while self._queue is not None and not self._queue.empty():
+            job_id, _, cleanup = self._queue.get_nowait()
+            await self._finish(job_id, error="Job cancelado no desligamento do servidor")
+            self._run_cleanup(cleanup)
+
+        try:
+            await asyncio.to_thread(self.store.heartbeat, self.owner, 0)
+        except Exception as e:
+            print(f"Aviso: Erro ao desregistrar o worker de jobs: {e}")
+
+    def _next_seq(self) -> int:
+        """Número de sequência monotônico usado para ordenar a fila"""
+        self._seq = max(self._seq + 1, time.time_ns())
+        return self._seq
+
+    async def submit(self, factory: JobFactory, cleanup: JobCleanup = None) -> Dict[str, Any]:
+        """
+        Enfileira uma avaliação
+
+        Args:
+            factory: Função que, ao ser chamada, executa a avaliação
+            cleanup: Função opcional chamada ao final (ex.: remover arquivo temporário)
+
+        Returns:
+            Dict: Estado inicial do job, incluindo a posição na fila
+        """
+        if self._queue is None:
+            raise RuntimeError("Fila de avaliações não inicializada")
+        if self._queue.full():
+            raise JobQueueFullError("Fila de avaliações cheia. Tente novamente em instantes.")
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "seq": self._next_seq(),
+            "status": JobStatus.QUEUED.value,
+            "owner": self.owner,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "result": None
+        }
+        await asyncio.to_thread(self.store.create, job)
+        # A fila pode ter enchido durante a gravação: o job já está registrado, então aguarda a vaga
+        await self._queue.put((job["job_id"], factory, cleanup))
+
+        return await self.get(job["job_id"])
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém o estado atual de um job
+
+        Args:
+            job_id: Identificador do job
+
+        Returns:
+            Optional[Dict]: Estado do job com `queue_position`, ou None se inexistente
+        """
+        def load() -> Optional[Dict[str, Any]]:
+            job = self.store.get(job_id)
+            if job is None:
+                return None
+            job["queue_position"] = (
+                self.store.queue_position(job_id)
+                if job["status"] == JobStatus.QUEUED.value else None
+            )
+            return job
+
+        return await asyncio.to_thread(load)
+
+    @property
+    def queue_depth(self) -> int:
+        """Número de jobs aguardando um worker"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores da fila de avaliações"""
+        return {
+            "workers": self.workers,
+            "queued": await asyncio.to_thread(self.store.count_by_status, JobStatus.QUEUED),
+            "running": await asyncio.to_thread(self.store.count_by_status, JobStatus.RUNNING)
+        }
+
+    async def _finish(self, job_id: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Registra o término de um job"""
+        await asyncio.to_thread(
+            self.store.update,
+            job_id,
+            status=(JobStatus.FAILED if error else JobStatus.COMPLETED).value,
+            finished_at=time.time(),
+            result=result,
+            error=error
+        )
+
+    @staticmethod
+    def _run_cleanup(cleanup: JobCleanup):
+        if cleanup is None:
+            return
+        try:
+            cleanup()
+        except Exception as e:
+            print(f"Aviso: Erro ao liberar recursos do job: {e}")
+
+    async def _worker(self):
+        """Consome a fila e executa as avaliações"""
+        while True:
+            job_id, factory, cleanup = await self._queue.get()
+            try:
+                await asyncio.to_thread(
+                    self.store.update, job_id, status=JobStatus.RUNNING.value, started_at=time.time()
+                )
+                evaluation = await factory()
+                await self._finish(job_id, result=evaluation.model_dump(mode="json"))
+            except asyncio.CancelledError:
+                await self._finish(job_id, error="Job cancelado no desligamento do servidor")
+                raise
+            except Exception as e:
+                await self._finish(job_id, error=str(e))
+            finally:
+                self._run_cleanup(cleanup)
+                self._queue.task_done()
+
+    def _maintain(self):
+        """Renova o sinal de vida e limpa a fila (E/S bloqueante, executada em uma thread)"""
+        self.store.heartbeat(self.owner, self.heartbeat_seconds * 3)
+        self.store.fail_unfinished(ORPHANED_JOB_ERROR)
+        self.store.delete_finished_before(time.time() - self.retention_seconds)
+
+    async def _cleanup_loop(self):
+        """
+        Renova o sinal de vida do processo, marca como falhos os jobs de workers
+        encerrados e remove jobs finalizados além do tempo de retenção
+        """
+        interval = max(1.0, min(self.heartbeat_seconds, self.retention_seconds / 2))
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self._maintain)
+            except Exception as e:
+                print(f"Aviso: Erro na manutenção da fila de jobs: {e}")
@@ -0,0 +1,330 @@
+"""
+Triagem local de originalidade: índice de shingles de um corpus de referência
+
+O corpus (TCCs anteriores e textos de referência) é reduzido a um vetor ordenado
+de hashes de shingles de palavras, gravado em arquivos `.npy` e mapeado em
+memória. A sobreposição de um trabalho com todo o corpus é obtida por busca
+binária vetorizada, e os trechos coincidentes são enviados ao modelo para que o
+Avaliador 3 analise apenas esses trechos.
+
+Construção do índice:
+    python -m backend.services.originality --corpus corpus/ [--output .cache/originality]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+from backend.config import settings
+from backend.services.file_processor import FileProcessor
+from backend.utils.shingles import shingle_hashes, text_shingles, tokenize
+
+
+# Incrementar quando o formato do índice ou o hashing de shingles mudar
+ORIGINALITY_INDEX_VERSION = "1"
+
+_HASHES_FILE = "hashes.npy"
+_SOURCES_FILE = "sources.npy"
+_FREQUENCY_FILE = "frequency.npy"
+_META_FILE = "meta.json"
+
+
+class SuspiciousPassage(NamedTuple):
+    """Trecho do trabalho que coincide com o corpus de referência"""
+    start: int
+    end: int
+    text: str
+    score: float
+    source: str
+    words: int
+
+
+class OriginalityReport(NamedTuple):
+    """Resultado da triagem de originalidade de um trabalho"""
+    passages: List[SuspiciousPassage]
+    matched_fraction: float
+    corpus_documents: int
+
+
+def corpus_files(corpus_dir: str) -> List[str]:
+    """Arquivos suportados do corpus (caminhos relativos, em ordem)"""
+    files = []
+    for root, _, names in os.walk(corpus_dir):
+        for name in names:
+            if FileProcessor.is_allowed_file(name):
+                files.append(os.path.relpath(os.path.join(root, name), corpus_dir))
+    return sorted(files)
+
+
+def corpus_fingerprint(corpus_dir: str, shingle_words: int) -> str:
+    """
+    Identificador do conteúdo do corpus (arquivos, tamanhos e datas de modificação)
+
+    Args:
+        corpus_dir: Diretório do corpus
+        shingle_words: Palavras por shingle
+
+    Returns:
+        str: Hash que muda sempre que o corpus ou os parâmetros do índice mudam
+    """
+    digest = hashlib.sha256(f"{ORIGINALITY_INDEX_VERSION}:{shingle_words}".encode("utf-8"))
+    for relative in corpus_files(corpus_dir):
+        stat = os.stat(os.path.join(corpus_dir, relative))
+        digest.update(f"\x00{relative}\x00{stat.st_size}\x00{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class OriginalityIndex:
+    """Índice de shingles do corpus de referência, mapeado em memória"""
+
+    def __init__(
+        self,
+        hashes: np.ndarray,
+        sources: np.ndarray,
+        frequency: np.ndarray,
+        meta: Dict[str, Any]
+    ):
+        """
+        Args:
+            hashes: Hashes distintos de shingles do corpus (uint64, ordenados)
+            sources: Primeiro documento do corpus que contém cada hash (int32)
+            frequency: Número de documentos que contêm cada hash (uint16)
+            meta: Metadados (impressão digital, parâmetros e nomes dos documentos)
+        """
+        self.hashes = hashes
+        self.sources = sources
+        self.frequency = frequency
+        self.meta = meta
+        self.fingerprint: str = meta["fingerprint"]
+        self.shingle_words: int = meta["shingle_words"]
+        self.documents: List[str] = meta["documents"]
+
+    @classmethod
+    def build(cls, corpus_dir: str, index_dir: str, shingle_words: int = 7) -> "OriginalityIndex":
+        """
+        Constrói o índice a partir dos arquivos do corpus e o grava em disco
+
+        Args:
+            corpus_dir: Diretório com os documentos de referência (PDF, DOCX, TXT)
+            index_dir: Diretório de destino dos arquivos do índice
+            shingle_words: Palavras por shingle
+
+        Returns:
+            OriginalityIndex: Índice mapeado em memória
+        """
+        started = time.perf_counter()
+        fingerprint = corpus_fingerprint(corpus_dir, shingle_words)
+        documents: List[str] = []
+        hash_parts: List[np.ndarray] = []
+        source_parts: List[np.ndarray] = []
+
+        for relative in corpus_files(corpus_dir):
+            try:
+                text, _ = FileProcessor.process_file(os.path.join(corpus_dir, relative), relative)
+            except Exception as e:
+                print(f"Aviso: Documento do corpus ignorado ({relative}): {e}")
+                continue
+            shingles = text_shingles(text, shingle_words)
+            hash_parts.append(shingles)
+            source_parts.append(np.full(len(shingles), len(documents), dtype=np.int32))
+            documents.append(relative)
+
+        hashes = np.concatenate(hash_parts) if hash_parts else np.empty(0, dtype=np.uint64)
+        sources = np.concatenate(source_parts) if source_parts else np.empty(0, dtype=np.int32)
+        # Ordena por hash (e documento): cada hash distinto guarda o primeiro documento e a frequência
+        order = np.lexsort((sources, hashes))
+        hashes, sources = hashes[order], sources[order]
+        unique, first, counts = np.unique(hashes, return_index=True, return_counts=True)
+
+        os.makedirs(index_dir, exist_ok=True)
+        meta = {
+            "version": ORIGINALITY_INDEX_VERSION,
+            "fingerprint": fingerprint,
+            "shingle_words": shingle_words,
+            "documents": documents,
+            "shingles": int(len(unique)),
+            "built_at": time.time(),
+            "build_seconds": round(time.perf_counter() - started, 3)
+        }
+        for name, array in (
+            (_HASHES_FILE, unique.astype(np.uint64)),
+            (_SOURCES_FILE, sources[first].astype(np.int32)),
+            (_FREQUENCY_FILE, np.minimum(counts, np.iinfo(np.uint16).max).astype(np.uint16))
+        ):
+            tmp_path = os.path.join(index_dir, f"{name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as file:
+                np.save(file, array)
+            os.replace(tmp_path, os.path.join(index_dir, name))
+        # Os metadados são gravados por último: sua presença indica um índice completo
+        tmp_path = os.path.join(index_dir, f"{_META_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(index_dir, _META_FILE))
+
+        return cls.load(index_dir)
+
+    @classmethod
+    def load(cls, index_dir: str) -> Optional["OriginalityIndex"]:
+        """
+        Abre um índice gravado em disco (arrays mapeados em memória)
+
+        Args:
+            index_dir: Diretório do índice
+
+        Returns:
+            Optional[OriginalityIndex]: Índice, ou None se ausente ou de versão incompatível
+        """
+        try:
+            with open(os.path.join(index_dir, _META_FILE), "r", encoding="utf-8") as file:
+                meta = json.load(file)
+            if meta.get("version") != ORIGINALITY_INDEX_VERSION:
+                return None
+            return cls(
+                np.load(os.path.join(index_dir, _HASHES_FILE), mmap_mode="r"),
+                np.load(os.path.join(index_dir, _SOURCES_FILE), mmap_mode="r"),
+                np.load(os.path.join(index_dir, _FREQUENCY_FILE), mmap_mode="r"),
+                meta
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Aviso: Índice de originalidade inválido ({index_dir}): {e}")
+            return None
+
+    @classmethod
+    def open(cls, corpus_dir: str, index_dir: str, shingle_words: int = 7) -> Optional["OriginalityIndex"]:
+        """
+        Abre o índice, reconstruindo-o se o corpus tiver mudado
+
+        Args:
+            corpus_dir: Diretório do corpus (vazio = usa o índice existente sem verificação)
+            index_dir: Diretório do índice
+            shingle_words: Palavras por shingle
+
+        Returns:
+            Optional[OriginalityIndex]: Índice, ou None se não houver corpus nem índice
+        """
+        index = cls.load(index_dir)
+        if not corpus_dir:
+            return index
+        if not os.path.isdir(corpus_dir):
+            print(f"Aviso: Diretório do corpus de originalidade não encontrado: {corpus_dir}")
+            return index
+        if index is not None and index.fingerprint == corpus_fingerprint(corpus_dir, shingle_words):
+            return index
+        return cls.build(corpus_dir, index_dir, shingle_words)
+
+    @classmethod
+    def from_settings(cls) -> Optional["OriginalityIndex"]:
+        """Abre (ou constrói) o índice a partir de `Settings`"""
+        return cls.open(
+            settings.originality_corpus_dir,
+            settings.originality_index_dir,
+            settings.originality_shingle_words
+        )
+
+    def screen(
+        self,
+        text: str,
+        min_passage_words: int = 12,
+        max_gap_words: int = 3,
+        max_passages: int = 20,
+        max_document_fraction: float = 0.2,
+        passage_max_chars: int = 600
+    ) -> OriginalityReport:
+        """
+        Localiza os trechos do trabalho que coincidem com o corpus
+
+        Args:
+            text: Texto do trabalho
+            min_passage_words: Tamanho mínimo de um trecho suspeito (palavras)
+            max_gap_words: Maior intervalo sem coincidência dentro de um mesmo trecho
+            max_passages: Número máximo de trechos retornados (os mais longos)
+            max_document_fraction: Shingles presentes em mais que esta fração dos
+                documentos do corpus são ignorados (expressões padronizadas)
+            passage_max_chars: Tamanho máximo do texto de cada trecho
+
+        Returns:
+            OriginalityReport: Trechos suspeitos na ordem do texto e fração coincidente
+        """
+        words, spans = tokenize(text)
+        queries = shingle_hashes(words, self.shingle_words)
+        documents = len(self.documents)
+        if not len(queries) or not len(self.hashes):
+            return OriginalityReport([], 0.0, documents)
+
+        # Busca binária vetorizada de todos os shingles do trabalho no corpus
+        positions = np.minimum(np.searchsorted(self.hashes, queries), len(self.hashes) - 1)
+        matched = np.asarray(self.hashes[positions]) == queries
+        if documents >= 10:
+            max_frequency = max(1, int(max_document_fraction * documents))
+            matched &= np.asarray(self.frequency[positions]) <= max_frequency
+
+        hits = np.flatnonzero(matched)
+        if not len(hits):
+            return OriginalityReport([], 0.0, documents)
+
+        # Agrupa coincidências próximas em trechos contínuos
+        breaks = np.flatnonzero(np.diff(hits) > max_gap_words + 1)
+        starts = np.concatenate(([0], breaks + 1))
+        ends = np.concatenate((breaks, [len(hits) - 1]))
+
+        passages: List[SuspiciousPassage] = []
+        for start, end in zip(starts, ends):
+            first, last = hits[start], hits[end]
+            span_words = last - first + self.shingle_words
+            if span_words < min_passage_words:
+                continue
+            group = hits[start:end + 1]
+            sources = np.asarray(self.sources[positions[group]])
+            char_start, char_end = int(spans[first][0]), int(spans[last + self.shingle_words - 1][1])
+            excerpt = text[char_start:char_end]
+            if len(excerpt) > passage_max_chars:
+                excerpt = excerpt[:passage_max_chars].rstrip() + "..."
+            passages.append(SuspiciousPassage(
+                start=char_start,
+                end=char_end,
+                text=" ".join(excerpt.split()),
+                score=round(len(group) / (last - first + 1), 3),
+                source=self.documents[int(np.bincount(sources).argmax())],
+                words=int(span_words)
+            ))
+
+        passages = sorted(passages, key=lambda passage: passage.words, reverse=True)[:max_passages]
+        passages.sort(key=lambda passage: passage.start)
+        return OriginalityReport(passages, round(len(hits) / len(queries), 4), documents)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna informações do índice"""
+        return {
+            "enabled": True,
+            "fingerprint": self.fingerprint,
+            "documents": len(self.documents),
+            "shingles": int(len(self.hashes)),
+            "shingle_words": self.shingle_words,
+            "size_bytes": int(self.hashes.nbytes + self.sources.nbytes + self.frequency.nbytes),
+            "built_at": self.meta.get("built_at")
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=settings.originality_corpus_dir, help="Diretório do corpus de referência")
+    parser.add_argument("--output", default=settings.originality_index_dir, help="Diretório do índice")
+    parser.add_argument("--shingle-words", type=int, default=settings.originality_shingle_words)
+    args = parser.parse_args()
+    if not args.corpus:
+        parser.error("Informe o diretório do corpus (--corpus ou ORIGINALITY_CORPUS_DIR)")
+
+    index = OriginalityIndex.build(args.corpus, args.output, args.shingle_words)
+    stats = index.get_stats()
+    print(
+        f"Índice construído em {index.meta['build_seconds']}s: {stats['documents']} documentos, "
+        f"{stats['shingles']} shingles, {stats['size_bytes'] / (1024 * 1024):.1f} MB ({args.output})"
+    )
+
+
+if __name__ == "__main__":
+    main()
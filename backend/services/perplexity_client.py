@@ -1,20 +1,138 @@
 """
 Cliente para integração com a API do Perplexity
 """
+import asyncio
 import httpx
+import hashlib
 import json
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
 from backend.config import settings
+from backend.services.originality import OriginalityReport
+from backend.services.resilience import UpstreamUnavailableError
+from backend.services.routing import UpstreamTarget, get_target_router
+from backend.utils.json_repair import JsonRepairError, loads_tolerant, merge_continuation
+from backend.utils.metrics import JSON_RESPONSES, UPSTREAM_PROMPT_CHARS, UPSTREAM_RESPONSE_CHARS, observe_stage, record_usage
+
+
+# Cliente HTTP compartilhado pelo processo (pool de conexões reutilizáveis)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    """
+    Cria o cliente HTTP com pool de conexões, keep-alive e HTTP/2 opcional
+    
+    Returns:
+        httpx.AsyncClient: Cliente configurado a partir de `Settings`
+    """
+    http2 = settings.http2_enabled
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("Aviso: HTTP/2 habilitado, mas o pacote 'h2' não está instalado (pip install 'httpx[http2]'). Usando HTTP/1.1.")
+            http2 = False
+    
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            settings.perplexity_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds
+        ),
+        http2=http2
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP compartilhado, criando-o sob demanda
+    
+    Normalmente o cliente é aberto no lifespan da aplicação; a criação sob demanda
+    cobre usos fora do servidor (scripts, benchmarks).
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_http_client()
+    return _http_client
+
+
+async def warm_up_http_client(connections: int = 1):
+    """
+    Abre conexões com a API antecipadamente (DNS, TCP e TLS)
+    
+    Args:
+        connections: Número de conexões a estabelecer em paralelo (por destino)
+    """
+    client = get_http_client()
+    origins = set()
+    for target in get_target_router().targets:
+        parts = urlsplit(target.url)
+        origins.add(f"{parts.scheme}://{parts.netloc}/")
+    
+    async def _touch(origin: str):
+        try:
+            await client.head(origin, timeout=settings.http_connect_timeout_seconds)
+        except httpx.HTTPError as e:
+            print(f"Aviso: Falha no aquecimento de conexão com {origin}: {e}")
+    
+    await asyncio.gather(*(_touch(origin) for origin in origins for _ in range(max(1, connections))))
+
+
+async def open_http_client():
+    """Inicializa o cliente HTTP compartilhado (chamado no startup da aplicação)"""
+    get_http_client()
+    if settings.http_warmup_enabled:
+        await warm_up_http_client(settings.http_warmup_connections)
+
+
+async def close_http_client():
+    """Fecha o cliente HTTP compartilhado (chamado no shutdown da aplicação)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 class PerplexityClient:
     """Cliente para comunicação com a API do Perplexity"""
     
+    SYSTEM_PROMPT = "Você é um sistema especializado em avaliação acadêmica. Responda sempre em formato JSON válido, sem texto adicional."
+    CONTINUATION_PROMPT = "Sua resposta anterior foi interrompida. Continue o JSON exatamente do ponto em que parou, sem repetir nada do que já foi escrito e sem texto adicional."
+    
     def __init__(self):
         self.api_url = settings.perplexity_api_url
         self.api_key = settings.perplexity_api_key
         self.model = settings.perplexity_model
-        self.timeout = 120.0  # 2 minutos de timeout
+        self.timeout = settings.perplexity_timeout_seconds
+        self.temperature = 0.3  # Baixa temperatura para respostas mais consistentes
+        self.max_tokens = 4000
+        self._prompt_version = None
+    
+    @property
+    def prompt_version(self) -> str:
+        """
+        Versão do prompt de avaliação
+        
+        Derivada do hash dos templates de prompt (avaliação, seções, consolidação, revisão e
+        triagem de originalidade) e do
+        prompt de sistema, de modo que qualquer alteração no prompt invalida automaticamente o cache.
+        """
+        if self._prompt_version is None:
+            template = (
+                self.SYSTEM_PROMPT
+                + self._build_evaluation_prompt("")
+                + self._build_section_prompt("", "")
+                + self._build_reduce_prompt([])
+                + self._build_revision_prompt({}, [], [])
+                + self._build_originality_block(OriginalityReport([], 0.0, 0))
+            )
+            self._prompt_version = hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+        return self._prompt_version
     
     def _get_headers(self) -> Dict[str, str]:
         """Retorna os headers para a requisição"""
@@ -23,17 +141,15 @@ class PerplexityClient:
             "Content-Type": "application/json"
         }
     
-    def _build_evaluation_prompt(self, text: str) -> str:
+    def _build_rubric(self) -> str:
         """
-        Constrói o prompt otimizado para avaliação de TCC
+        Constrói a parte comum dos prompts de avaliação: composição da banca,
+        instruções de análise e formato de resposta obrigatório
         
-        Args:
-            text: Texto do TCC a ser avaliado
-            
         Returns:
-            str: Prompt formatado
+            str: Rubrica formatada
         """
-        prompt = f"""Você é o sistema Veritas.AI, uma banca avaliadora de TCC composta por três avaliadores virtuais especializados. Sua missão é analisar o artigo científico fornecido com rigor acadêmico e emitir um parecer estruturado.
+        return f"""Você é o sistema Veritas.AI, uma banca avaliadora de TCC composta por três avaliadores virtuais especializados. Sua missão é analisar o artigo científico fornecido com rigor acadêmico e emitir um parecer estruturado.
 
 ## COMPOSIÇÃO DA BANCA
 
@@ -93,88 +209,506 @@ Responda APENAS com um objeto JSON válido, sem texto adicional antes ou depois:
     "final_score": 0.0,
     "recommendations": "Recomendações específicas e acionáveis para melhoria do trabalho. Mínimo 200 caracteres."
   }}
-}}
+}}"""
+    
+    def _build_originality_block(self, originality: Optional[OriginalityReport]) -> str:
+        """
+        Constrói a seção do prompt com os trechos apontados pela triagem de originalidade
+        
+        Args:
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            str: Seção formatada (vazia sem triagem)
+        """
+        if originality is None:
+            return ""
+        
+        if originality.passages:
+            passages = "\n\n".join(
+                f"{number}. [sobreposição {passage.score:.0%}, {passage.words} palavras, fonte: {passage.source}]\n\"{passage.text}\""
+                for number, passage in enumerate(originality.passages, start=1)
+            )
+            instructions = "O Avaliador 3 deve examinar APENAS estes trechos quanto a plágio ou paráfrase inadequada, classificando o risco de cada um (Baixo/Médio/Alto) conforme a extensão da sobreposição e a presença de citação da fonte. Não procure plágio no restante do texto; a originalidade da contribuição e a coerência científica continuam sendo avaliadas normalmente."
+        else:
+            passages = "Nenhum trecho com sobreposição relevante foi encontrado."
+            instructions = "O Avaliador 3 não deve apontar plágio sem evidência; a originalidade da contribuição e a coerência científica continuam sendo avaliadas normalmente."
+        
+        return f"""## TRIAGEM DE ORIGINALIDADE
+
+Uma triagem automática comparou o artigo com um corpus local de {originality.corpus_documents} trabalhos e textos de referência ({originality.matched_fraction:.1%} das sequências de palavras do artigo coincidem com o corpus). {instructions}
+
+{passages}
+
+"""
+    
+    def _build_evaluation_prompt(self, text: str, originality: Optional[OriginalityReport] = None) -> str:
+        """
+        Constrói o prompt otimizado para avaliação de TCC
+        
+        Args:
+            text: Texto do TCC a ser avaliado
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            str: Prompt formatado
+        """
+        prompt = f"""{self._build_rubric()}
 
 ## ARTIGO PARA AVALIAÇÃO
 
 {text}
 
----
+{self._build_originality_block(originality)}---
 
 Agora, avalie o artigo acima seguindo rigorosamente as instruções e retorne APENAS o JSON formatado."""
         
         return prompt
     
-    async def evaluate_text(self, text: str) -> Dict[str, Any]:
+    def _build_section_prompt(self, section_title: str, text: str) -> str:
         """
-        Envia texto para avaliação via API do Perplexity
+        Constrói o prompt de análise parcial de uma seção do TCC (etapa "map")
         
         Args:
-            text: Texto do TCC a ser avaliado
+            section_title: Nome da seção (ex.: "Metodologia" ou "Resultados (2/3)")
+            text: Texto da seção (ou de um trecho dela)
             
         Returns:
-            Dict: Resposta estruturada da avaliação
+            str: Prompt formatado
+        """
+        prompt = f"""Você integra o sistema Veritas.AI, uma banca avaliadora de TCC com três avaliadores: Metodologia, Escrita Acadêmica e ABNT, e Originalidade e Coerência Científica. O trabalho é longo e está sendo analisado por seções; sua tarefa é produzir notas objetivas sobre UMA seção, que depois serão consolidadas no parecer final.
+
+## SEÇÃO: {section_title}
+
+{text}
+
+---
+
+Responda APENAS com um objeto JSON válido, sem texto adicional antes ou depois:
+
+{{
+  "section": "{section_title}",
+  "methodology_notes": "Observações sobre objetivos, métodos e sustentação dos resultados presentes nesta seção.",
+  "writing_notes": "Observações sobre conformidade ABNT, citações, referências e qualidade redacional.",
+  "originality_notes": "Observações sobre originalidade, trechos suspeitos de plágio (com risco Baixo/Médio/Alto) e coerência científica.",
+  "strengths": "Pontos fortes específicos da seção.",
+  "weaknesses": "Pontos fracos específicos da seção."
+}}"""
+        
+        return prompt
+    
+    def _build_reduce_prompt(
+        self,
+        section_analyses: List[Dict[str, Any]],
+        originality: Optional[OriginalityReport] = None
+    ) -> str:
+        """
+        Constrói o prompt de consolidação das análises parciais (etapa "reduce")
+        
+        Args:
+            section_analyses: Análises parciais retornadas por `evaluate_section`
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            str: Prompt formatado
+        """
+        analyses = "\n\n".join(
+            f"### {analysis.get('section', 'Seção')}\n{json.dumps(analysis, ensure_ascii=False, indent=2)}"
+            for analysis in section_analyses
+        )
+        
+        prompt = f"""{self._build_rubric()}
+
+## ANÁLISES PARCIAIS POR SEÇÃO
+
+O artigo é extenso e foi analisado seção por seção. Abaixo estão as notas parciais de cada seção, na ordem do documento. Consolide-as em um único parecer, considerando o trabalho como um todo.
+
+{analyses}
+
+{self._build_originality_block(originality)}---
+
+Agora, emita o parecer final a partir das análises acima seguindo rigorosamente as instruções e retorne APENAS o JSON formatado."""
+        
+        return prompt
+    
+    def _build_revision_prompt(
+        self,
+        previous_evaluation: Dict[str, Any],
+        changed_sections: List[Tuple[str, str]],
+        unchanged_titles: List[str],
+        originality: Optional[OriginalityReport] = None
+    ) -> str:
+        """
+        Constrói o prompt de reavaliação de uma versão revisada do TCC
+        
+        Apenas as seções alteradas são enviadas, junto com o parecer da versão anterior.
+        
+        Args:
+            previous_evaluation: Avaliação da versão anterior (avaliadores e parecer final)
+            changed_sections: Seções alteradas ou novas (título, texto)
+            unchanged_titles: Títulos das seções idênticas às da versão anterior
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            str: Prompt formatado
+        """
+        changed = "\n\n".join(f"### {title}\n\n{text}" for title, text in changed_sections)
+        unchanged = ", ".join(unchanged_titles) or "nenhuma"
+        
+        prompt = f"""{self._build_rubric()}
+
+## VERSÃO REVISADA
+
+Este artigo é uma versão revisada de um trabalho já avaliado por esta banca. Abaixo estão o parecer emitido para a versão anterior e o texto integral das seções que foram alteradas ou incluídas. As demais seções permanecem idênticas às da versão anterior.
+
+### Parecer da versão anterior
+
+{json.dumps(previous_evaluation, ensure_ascii=False, indent=2)}
+
+### Seções inalteradas
+
+{unchanged}
+
+## SEÇÕES ALTERADAS
+
+{changed}
+
+{self._build_originality_block(originality)}---
+
+Agora, atualize o parecer: mantenha o que foi dito sobre as seções inalteradas, reavalie as seções alteradas, ajuste as pontuações e o parecer final ao trabalho revisado como um todo e retorne APENAS o JSON formatado."""
+        
+        return prompt
+    
+    def _build_payload(
+        self,
+        prompt: str,
+        stream: bool = False,
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        partial: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Monta o corpo da requisição de avaliação
+        
+        Args:
+            prompt: Prompt do usuário já formatado
+            stream: Se True, solicita a resposta em streaming
+            max_tokens: Limite de tokens da resposta (padrão: `self.max_tokens`)
+            model: Modelo do destino escolhido (padrão: `self.model`)
+            partial: Resposta truncada; se informada, o modelo é solicitado a continuá-la
+            
+        Returns:
+            Dict: Payload da API de chat completions
         """
         if not self.api_key:
             raise ValueError("API Key do Perplexity não configurada. Configure a variável PERPLEXITY_API_KEY no arquivo .env")
         
-        prompt = self._build_evaluation_prompt(text)
-        
         payload = {
-            "model": self.model,
+            "model": model or self.model,
             "messages": [
                 {
                     "role": "system",
-                    "content": "Você é um sistema especializado em avaliação acadêmica. Responda sempre em formato JSON válido, sem texto adicional."
+                    "content": self.SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
                     "content": prompt
                 }
             ],
-            "temperature": 0.3,  # Baixa temperatura para respostas mais consistentes
-            "max_tokens": 4000
+            "temperature": self.temperature,
+            "max_tokens": max_tokens or self.max_tokens
         }
+        if partial is not None:
+            payload["messages"].extend([
+                {
+                    "role": "assistant",
+                    "content": partial
+                },
+                {
+                    "role": "user",
+                    "content": self.CONTINUATION_PROMPT
+                }
+            ])
+        if stream:
+            payload["stream"] = True
+        
+        return payload
+    
+    async def evaluate_text(self, text: str, originality: Optional[OriginalityReport] = None) -> Dict[str, Any]:
+        """
+        Envia texto para avaliação via API do Perplexity
+        
+        Args:
+            text: Texto do TCC a ser avaliado
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            Dict: Resposta estruturada da avaliação
+        """
+        with observe_stage("prompt_build"):
+            prompt = self._build_evaluation_prompt(text, originality)
+        return await self._request_json(prompt)
+    
+    async def evaluate_section(self, section_title: str, text: str) -> Dict[str, Any]:
+        """
+        Envia uma seção do TCC para análise parcial
+        
+        Args:
+            section_title: Nome da seção
+            text: Texto da seção (ou de um trecho dela)
+            
+        Returns:
+            Dict: Notas parciais da seção
+        """
+        with observe_stage("prompt_build"):
+            prompt = self._build_section_prompt(section_title, text)
+        analysis = await self._request_json(prompt, max_tokens=settings.map_reduce_section_max_tokens)
+        analysis["section"] = section_title
+        return analysis
+    
+    async def reduce_evaluations(
+        self,
+        section_analyses: List[Dict[str, Any]],
+        originality: Optional[OriginalityReport] = None
+    ) -> Dict[str, Any]:
+        """
+        Consolida análises parciais no formato de avaliação completa
+        
+        Args:
+            section_analyses: Análises parciais das seções
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            Dict: Resposta estruturada da avaliação
+        """
+        with observe_stage("prompt_build"):
+            prompt = self._build_reduce_prompt(section_analyses, originality)
+        return await self._request_json(prompt)
+    
+    async def continue_evaluation(
+        self,
+        text: str,
+        partial: str,
+        originality: Optional[OriginalityReport] = None
+    ) -> str:
+        """
+        Solicita ao modelo a continuação de uma avaliação truncada
         
+        Args:
+            text: Texto do TCC avaliado
+            partial: Resposta recebida até a interrupção
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            str: Continuação gerada a partir do ponto de parada
+        """
+        with observe_stage("prompt_build"):
+            prompt = self._build_evaluation_prompt(text, originality)
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.api_url,
+            return await self._complete(prompt, partial=partial)
+        except UpstreamUnavailableError:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Erro HTTP ao chamar API Perplexity: {e.response.status_code} - {e.response.text}")
+        except httpx.TimeoutException:
+            raise Exception("Timeout ao chamar API Perplexity. O texto pode ser muito longo.")
+        except Exception as e:
+            raise Exception(f"Erro ao comunicar com API Perplexity: {str(e)}")
+    
+    async def revise_evaluation(
+        self,
+        previous_evaluation: Dict[str, Any],
+        changed_sections: List[Tuple[str, str]],
+        unchanged_titles: List[str],
+        originality: Optional[OriginalityReport] = None
+    ) -> Dict[str, Any]:
+        """
+        Reavalia uma versão revisada enviando apenas as seções alteradas
+        
+        Args:
+            previous_evaluation: Avaliação da versão anterior
+            changed_sections: Seções alteradas ou novas (título, texto)
+            unchanged_titles: Títulos das seções inalteradas
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Returns:
+            Dict: Resposta estruturada da avaliação
+        """
+        with observe_stage("prompt_build"):
+            prompt = self._build_revision_prompt(previous_evaluation, changed_sections, unchanged_titles, originality)
+        return await self._request_json(prompt)
+    
+    async def _request_json(self, prompt: str, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Envia um prompt à API e interpreta a resposta como JSON
+        
+        A resposta é interpretada de forma tolerante (texto ao redor, marcadores de
+        código, vírgulas e aspas); se vier truncada, o modelo é solicitado a
+        continuar de onde parou em vez de gerar tudo novamente.
+        
+        Args:
+            prompt: Prompt do usuário já formatado
+            max_tokens: Limite de tokens da resposta
+            
+        Returns:
+            Dict: Objeto JSON retornado pelo modelo
+        """
+        # Valida a configuração antes de qualquer chamada
+        self._build_payload(prompt, max_tokens=max_tokens)
+        
+        try:
+            content = await self._complete(prompt, max_tokens)
+            
+            continuations = 0
+            while True:
+                # Esgotadas as continuações, o objeto truncado é fechado à força (a validação decide se basta)
+                exhausted = continuations >= settings.json_continuation_max_attempts
+                try:
+                    with observe_stage("json_parse"):
+                        data, method = loads_tolerant(content, allow_truncated=exhausted)
+                    break
+                except JsonRepairError as e:
+                    if not e.truncated or exhausted:
+                        JSON_RESPONSES.inc(outcome="failed")
+                        raise Exception(f"Erro ao parsear resposta JSON da IA: {str(e)}\nConteúdo: {content[:500]}")
+                
+                continuations += 1
+                continuation = await self._complete(prompt, max_tokens, partial=content)
+                content = merge_continuation(content, continuation)
+            
+            JSON_RESPONSES.inc(outcome="continued" if continuations and method != "closed" else method)
+            if not isinstance(data, dict):
+                raise Exception("Resposta JSON da IA não é um objeto")
+            return data
+        
+        except UpstreamUnavailableError:
+            raise
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"Erro HTTP ao chamar API Perplexity: {e.response.status_code} - {e.response.text}")
+        except httpx.TimeoutException:
+            raise Exception("Timeout ao chamar API Perplexity. O texto pode ser muito longo.")
+        except Exception as e:
+            raise Exception(f"Erro ao comunicar com API Perplexity: {str(e)}")
+    
+    async def _complete(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        partial: Optional[str] = None
+    ) -> str:
+        """
+        Realiza uma chamada de chat completions roteada entre os destinos
+        
+        Args:
+            prompt: Prompt do usuário já formatado
+            max_tokens: Limite de tokens da resposta
+            partial: Resposta truncada a ser continuada pelo modelo
+            
+        Returns:
+            str: Conteúdo gerado pelo modelo
+        """
+        # Latências de análises parciais e de avaliações completas são acompanhadas separadamente
+        kind = "section" if max_tokens else "evaluation"
+        client = get_http_client()
+        UPSTREAM_PROMPT_CHARS.inc(len(prompt) + (len(partial) + len(self.CONTINUATION_PROMPT) if partial else 0))
+        
+        async def call(target: UpstreamTarget) -> httpx.Response:
+            payload = self._build_payload(prompt, max_tokens=max_tokens, model=target.model, partial=partial)
+            response = await target.guard.send(
+                lambda: client.post(
+                    target.url,
                     headers=self._get_headers(),
                     json=payload
                 )
-                
+            )
+            response.raise_for_status()
+            return response
+        
+        with observe_stage("upstream"):
+            response = await get_target_router().run(call, kind)
+        
+        with observe_stage("response_decode"):
+            result = response.json()
+        record_usage(result.get("usage"))
+        
+        # Extrai o conteúdo da resposta
+        if not result.get("choices"):
+            raise Exception("Resposta da API não contém choices")
+        content = result["choices"][0]["message"]["content"]
+        UPSTREAM_RESPONSE_CHARS.inc(len(content))
+        return content
+    
+    async def stream_evaluation(
+        self,
+        text: str,
+        originality: Optional[OriginalityReport] = None
+    ) -> AsyncIterator[str]:
+        """
+        Envia texto para avaliação em modo streaming
+        
+        Args:
+            text: Texto do TCC a ser avaliado
+            originality: Triagem de originalidade do trabalho (None = sem triagem)
+            
+        Yields:
+            str: Fragmentos do conteúdo gerado, na ordem em que chegam
+        """
+        with observe_stage("prompt_build"):
+            prompt = self._build_evaluation_prompt(text, originality)
+        # Streaming não usa cobertura: a resposta já começa a ser consumida pelo cliente
+        target = get_target_router().ranked("evaluation")[0]
+        payload = self._build_payload(prompt, stream=True, model=target.model)
+        UPSTREAM_PROMPT_CHARS.inc(len(prompt))
+        
+        try:
+            client = get_http_client()
+            request = client.build_request(
+                "POST",
+                target.url,
+                headers=self._get_headers(),
+                json=payload
+            )
+            # Novas tentativas só são possíveis antes do primeiro fragmento recebido
+            with observe_stage("upstream_first_byte"):
+                response = await target.guard.send(lambda: client.send(request, stream=True))
+            try:
+                if response.is_error:
+                    await response.aread()
                 response.raise_for_status()
                 
-                result = response.json()
-                
-                # Extrai o conteúdo da resposta
-                if "choices" in result and len(result["choices"]) > 0:
-                    content = result["choices"][0]["message"]["content"]
+                async for line in response.aiter_lines():
+                    line = line.strip()
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
                     
-                    # Tenta parsear o JSON da resposta
                     try:
-                        # Remove possíveis marcadores de código
-                        content = content.strip()
-                        if content.startswith("```json"):
-                            content = content[7:]
-                        if content.startswith("```"):
-                            content = content[3:]
-                        if content.endswith("```"):
-                            content = content[:-3]
-                        content = content.strip()
-                        
-                        evaluation_data = json.loads(content)
-                        return evaluation_data
-                    except json.JSONDecodeError as e:
-                        raise Exception(f"Erro ao parsear resposta JSON da IA: {str(e)}\nConteúdo: {content[:500]}")
-                else:
-                    raise Exception("Resposta da API não contém choices")
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    
+                    # O uso de tokens costuma vir no último fragmento
+                    record_usage(chunk.get("usage"))
+                    
+                    choices = chunk.get("choices") or []
+                    if not choices:
+                        continue
+                    
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        UPSTREAM_RESPONSE_CHARS.inc(len(content))
+                        yield content
+            finally:
+                await response.aclose()
         
+        except UpstreamUnavailableError:
+            raise
         except httpx.HTTPStatusError as e:
             raise Exception(f"Erro HTTP ao chamar API Perplexity: {e.response.status_code} - {e.response.text}")
         except httpx.TimeoutException:
             raise Exception("Timeout ao chamar API Perplexity. O texto pode ser muito longo.")
         except Exception as e:
             raise Exception(f"Erro ao comunicar com API Perplexity: {str(e)}")
-
@@ -0,0 +1,481 @@
+"""
+Controle de taxa, novas tentativas e circuit breaker para chamadas à API do modelo
+"""
+import asyncio
+import math
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+import httpx
+from backend.config import settings
+from backend.services.shared_state import SharedState, get_shared_state, json_updater
+from backend.utils.metrics import UPSTREAM_RESPONSES
+
+
+# Respostas que indicam indisponibilidade temporária (vale a pena tentar novamente)
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Falhas de transporte em que a requisição não chegou a ser processada pelo servidor.
+# Timeouts de leitura não são repetidos: com textos longos, repetir apenas multiplica a espera.
+RETRYABLE_EXCEPTIONS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.PoolTimeout,
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
+    httpx.WriteError
+)
+
+
+class UpstreamUnavailableError(Exception):
+    """
+    Erro lançado quando a API do modelo está indisponível (circuit breaker aberto
+    ou novas tentativas esgotadas). As rotas o convertem em HTTP 503.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Interpreta o cabeçalho `Retry-After` (segundos ou data HTTP)
+
+    Returns:
+        Optional[float]: Espera em segundos, ou None se ausente/inválido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """
+    Espera antes da nova tentativa: backoff exponencial com jitter completo
+
+    Args:
+        attempt: Número da nova tentativa (1 = primeira repetição)
+        base: Espera base em segundos
+        maximum: Espera máxima em segundos
+    """
+    return random.uniform(0, min(maximum, base * (2 ** (attempt - 1))))
+
+
+class TokenBucket:
+    """
+    Limitador de taxa do tipo token bucket
+
+    Permite rajadas de até `capacity` requisições e uma taxa sustentada de `rate`
+    requisições por segundo. Quando a API responde 429 com `Retry-After`, o bucket
+    inteiro é pausado, de modo que as requisições concorrentes aguardem em vez de
+    também serem rejeitadas.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: Requisições por segundo (0 = sem limite)
+            capacity: Tamanho máximo da rajada
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Suspende a liberação de requisições pelo tempo indicado"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> float:
+        """
+        Aguarda a liberação de uma requisição
+
+        Returns:
+            float: Tempo total de espera em segundos
+        """
+        waited = 0.0
+        # O lock mantém a ordem de chegada entre as requisições em espera
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                delay = self._paused_until - now
+                if delay <= 0 and self.rate > 0:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                    self._updated_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+                elif delay <= 0:
+                    return waited
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket com estado no armazenamento compartilhado entre os workers
+
+    A taxa e as pausas por `Retry-After` valem para o conjunto dos processos, e não
+    para cada um. Usa o relógio de parede, comparável entre processos. Se o
+    armazenamento compartilhado falhar, recorre ao bucket local do processo.
+    """
+
+    def __init__(self, state: SharedState, key: str, rate: float, capacity: int):
+        """
+        Args:
+            state: Armazenamento compartilhado
+            key: Chave do bucket (uma por destino da API)
+            rate: Requisições por segundo (0 = sem limite)
+            capacity: Tamanho máximo da rajada
+        """
+        super().__init__(rate, capacity)
+        self.state = state
+        self.key = key
+        # Tempo para o bucket se encher novamente (após isso o estado pode expirar)
+        self.ttl_seconds = max(60.0, 2 * self.capacity / rate) if rate > 0 else 60.0
+
+    def _take(self, bucket: Dict[str, Any]):
+        """Consome um token do estado compartilhado, ou calcula a espera"""
+        now = time.time()
+        paused_until = bucket.get("paused_until", 0.0)
+        if paused_until > now:
+            return bucket, paused_until - now
+        if self.rate <= 0:
+            return None, 0.0
+
+        elapsed = max(0.0, now - bucket.get("updated_at", now))
+        tokens = min(self.capacity, bucket.get("tokens", float(self.capacity)) + elapsed * self.rate)
+        delay = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            delay = (1 - tokens) / self.rate
+        return {"tokens": tokens, "updated_at": now}, delay
+
+    def _propagate_pause(self, until: float, ttl_seconds: float):
+        """Grava a pausa no estado compartilhado (E/S bloqueante)"""
+
+        def extend(bucket: Dict[str, Any]):
+            bucket["paused_until"] = max(bucket.get("paused_until", 0.0), until)
+            return bucket, None
+
+        try:
+            self.state.update(self.key, json_updater(extend), ttl_seconds)
+        except Exception as e:
+            print(f"Aviso: Falha ao propagar a pausa do limite de taxa aos workers: {e}")
+
+    def pause(self, seconds: float):
+        """
+        Suspende a liberação de requisições em todos os workers
+
+        A pausa local vale de imediato; a propagação aos demais workers roda em uma
+        thread quando chamada a partir do event loop.
+        """
+        super().pause(seconds)
+        args = (time.time() + seconds, max(self.ttl_seconds, seconds + 1))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._propagate_pause(*args)
+        else:
+            loop.run_in_executor(None, self._propagate_pause, *args)
+
+    async def acquire(self) -> float:
+        """
+        Aguarda a liberação de uma requisição pelo bucket compartilhado
+
+        Returns:
+            float: Tempo total de espera em segundos
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                try:
+                    # O armazenamento compartilhado faz E/S bloqueante (SQLite, Redis)
+                    delay = await asyncio.to_thread(
+                        self.state.update, self.key, json_updater(self._take), self.ttl_seconds
+                    )
+                except Exception as e:
+                    print(f"Aviso: Limite de taxa compartilhado indisponível, usando o limite do processo: {e}")
+                    break
+                if delay <= 0:
+                    return waited
+                await asyncio.sleep(delay)
+                waited += delay
+        return waited + await super().acquire()
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de três estados (fechado, aberto, semiaberto)
+
+    Após `failure_threshold` falhas consecutivas o circuito abre e as chamadas
+    falham imediatamente por `recovery_seconds`. Em seguida uma única chamada de
+    teste é liberada: sucesso fecha o circuito, falha o reabre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0):
+        """
+        Args:
+            failure_threshold: Falhas consecutivas para abrir o circuito (0 = desativado)
+            recovery_seconds: Tempo em aberto antes da chamada de teste
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Estado atual (o circuito aberto passa a semiaberto após o tempo de recuperação)"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def retry_after(self) -> float:
+        """Segundos restantes até a próxima chamada de teste"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_seconds - (time.monotonic() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Indica se uma chamada pode ser feita agora"""
+        if self.failure_threshold <= 0:
+            return True
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self):
+        """Libera a chamada de teste encerrada sem resultado (ex.: 429, cancelamento)"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        """Registra uma chamada bem-sucedida"""
+        self.consecutive_failures = 0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Registra uma falha do servidor ou de transporte"""
+        self.consecutive_failures += 1
+        if self.failure_threshold <= 0:
+            return
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class UpstreamGuard:
+    """
+    Envolve as chamadas à API com limitador de taxa, novas tentativas e circuit breaker
+
+    Há uma instância por destino da API (ver `backend.services.routing`), compartilhada
+    pelo processo, para que o limite de taxa e o estado do circuito reflitam todas as
+    requisições em andamento para aquele destino. Com estado compartilhado configurado
+    (`Settings.shared_state_backend`), o limite de taxa vale para todos os workers.
+    """
+
+    def __init__(
+        self,
+        rate_limit_per_second: float = 0.0,
+        rate_limit_burst: int = 1,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 30.0,
+        retry_after_max_seconds: float = 60.0,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_seconds: float = 30.0,
+        rate_limiter: Optional[TokenBucket] = None
+    ):
+        """
+        Args:
+            rate_limit_per_second: Requisições por segundo (0 = sem limite)
+            rate_limit_burst: Tamanho máximo da rajada
+            max_retries: Novas tentativas após a primeira falha
+            backoff_base_seconds: Espera base do backoff exponencial
+            backoff_max_seconds: Espera máxima do backoff exponencial
+            retry_after_max_seconds: Maior `Retry-After` aceito (acima disso, falha imediatamente)
+            breaker_failure_threshold: Falhas consecutivas para abrir o circuito (0 = desativado)
+            breaker_recovery_seconds: Tempo em aberto antes da chamada de teste
+            rate_limiter: Limitador de taxa já construído (ex.: compartilhado entre workers);
+                se omitido, usa um token bucket do processo com a taxa e a rajada acima
+        """
+        self.rate_limiter = rate_limiter or TokenBucket(rate_limit_per_second, rate_limit_burst)
+        self.breaker = CircuitBreaker(breaker_failure_threshold, breaker_recovery_seconds)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.retry_after_max_seconds = retry_after_max_seconds
+
+        self._stats: Dict[str, Any] = {
+            "requests": 0,
+            "attempts": 0,
+            "retries": 0,
+            "retries_by_reason": {},
+            "retry_wait_seconds": 0.0,
+            "rate_limit_wait_seconds": 0.0,
+            "rejected_by_breaker": 0,
+            "exhausted": 0
+        }
+
+    @classmethod
+    def from_settings(cls, name: str = "default") -> "UpstreamGuard":
+        """
+        Cria a instância a partir de `Settings`
+
+        Args:
+            name: Identificador do destino (chave do limite de taxa compartilhado entre workers)
+        """
+        state = get_shared_state()
+        rate_limiter = SharedTokenBucket(
+            state,
+            f"ratelimit:{name}",
+            settings.upstream_rate_limit_per_second,
+            settings.upstream_rate_limit_burst
+        ) if state is not None else None
+        return cls(
+            rate_limit_per_second=settings.upstream_rate_limit_per_second,
+            rate_limit_burst=settings.upstream_rate_limit_burst,
+            max_retries=settings.upstream_max_retries,
+            backoff_base_seconds=settings.upstream_backoff_base_seconds,
+            backoff_max_seconds=settings.upstream_backoff_max_seconds,
+            retry_after_max_seconds=settings.upstream_retry_after_max_seconds,
+            breaker_failure_threshold=settings.upstream_breaker_failure_threshold,
+            breaker_recovery_seconds=settings.upstream_breaker_recovery_seconds,
+            rate_limiter=rate_limiter
+        )
+
+    def _reject(self):
+        """Falha imediatamente enquanto o circuito estiver aberto"""
+        self._stats["rejected_by_breaker"] += 1
+        retry_after = self.breaker.retry_after()
+        raise UpstreamUnavailableError(
+            f"API Perplexity temporariamente indisponível. Tente novamente em {math.ceil(retry_after) or 1}s.",
+            retry_after=retry_after
+        )
+
+    async def send(self, request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Executa uma requisição com controle de taxa, novas tentativas e circuit breaker
+
+        Args:
+            request: Função que envia a requisição e retorna a resposta (chamada a cada tentativa)
+
+        Returns:
+            httpx.Response: Primeira resposta não repetível (sucesso ou erro do cliente)
+
+        Raises:
+            UpstreamUnavailableError: Circuito aberto ou novas tentativas esgotadas
+        """
+        self._stats["requests"] += 1
+        attempt = 0
+
+        while True:
+            if not self.breaker.allow_request():
+                self._reject()
+            # No estado semiaberto, apenas a chamada de teste passa por `allow_request`
+            probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+            resolved = False
+
+            try:
+                self._stats["rate_limit_wait_seconds"] += await self.rate_limiter.acquire()
+                self._stats["attempts"] += 1
+
+                retry_after = None
+                try:
+                    response = await request()
+                except RETRYABLE_EXCEPTIONS as e:
+                    UPSTREAM_RESPONSES.inc(status=type(e).__name__)
+                    self.breaker.record_failure()
+                    resolved = True
+                    reason, detail = type(e).__name__, f"falha de conexão ({type(e).__name__})"
+                except httpx.TimeoutException as e:
+                    UPSTREAM_RESPONSES.inc(status=type(e).__name__)
+                    self.breaker.record_failure()
+                    resolved = True
+                    raise
+                else:
+                    UPSTREAM_RESPONSES.inc(status=str(response.status_code))
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        if response.status_code < 500:
+                            self.breaker.record_success()
+                            resolved = True
+                        return response
+
+                    # 429 indica limitação de taxa, não falha do servidor: a chamada de
+                    # teste é apenas liberada (no `finally`)
+                    if response.status_code != 429:
+                        self.breaker.record_failure()
+                        resolved = True
+                    retry_after = parse_retry_after(response.headers.get("retry-after"))
+                    reason, detail = str(response.status_code), f"HTTP {response.status_code}"
+                    await response.aclose()
+
+                attempt += 1
+                if attempt > self.max_retries or (retry_after or 0) > self.retry_after_max_seconds:
+                    self._stats["exhausted"] += 1
+                    raise UpstreamUnavailableError(
+                        f"API Perplexity indisponível após {attempt} tentativa(s): {detail}",
+                        retry_after=retry_after
+                    )
+            finally:
+                # Chamada de teste encerrada sem sucesso nem falha registrados (429,
+                # cancelamento na espera do limite de taxa ou na requisição, erro inesperado)
+                if probe and not resolved:
+                    self.breaker.release_probe()
+
+            delay = retry_after if retry_after is not None else backoff_delay(
+                attempt, self.backoff_base_seconds, self.backoff_max_seconds
+            )
+            if reason == "429" and retry_after is not None:
+                self.rate_limiter.pause(retry_after)
+
+            by_reason = self._stats["retries_by_reason"]
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+            self._stats["retries"] += 1
+            self._stats["retry_wait_seconds"] += delay
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores de tentativas, esperas e o estado do circuit breaker"""
+        stats = dict(self._stats)
+        stats["retries_by_reason"] = dict(stats["retries_by_reason"])
+        stats["retry_wait_seconds"] = round(stats["retry_wait_seconds"], 3)
+        stats["rate_limit_wait_seconds"] = round(stats["rate_limit_wait_seconds"], 3)
+        stats["breaker"] = {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "times_opened": self.breaker.times_opened,
+            "retry_after_seconds": round(self.breaker.retry_after(), 3)
+        }
+        return stats
+
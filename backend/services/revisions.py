@@ -0,0 +1,352 @@
+"""
+Detecção de versões revisadas de um TCC (MinHash/LSH) para reavaliação incremental
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from backend.config import settings
+from backend.services.cache import normalize_text
+from backend.services.sections import split_sections
+from backend.utils.shingles import text_shingles
+
+
+# Primo de Mersenne 2^61 - 1 usado nas permutações do MinHash
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+# Shingles processados por bloco no cálculo da assinatura (limita a memória temporária)
+_SIGNATURE_BLOCK = 4096
+
+
+class MinHasher:
+    """Assinaturas MinHash de conjuntos de shingles de palavras"""
+
+    def __init__(self, num_perm: int = 128, shingle_words: int = 5, seed: int = 1):
+        """
+        Args:
+            num_perm: Número de permutações (tamanho da assinatura)
+            shingle_words: Palavras por shingle
+            seed: Semente das permutações (assinaturas só são comparáveis com a mesma semente)
+        """
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        rng = np.random.RandomState(seed)
+        # Coeficientes de 32 bits: a * h + b cabe em 64 bits para h < 2^32
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Calcula a assinatura MinHash de um texto
+
+        Args:
+            text: Texto do documento
+
+        Returns:
+            np.ndarray: Assinatura (uint64, `num_perm` posições)
+        """
+        shingles = text_shingles(text, self.shingle_words) & np.uint64(0xFFFFFFFF)
+        signature = np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        for start in range(0, len(shingles), _SIGNATURE_BLOCK):
+            block = shingles[start:start + _SIGNATURE_BLOCK]
+            permuted = (self._a[:, None] * block[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimativa da similaridade de Jaccard entre dois documentos"""
+        return float(np.mean(first == second))
+
+
+class DocumentSection(NamedTuple):
+    """Seção de um documento identificada por hash de conteúdo"""
+    id: str
+    title: str
+    hash: str
+    text: str
+
+
+def section_hash(title: str, text: str) -> str:
+    """Hash do conteúdo normalizado de uma seção (ou trecho de seção)"""
+    return hashlib.sha256(f"{title}\n{normalize_text(text)}".encode("utf-8")).hexdigest()[:32]
+
+
+def document_sections(text: str) -> List[DocumentSection]:
+    """
+    Divide o documento em seções comparáveis entre versões
+
+    Seções repetidas recebem um sufixo de ocorrência no identificador (ex.: `results#2`).
+
+    Args:
+        text: Texto completo do TCC
+
+    Returns:
+        List[DocumentSection]: Seções na ordem do documento (vazia se nenhum cabeçalho for reconhecido)
+    """
+    occurrences: Dict[str, int] = {}
+    sections = []
+    for section in split_sections(text):
+        occurrences[section.key] = occurrences.get(section.key, 0) + 1
+        count = occurrences[section.key]
+        section_id = section.key if count == 1 else f"{section.key}#{count}"
+        sections.append(DocumentSection(section_id, section.title, section_hash(section.title, section.text), section.text))
+    return sections
+
+
+class RevisionMatch(NamedTuple):
+    """Versão anterior encontrada para um documento"""
+    document_id: str
+    similarity: float
+    record: Dict[str, Any]
+
+
+class RevisionIndex:
+    """
+    Índice MinHash/LSH de documentos já avaliados
+
+    Cada documento é registrado com sua assinatura MinHash, os hashes de suas
+    seções, a avaliação emitida e as análises parciais de seção (quando avaliado
+    por map-reduce). A assinatura é dividida em faixas (bandas); documentos que
+    coincidem em alguma faixa são candidatos, confirmados pela similaridade estimada.
+
+    Os registros são persistidos em um arquivo JSON Lines (somente acréscimo),
+    compactado ao carregar quando excede o limite de entradas. Com vários workers,
+    os registros acrescentados por outros processos são lidos a cada consulta.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = 5000,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_words: int = 5,
+        threshold: float = 0.5
+    ):
+        """
+        Args:
+            path: Arquivo de persistência (None = apenas em memória)
+            max_entries: Número máximo de documentos mantidos (os mais antigos são descartados)
+            num_perm: Tamanho da assinatura MinHash
+            bands: Número de faixas do LSH (`num_perm` deve ser múltiplo)
+            shingle_words: Palavras por shingle
+            threshold: Similaridade mínima estimada para considerar uma versão anterior
+        """
+        if num_perm % bands:
+            raise ValueError("O número de permutações do MinHash deve ser múltiplo do número de faixas do LSH")
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_words)
+
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "matches": 0, "candidates": 0, "added": 0}
+        # Arquivo (dispositivo, inode) e posição até onde os registros já foram lidos
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+
+        if self.path:
+            self._load()
+
+    @classmethod
+    def from_settings(cls) -> "RevisionIndex":
+        """Cria o índice a partir de `Settings`"""
+        return cls(
+            path=settings.revision_index_path or None,
+            max_entries=settings.revision_index_max_entries,
+            num_perm=settings.revision_minhash_permutations,
+            bands=settings.revision_lsh_bands,
+            shingle_words=settings.revision_shingle_words,
+            threshold=settings.revision_similarity_threshold
+        )
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _insert(self, document_id: str, signature: np.ndarray, record: Dict[str, Any]):
+        """Insere um documento no índice em memória (o lock deve estar adquirido)"""
+        self._remove(document_id)
+        self._records[document_id] = record
+        self._signatures[document_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(document_id)
+        while len(self._records) > self.max_entries:
+            self._remove(next(iter(self._records)))
+
+    def _remove(self, document_id: str):
+        """Remove um documento do índice em memória (o lock deve estar adquirido)"""
+        if self._records.pop(document_id, None) is None:
+            return
+        signature = self._signatures.pop(document_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(document_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def _load(self):
+        """Carrega os registros persistidos, compactando o arquivo se necessário"""
+        lines = self._read_new_records()
+        if lines > len(self._records) * 2 and lines > 100:
+            self._compact()
+
+    def _read_new_records(self) -> int:
+        """
+        Lê os registros acrescentados ao arquivo desde a última leitura (o lock deve estar adquirido)
+
+        Se o arquivo foi substituído (compactado por outro processo), recarrega-o do início.
+
+        Returns:
+            int: Número de linhas lidas
+        """
+        try:
+            stat = os.stat(self.path)
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id != self._file_id:
+                if self._file_id is not None:
+                    self._records.clear()
+                    self._signatures.clear()
+                    self._buckets = [{} for _ in range(self.bands)]
+                self._file_id = file_id
+                self._offset = 0
+            if stat.st_size <= self._offset:
+                return 0
+            with open(self.path, "rb") as file:
+                file.seek(self._offset)
+                data = file.read()
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            print(f"Aviso: Falha ao carregar o índice de versões ({self.path}): {e}")
+            return 0
+
+        # Uma linha sem quebra no final ainda está sendo gravada por outro processo
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        lines = data[:end].splitlines()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                signature = np.asarray(entry.pop("signature"), dtype=np.uint64)
+            except (ValueError, KeyError):
+                continue
+            if len(signature) != self.hasher.num_perm:
+                continue
+            self._insert(entry["id"], signature, entry)
+        return len(lines)
+
+    def _compact(self):
+        """Reescreve o arquivo apenas com os registros atuais"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                for document_id, record in self._records.items():
+                    entry = {**record, "signature": self._signatures[document_id].tolist()}
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+            stat = os.stat(self.path)
+            self._file_id = (stat.st_dev, stat.st_ino)
+            self._offset = stat.st_size
+        except OSError as e:
+            print(f"Aviso: Falha ao compactar o índice de versões ({self.path}): {e}")
+
+    def _append(self, entry: Dict[str, Any]):
+        """Acrescenta um registro ao arquivo de persistência"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"Aviso: Falha ao gravar o índice de versões ({self.path}): {e}")
+
+    def signature(self, text: str) -> np.ndarray:
+        """Assinatura MinHash de um texto (operação de CPU; use em thread separada)"""
+        return self.hasher.signature(text)
+
+    def find(self, signature: np.ndarray, exclude: Optional[str] = None) -> Optional[RevisionMatch]:
+        """
+        Procura a versão anterior mais parecida com um documento
+
+        Args:
+            signature: Assinatura MinHash do documento
+            exclude: Identificador a ignorar (o próprio documento)
+
+        Returns:
+            Optional[RevisionMatch]: Documento mais similar acima do limiar, ou None
+        """
+        with self._lock:
+            if self.path:
+                self._read_new_records()
+            self._stats["lookups"] += 1
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+            candidates.discard(exclude)
+            self._stats["candidates"] += len(candidates)
+
+            best: Optional[Tuple[float, str]] = None
+            for document_id in candidates:
+                similarity = MinHasher.similarity(signature, self._signatures[document_id])
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, document_id)
+            if best is None:
+                return None
+
+            self._stats["matches"] += 1
+            return RevisionMatch(best[1], best[0], self._records[best[1]])
+
+    def add(
+        self,
+        document_id: str,
+        signature: np.ndarray,
+        sections: List[DocumentSection],
+        evaluation: Dict[str, Any],
+        analyses: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        """
+        Registra um documento avaliado
+
+        Args:
+            document_id: Identificador do documento (chave de cache da avaliação)
+            signature: Assinatura MinHash
+            sections: Seções do documento
+            evaluation: Avaliação emitida (avaliadores e parecer final)
+            analyses: Análises parciais por hash de trecho (avaliação por map-reduce)
+        """
+        record = {
+            "id": document_id,
+            "created_at": time.time(),
+            "sections": {section.id: section.hash for section in sections},
+            "evaluation": evaluation,
+            "analyses": analyses or {}
+        }
+        with self._lock:
+            self._insert(document_id, signature, record)
+            self._stats["added"] += 1
+        if self.path:
+            self._append({**record, "signature": signature.tolist()})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do índice"""
+        with self._lock:
+            return {
+                "enabled": True,
+                "documents": len(self._records),
+                "bands": self.bands,
+                "rows_per_band": self.rows,
+                "threshold": self.threshold,
+                **self._stats
+            }
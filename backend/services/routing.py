@@ -0,0 +1,294 @@
+"""
+Roteamento entre múltiplos destinos da API (endpoint + modelo) com requisições de cobertura (hedging)
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, TypeVar
+from backend.config import settings
+from backend.services.resilience import UpstreamGuard
+
+
+T = TypeVar("T")
+
+# Peso da taxa de erro na pontuação de roteamento (erro de 25% ≈ dobra a latência efetiva)
+ERROR_RATE_PENALTY = 4.0
+
+# Pontuação de destinos sem latência medida que só registraram falhas
+UNMEASURED_FAILING_SCORE = 1e6
+
+# Suavização exponencial da taxa de erro
+ERROR_RATE_ALPHA = 0.2
+
+
+class TargetConfig(NamedTuple):
+    """Destino configurado: URL de chat completions e modelo"""
+    url: str
+    model: str
+
+
+def parse_targets(value: str) -> List[TargetConfig]:
+    """
+    Interpreta a lista de destinos (`url|modelo`, separados por vírgula)
+
+    Args:
+        value: Ex.: "https://api.perplexity.ai/chat/completions|sonar,https://api.perplexity.ai/chat/completions|sonar-pro"
+
+    Returns:
+        List[TargetConfig]: Destinos na ordem de preferência configurada
+    """
+    targets = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, model = item.partition("|")
+        targets.append(TargetConfig(url.strip(), model.strip() or settings.perplexity_model))
+    return targets
+
+
+class UpstreamTarget:
+    """Destino da API com seu próprio controle de taxa/circuit breaker e histórico de latência"""
+
+    def __init__(self, config: TargetConfig, guard: UpstreamGuard, window: int = 100):
+        """
+        Args:
+            config: URL e modelo
+            guard: Controle de taxa, novas tentativas e circuit breaker do destino
+            window: Número de latências recentes mantidas por tipo de requisição
+        """
+        self.url = config.url
+        self.model = config.model
+        self.name = f"{config.model}@{config.url}"
+        self.guard = guard
+        self.window = window
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def latencies(self, kind: str) -> List[float]:
+        """Latências recentes (ordenadas) de um tipo de requisição"""
+        return sorted(self._latencies.get(kind, ()))
+
+    def percentile(self, kind: str, fraction: float) -> Optional[float]:
+        """Percentil das latências recentes, ou None sem amostras"""
+        values = self.latencies(kind)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def record_latency(self, kind: str, seconds: float):
+        samples = self._latencies.get(kind)
+        if samples is None:
+            samples = self._latencies[kind] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def record_outcome(self, success: bool):
+        self.requests += 1
+        if not success:
+            self.failures += 1
+        self.error_rate += ERROR_RATE_ALPHA * ((0.0 if success else 1.0) - self.error_rate)
+
+    def score(self, kind: str) -> float:
+        """Pontuação de roteamento (menor é melhor): latência mediana penalizada pela taxa de erro"""
+        penalty = 1.0 + ERROR_RATE_PENALTY * self.error_rate
+        median = self.percentile(kind, 0.5)
+        if median is None:
+            # Destino ainda não usado tem prioridade para ser medido; se só falhou, vai para o fim
+            return 0.0 if self.failures == 0 else UNMEASURED_FAILING_SCORE * penalty
+        if self.guard.breaker.state == self.guard.breaker.OPEN:
+            penalty *= 1000
+        return median * penalty
+
+    def get_stats(self) -> Dict[str, Any]:
+        latency = {}
+        for kind in sorted(self._latencies):
+            latency[kind] = {
+                "samples": len(self._latencies[kind]),
+                "p50": round(self.percentile(kind, 0.5), 3),
+                "p90": round(self.percentile(kind, 0.9), 3)
+            }
+        return {
+            "name": self.name,
+            "url": self.url,
+            "model": self.model,
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 4),
+            "latency": latency,
+            **self.guard.get_stats()
+        }
+
+
+class TargetRouter:
+    """
+    Distribui as chamadas entre os destinos configurados
+
+    Cada chamada vai primeiro ao destino de menor latência recente (penalizada pela
+    taxa de erro). Se ele não responder dentro do percentil configurado de suas
+    latências recentes, uma requisição de cobertura é enviada ao próximo destino;
+    vale a primeira resposta bem-sucedida e a outra é cancelada. Falhas acionam o
+    próximo destino imediatamente.
+    """
+
+    def __init__(
+        self,
+        targets: List[UpstreamTarget],
+        hedging_enabled: bool = True,
+        hedge_percentile: float = 0.9,
+        hedge_min_samples: int = 10,
+        hedge_default_delay_seconds: float = 30.0,
+        hedge_min_delay_seconds: float = 1.0
+    ):
+        """
+        Args:
+            targets: Destinos na ordem de preferência configurada
+            hedging_enabled: Habilita requisições de cobertura
+            hedge_percentile: Percentil da latência recente que dispara a cobertura
+            hedge_min_samples: Amostras necessárias para usar o percentil
+            hedge_default_delay_seconds: Espera antes da cobertura enquanto não há amostras suficientes
+            hedge_min_delay_seconds: Espera mínima antes da cobertura
+        """
+        if not targets:
+            raise ValueError("Nenhum destino da API configurado")
+        self.targets = targets
+        self.hedging_enabled = hedging_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay_seconds = hedge_default_delay_seconds
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self._stats = {"calls": 0, "hedges": 0, "hedge_wins": 0, "failovers": 0}
+
+    @classmethod
+    def from_settings(cls) -> "TargetRouter":
+        """Cria o roteador a partir de `Settings`"""
+        configs = parse_targets(settings.perplexity_targets) or [
+            TargetConfig(settings.perplexity_api_url, settings.perplexity_model)
+        ]
+        return cls(
+            [
+                UpstreamTarget(config, UpstreamGuard.from_settings(f"{config.model}@{config.url}"), settings.routing_latency_window)
+                for config in configs
+            ],
+            hedging_enabled=settings.hedging_enabled,
+            hedge_percentile=settings.hedge_percentile,
+            hedge_min_samples=settings.hedge_min_samples,
+            hedge_default_delay_seconds=settings.hedge_default_delay_seconds,
+            hedge_min_delay_seconds=settings.hedge_min_delay_seconds
+        )
+
+    def ranked(self, kind: str) -> List[UpstreamTarget]:
+        """Destinos ordenados pela pontuação (empates mantêm a ordem configurada)"""
+        return sorted(self.targets, key=lambda target: target.score(kind))
+
+    def hedge_delay(self, target: UpstreamTarget, kind: str) -> float:
+        """Tempo de espera pela resposta do destino antes de enviar a cobertura"""
+        if len(target.latencies(kind)) < self.hedge_min_samples:
+            return self.hedge_default_delay_seconds
+        return max(self.hedge_min_delay_seconds, target.percentile(kind, self.hedge_percentile))
+
+    async def run(self, call: Callable[[UpstreamTarget], Awaitable[T]], kind: str = "default") -> T:
+        """
+        Executa uma chamada roteada, com cobertura e troca de destino em caso de falha
+
+        Args:
+            call: Função que realiza a chamada a um destino
+            kind: Tipo de requisição (latências são acompanhadas separadamente por tipo)
+
+        Returns:
+            T: Resultado da primeira chamada bem-sucedida
+
+        Raises:
+            Exception: Erro do primeiro destino, se todos falharem
+        """
+        self._stats["calls"] += 1
+        ranked = self.ranked(kind)
+        primary = ranked[0]
+        pending: Dict[asyncio.Future, Tuple[UpstreamTarget, float]] = {}
+        errors: List[BaseException] = []
+        hedges = set()
+        launched = 0
+        hedged = False
+        completed = False
+
+        def launch() -> UpstreamTarget:
+            nonlocal launched
+            target = ranked[launched]
+            launched += 1
+            pending[asyncio.ensure_future(call(target))] = (target, time.monotonic())
+            return target
+
+        launch()
+        primary_started = time.monotonic()
+        try:
+            while pending:
+                timeout = None
+                if self.hedging_enabled and not hedged and launched < len(ranked):
+                    deadline = primary_started + self.hedge_delay(primary, kind)
+                    timeout = max(0.0, deadline - time.monotonic())
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Destino principal lento: envia a requisição de cobertura
+                    hedged = True
+                    self._stats["hedges"] += 1
+                    hedges.add(launch())
+                    continue
+
+                for task in done:
+                    target, started = pending.pop(task)
+                    elapsed = time.monotonic() - started
+                    error = task.exception()
+                    target.record_outcome(error is None)
+                    if error is None:
+                        target.record_latency(kind, elapsed)
+                        if target in hedges:
+                            self._stats["hedge_wins"] += 1
+                        completed = True
+                        return task.result()
+                    errors.append(error)
+
+                if not pending and launched < len(ranked):
+                    # Todos os destinos em andamento falharam: tenta o próximo
+                    self._stats["failovers"] += 1
+                    hedged = True
+                    launch()
+
+            raise errors[0]
+        finally:
+            for task, (target, started) in pending.items():
+                task.cancel()
+                if completed:
+                    # Perdeu para outro destino: a latência real é no mínimo o tempo decorrido.
+                    # Se a própria chamada foi cancelada (ex.: cliente desconectou), não há amostra.
+                    target.record_latency(kind, time.monotonic() - started)
+
+    def state(self) -> str:
+        """Estado agregado dos circuit breakers: `closed`, `degraded` (algum aberto) ou `open` (todos)"""
+        states = [target.guard.breaker.state for target in self.targets]
+        opened = sum(1 for state in states if state == "open")
+        if opened == 0:
+            return "closed"
+        return "open" if opened == len(states) else "degraded"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores de cobertura e estatísticas por destino"""
+        return {
+            "hedging_enabled": self.hedging_enabled and len(self.targets) > 1,
+            **self._stats,
+            "state": self.state(),
+            "targets": [target.get_stats() for target in self.targets]
+        }
+
+
+# Roteador compartilhado pelo processo
+_router: Optional[TargetRouter] = None
+
+
+def get_target_router() -> TargetRouter:
+    """Retorna o roteador compartilhado, criando-o sob demanda a partir de `Settings`"""
+    global _router
+    if _router is None:
+        _router = TargetRouter.from_settings()
+    return _router
@@ -0,0 +1,158 @@
+"""
+Divisão do texto de TCC em seções para avaliação map-reduce
+"""
+import re
+from typing import List, NamedTuple, Optional
+
+
+class Section(NamedTuple):
+    """Seção identificada no texto do TCC"""
+    key: str
+    title: str
+    text: str
+
+
+# (chave, título exibido, padrão do cabeçalho) — na ordem usual de um TCC
+SECTION_HEADINGS = [
+    ("abstract", "Resumo", r"resumo|abstract|resumen"),
+    ("introduction", "Introdução", r"introdu[çc][ãa]o|introduction"),
+    ("literature_review", "Fundamentação Teórica",
+     r"fundamenta[çc][ãa]o te[óo]rica|referencial te[óo]rico|revis[ãa]o (?:de|da) literatura|revis[ãa]o bibliogr[áa]fica|literature review"),
+    ("methodology", "Metodologia",
+     r"metodologia|materiais e m[ée]todos|m[ée]todos?|procedimentos metodol[óo]gicos|methodology|methods"),
+    ("results", "Resultados",
+     r"resultados(?: e discuss[ãa]o)?|discuss[ãa]o(?: dos resultados)?|an[áa]lise dos resultados|results(?: and discussion)?|discussion"),
+    ("conclusion", "Conclusão",
+     r"conclus[ãa]o|conclus[õo]es|considera[çc][õo]es finais|conclusions?"),
+    ("references", "Referências", r"refer[êe]ncias(?: bibliogr[áa]ficas)?|bibliografia|references"),
+]
+
+_HEADING_RE = re.compile(
+    r"^\s*(?:(?:\d+(?:\.\d+)*|[IVXLC]+)[.)\-–]?\s+)?(?P<heading>"
+    + "|".join(f"(?P<{key}>{pattern})" for key, _, pattern in SECTION_HEADINGS)
+    + r")\s*:?\s*$",
+    re.IGNORECASE
+)
+
+_TITLES = {key: title for key, title, _ in SECTION_HEADINGS}
+
+
+def split_sections(text: str) -> List[Section]:
+    """
+    Divide o texto em seções a partir de cabeçalhos reconhecidos
+
+    Cabeçalhos são linhas curtas contendo apenas o nome da seção, opcionalmente
+    numeradas (ex.: "3. METODOLOGIA", "II - Resultados"). O texto anterior ao
+    primeiro cabeçalho é agrupado como "Elementos pré-textuais". Seções repetidas
+    ou fora de ordem são mantidas como aparecem no documento.
+
+    Args:
+        text: Texto completo do TCC
+
+    Returns:
+        List[Section]: Seções na ordem do documento (vazia se nenhum cabeçalho for reconhecido)
+    """
+    sections: List[Section] = []
+    current_key, current_title = "preamble", "Elementos pré-textuais"
+    current_lines: List[str] = []
+    found_heading = False
+
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line) if len(line) <= 80 else None
+        if match:
+            body = "\n".join(current_lines).strip()
+            if body:
+                sections.append(Section(current_key, current_title, body))
+            current_key = next(key for key, _, _ in SECTION_HEADINGS if match.group(key))
+            current_title = _TITLES[current_key]
+            current_lines = []
+            found_heading = True
+        else:
+            current_lines.append(line)
+
+    body = "\n".join(current_lines).strip()
+    if body:
+        sections.append(Section(current_key, current_title, body))
+
+    return sections if found_heading else []
+
+
+def find_references_start(text: str) -> Optional[int]:
+    """
+    Localiza o início da lista de referências (último cabeçalho de referências do texto)
+
+    Args:
+        text: Texto completo do TCC
+
+    Returns:
+        Optional[int]: Posição do primeiro caractere após o cabeçalho, ou None se não encontrado
+    """
+    position = 0
+    start = None
+    for line in text.splitlines(keepends=True):
+        if len(line) <= 81:
+            match = _HEADING_RE.match(line.rstrip("\r\n"))
+            if match and match.group("references"):
+                start = position + len(line)
+        position += len(line)
+    return start
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """
+    Divide um texto em trechos de tamanho limitado, preferindo quebras de parágrafo
+
+    Args:
+        text: Texto a dividir
+        max_chars: Tamanho máximo de cada trecho
+
+    Returns:
+        List[str]: Trechos na ordem original
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_size = 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        # Parágrafos maiores que o limite são cortados em pedaços fixos
+        pieces = [paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars)] or [""]
+        for piece in pieces:
+            if current and current_size + len(piece) + 2 > max_chars:
+                chunks.append("\n\n".join(current))
+                current, current_size = [], 0
+            current.append(piece)
+            current_size += len(piece) + 2
+
+    if current:
+        chunks.append("\n\n".join(current))
+
+    return chunks
+
+
+def plan_section_chunks(text: str, max_chars: int) -> List[Section]:
+    """
+    Planeja os trechos a serem avaliados na etapa "map"
+
+    Cada seção é dividida em trechos de até `max_chars`. Se nenhuma seção for
+    reconhecida, o texto inteiro é dividido em partes sequenciais.
+
+    Args:
+        text: Texto completo do TCC
+        max_chars: Tamanho máximo de cada trecho
+
+    Returns:
+        List[Section]: Trechos na ordem do documento; o título indica a parte (ex.: "Metodologia (2/3)")
+    """
+    sections = split_sections(text) or [Section("document", "Documento", text)]
+    planned: List[Section] = []
+
+    for section in sections:
+        chunks = chunk_text(section.text, max_chars)
+        for index, chunk in enumerate(chunks, start=1):
+            title = section.title if len(chunks) == 1 else f"{section.title} ({index}/{len(chunks)})"
+            planned.append(Section(section.key, title, chunk))
+
+    return planned
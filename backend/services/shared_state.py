@@ -0,0 +1,487 @@
+"""
+Estado compartilhado entre os processos da aplicação (workers) com backends plugáveis
+
+Backends disponíveis (`Settings.shared_state_backend`):
+    none    estado restrito ao processo (padrão, execução com um único worker)
+    sqlite  banco SQLite local em modo WAL (workers na mesma máquina)
+    shm     o mesmo banco SQLite em memória compartilhada (/dev/shm), sem E/S de disco
+    redis   servidor compatível com Redis (workers em várias máquinas); em
+            desenvolvimento pode ser substituído por `benchmarks.mock_redis`
+"""
+import json
+import os
+import random
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import unquote, urlparse
+from backend.config import settings
+
+
+T = TypeVar("T")
+
+# Função de atualização atômica: recebe o valor atual (None se ausente) e
+# retorna (novo valor, resultado); novo valor None remove a chave
+Updater = Callable[[Optional[str]], Tuple[Optional[str], T]]
+
+
+class SharedStateError(Exception):
+    """Erro de comunicação com o armazenamento compartilhado"""
+
+
+class SharedStateConnectionError(SharedStateError):
+    """Conexão com o armazenamento compartilhado perdida antes de o comando ser aplicado"""
+
+
+class SharedState(ABC):
+    """
+    Interface de armazenamento chave-valor compartilhado entre os workers
+
+    Valores são strings (estruturas devem ser serializadas em JSON). Chaves com
+    `ttl_seconds` > 0 expiram após esse tempo.
+    """
+
+    backend = "none"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Retorna o valor da chave ou None se ausente/expirada"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: float = 0):
+        """Grava a chave, substituindo o valor anterior"""
+
+    @abstractmethod
+    def add(self, key: str, value: str, ttl_seconds: float = 0) -> bool:
+        """Grava a chave apenas se ela não existir; retorna se gravou"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove a chave"""
+
+    @abstractmethod
+    def update(self, key: str, updater: Updater, ttl_seconds: float = 0) -> T:
+        """
+        Lê, transforma e grava uma chave de forma atômica entre os workers
+
+        Args:
+            key: Chave
+            updater: Função (valor atual) -> (novo valor, resultado); pode ser reexecutada em caso de conflito
+            ttl_seconds: Tempo de vida do novo valor (0 = sem expiração)
+
+        Returns:
+            T: Resultado retornado por `updater`
+        """
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend}
+
+    def close(self):
+        pass
+
+
+class SQLiteSharedState(SharedState):
+    """
+    Estado compartilhado em um banco SQLite (modo WAL)
+
+    Cada processo abre sua própria conexão; as atualizações atômicas usam
+    transações `BEGIN IMMEDIATE`, que serializam as escritas entre processos.
+    """
+
+    backend = "sqlite"
+
+    # Gravações entre remoções das chaves expiradas
+    _PURGE_EVERY = 500
+
+    def __init__(self, path: str, durable: bool = True, busy_timeout_seconds: float = 5.0):
+        """
+        Args:
+            path: Caminho do arquivo do banco de dados
+            durable: Se False, não sincroniza com o disco (armazenamento em memória compartilhada)
+            busy_timeout_seconds: Espera máxima por um lock mantido por outro processo
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_seconds, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'NORMAL' if durable else 'OFF'}")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS shared_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def _expires_at(ttl_seconds: float) -> float:
+        return time.time() + ttl_seconds if ttl_seconds > 0 else 0.0
+
+    def _read(self, key: str) -> Optional[str]:
+        """Lê uma chave não expirada (o lock deve estar adquirido)"""
+        row = self._conn.execute(
+            "SELECT value FROM shared_state WHERE key = ? AND (expires_at = 0 OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, key: str, value: Optional[str], ttl_seconds: float):
+        """Grava ou remove uma chave (o lock deve estar adquirido)"""
+        if value is None:
+            self._conn.execute("DELETE FROM shared_state WHERE key = ?", (key,))
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, self._expires_at(ttl_seconds))
+        )
+        self._writes += 1
+        if self._writes % self._PURGE_EVERY == 0:
+            self._conn.execute(
+                "DELETE FROM shared_state WHERE expires_at != 0 AND expires_at <= ?",
+                (time.time(),)
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._read(key)
+
+    def set(self, key: str, value: str, ttl_seconds: float = 0):
+        with self._lock:
+            self._write(key, value, ttl_seconds)
+
+    def add(self, key: str, value: str, ttl_seconds: float = 0) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                WHERE shared_state.expires_at != 0 AND shared_state.expires_at <= ?
+                """,
+                (key, value, self._expires_at(ttl_seconds), time.time())
+            )
+            return cursor.rowcount > 0
+
+    def delete(self, key: str):
+        with self._lock:
+            self._write(key, None, 0)
+
+    def update(self, key: str, updater: Updater, ttl_seconds: float = 0) -> T:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                value, result = updater(self._read(key))
+                self._write(key, value, ttl_seconds)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM shared_state").fetchone()
+        return {"backend": self.backend, "path": self.path, "keys": row[0]}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SharedMemoryState(SQLiteSharedState):
+    """Estado compartilhado em um banco SQLite em memória compartilhada (tmpfs)"""
+
+    backend = "shm"
+
+    def __init__(self, path: str):
+        super().__init__(path, durable=False)
+
+
+class RespConnection:
+    """
+    Cliente síncrono mínimo do protocolo RESP2 (Redis)
+
+    Implementa apenas o necessário para o estado compartilhado, sem dependências
+    externas. Comandos isolados reconectam automaticamente uma vez quando a conexão
+    cai; comandos de uma transação (WATCH/MULTI/EXEC) não, pois o estado da
+    transação se perde com a conexão.
+    """
+
+    def __init__(self, url: str, timeout_seconds: float = 5.0):
+        """
+        Args:
+            url: URL no formato redis://[:senha@]host[:porta][/db]
+            timeout_seconds: Tempo limite de conexão e de resposta
+        """
+        parsed = urlparse(url)
+        if parsed.scheme != "redis":
+            raise ValueError(f"URL do Redis não suportada (use redis://): {url}")
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.username = unquote(parsed.username) if parsed.username else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout_seconds = timeout_seconds
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout_seconds)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip(["AUTH", self.username, self.password] if self.username else ["AUTH", self.password])
+        if self.db:
+            self._roundtrip(["SELECT", str(self.db)])
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._file.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    @staticmethod
+    def _encode(args: List[Any]) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(f"${len(data)}\r\n".encode())
+            parts.append(data)
+            parts.append(b"\r\n")
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._file.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Conexão encerrada pelo servidor")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            raise SharedStateError(payload.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            size = int(payload)
+            if size < 0:
+                return None
+            data = self._file.read(size + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            size = int(payload)
+            if size < 0:
+                return None
+            return [self._read_reply() for _ in range(size)]
+        raise SharedStateError(f"Resposta RESP inválida: {line!r}")
+
+    def _roundtrip(self, args: List[Any]) -> Any:
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def execute(self, *args: Any, retry: bool = True) -> Any:
+        """
+        Envia um comando e retorna a resposta
+
+        Args:
+            args: Comando e argumentos
+            retry: Se True, reconecta e reenvia o comando uma vez quando a conexão cai
+                (use False dentro de transações)
+
+        Raises:
+            SharedStateConnectionError: Falha de conexão
+            SharedStateError: Erro retornado pelo servidor
+        """
+        for attempt in range(2 if retry else 1):
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._roundtrip(list(args))
+            except (OSError, ConnectionError) as e:
+                self.close()
+                error = e
+        raise SharedStateConnectionError(f"Falha de conexão com {self.host}:{self.port}: {error}")
+
+
+class RedisSharedState(SharedState):
+    """
+    Estado compartilhado em um servidor compatível com Redis
+
+    Usa apenas comandos básicos (GET, SET com PX/NX, DEL e transações otimistas
+    WATCH/MULTI/EXEC), suportados também pelo servidor local de `benchmarks.mock_redis`.
+    """
+
+    backend = "redis"
+
+    # Tentativas de uma atualização atômica antes de desistir por conflito
+    _MAX_UPDATE_ATTEMPTS = 50
+
+    def __init__(self, url: str, prefix: str = "veritas:"):
+        """
+        Args:
+            url: URL do servidor (redis://host:porta/db)
+            prefix: Prefixo aplicado a todas as chaves
+        """
+        self.url = url
+        self.prefix = prefix
+        self._conn = RespConnection(url)
+        self._lock = threading.Lock()
+        self._stats = {"update_conflicts": 0, "update_reconnects": 0}
+
+    @staticmethod
+    def _ttl_args(ttl_seconds: float) -> List[str]:
+        return ["PX", str(max(1, int(ttl_seconds * 1000)))] if ttl_seconds > 0 else []
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._conn.execute("GET", self.prefix + key)
+
+    def set(self, key: str, value: str, ttl_seconds: float = 0):
+        with self._lock:
+            self._conn.execute("SET", self.prefix + key, value, *self._ttl_args(ttl_seconds))
+
+    def add(self, key: str, value: str, ttl_seconds: float = 0) -> bool:
+        with self._lock:
+            return self._conn.execute("SET", self.prefix + key, value, "NX", *self._ttl_args(ttl_seconds)) is not None
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DEL", self.prefix + key)
+
+    def _try_update(self, full_key: str, updater: Updater, ttl_seconds: float) -> Tuple[bool, Any]:
+        """
+        Executa um ciclo WATCH/GET/MULTI/EXEC sem reenvio automático de comandos
+
+        Returns:
+            Tuple[bool, Any]: (aplicado, resultado do `updater`) — False em conflito
+
+        Raises:
+            SharedStateConnectionError: Conexão perdida antes do EXEC (nada foi aplicado)
+            SharedStateError: Conexão perdida durante o EXEC (resultado desconhecido)
+        """
+        conn = self._conn
+        conn.execute("WATCH", full_key, retry=False)
+        try:
+            value, result = updater(conn.execute("GET", full_key, retry=False))
+        except SharedStateConnectionError:
+            raise
+        except BaseException:
+            conn.execute("UNWATCH", retry=False)
+            raise
+        conn.execute("MULTI", retry=False)
+        if value is None:
+            conn.execute("DEL", full_key, retry=False)
+        else:
+            conn.execute("SET", full_key, value, *self._ttl_args(ttl_seconds), retry=False)
+        try:
+            # EXEC retorna nulo se a chave foi alterada por outro worker após o WATCH
+            return conn.execute("EXEC", retry=False) is not None, result
+        except SharedStateConnectionError as e:
+            # O servidor pode ter aplicado a transação: repeti-la poderia aplicá-la duas vezes
+            raise SharedStateError(f"Conexão perdida durante o EXEC, resultado desconhecido: {e}")
+
+    def update(self, key: str, updater: Updater, ttl_seconds: float = 0) -> T:
+        full_key = self.prefix + key
+        reconnected = False
+        with self._lock:
+            for attempt in range(self._MAX_UPDATE_ATTEMPTS):
+                if attempt:
+                    # Espera aleatória curta para desencontrar os workers em conflito
+                    time.sleep(random.uniform(0, min(0.01, 0.0005 * attempt)))
+                try:
+                    applied, result = self._try_update(full_key, updater, ttl_seconds)
+                except SharedStateConnectionError:
+                    # O WATCH se perde com a conexão: o ciclo inteiro recomeça em uma nova conexão
+                    if reconnected:
+                        raise
+                    reconnected = True
+                    self._stats["update_reconnects"] += 1
+                    continue
+                if applied:
+                    return result
+                self._stats["update_conflicts"] += 1
+        raise SharedStateError(f"Atualização da chave {key} abortada após {self._MAX_UPDATE_ATTEMPTS} conflitos")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "server": f"{self._conn.host}:{self._conn.port}/{self._conn.db}",
+                **self._stats
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def default_shm_path() -> str:
+    """Caminho padrão do banco em memória compartilhada (/dev/shm, se disponível)"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "veritas_shared_state.sqlite3")
+
+
+def create_shared_state() -> Optional[SharedState]:
+    """
+    Cria o armazenamento compartilhado configurado em `Settings.shared_state_backend`
+
+    Returns:
+        Optional[SharedState]: Implementação configurada, ou None para estado restrito ao processo
+    """
+    backend = settings.shared_state_backend.lower()
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        return SQLiteSharedState(settings.shared_state_path or ".cache/shared_state.sqlite3")
+    if backend == "shm":
+        return SharedMemoryState(settings.shared_state_path or default_shm_path())
+    if backend == "redis":
+        return RedisSharedState(settings.shared_state_redis_url, settings.shared_state_key_prefix)
+    raise ValueError(f"Backend de estado compartilhado não suportado: {settings.shared_state_backend}")
+
+
+# Armazenamento do processo, criado sob demanda (após o fork/spawn do worker)
+_shared_state: Optional[SharedState] = None
+_shared_state_created = False
+
+
+def get_shared_state() -> Optional[SharedState]:
+    """Retorna o armazenamento compartilhado do processo (None = estado restrito ao processo)"""
+    global _shared_state, _shared_state_created
+    if not _shared_state_created:
+        _shared_state = create_shared_state()
+        _shared_state_created = True
+    return _shared_state
+
+
+def json_updater(transform: Callable[[Dict[str, Any]], Tuple[Optional[Dict[str, Any]], T]]) -> Updater:
+    """
+    Adapta uma transformação de dicionários para `SharedState.update`
+
+    Args:
+        transform: Função (dicionário atual, vazio se ausente) -> (novo dicionário ou None, resultado)
+
+    Returns:
+        Updater: Função que (de)serializa o valor em JSON
+    """
+    def updater(raw: Optional[str]) -> Tuple[Optional[str], T]:
+        try:
+            current = json.loads(raw) if raw else {}
+        except ValueError:
+            current = {}
+        value, result = transform(current)
+        return (json.dumps(value, separators=(",", ":")) if value is not None else None), result
+    return updater
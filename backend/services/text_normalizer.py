@@ -0,0 +1,217 @@
+"""
+Normalização do texto extraído antes do envio ao modelo (redução de tokens)
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from backend.config import settings
+from backend.services.extractors import PAGE_BREAK
+from backend.services.sections import find_references_start
+
+
+# Estimativa usual de caracteres por token para texto em português
+CHARS_PER_TOKEN = 4
+
+_PAGE_NUMBER_RE = re.compile(
+    r"^\s*(?:-\s*)?(?:p[áa]g(?:ina)?\.?\s*|page\s*)?\d{1,4}(?:\s*(?:de|of|/)\s*\d{1,4})?(?:\s*-)?\s*$",
+    re.IGNORECASE
+)
+_HYPHENATION_RE = re.compile(r"(\w+)-[ \t]*\n[ \t]*([a-zà-öø-ÿ]\w*)")
+_WORD_RE = re.compile(r"\w+")
+_INLINE_WHITESPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_TRAILING_WHITESPACE_RE = re.compile(r"[ \t]+\n")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n(?:\s*\n)+")
+# Número no início ou no fim de uma linha de borda (numeração que muda de página para página)
+_EDGE_NUMBER_RE = re.compile(r"^\d{1,4}\b|\b\d{1,4}$")
+
+
+class TextNormalizer:
+    """
+    Remove ruído de extração que é enviado ao modelo sem agregar informação
+
+    Etapas (cada uma configurável em `Settings`):
+    - remoção de cabeçalhos e rodapés repetidos em várias páginas (apenas PDF)
+    - remoção de linhas contendo apenas numeração de página (apenas PDF)
+    - junção de palavras hifenizadas na quebra de linha
+    - colapso de espaços em branco
+    - truncamento opcional de listas de referências muito longas
+
+    As etapas de página só examinam as primeiras e últimas linhas de cada página
+    (`normalize_page_edge_lines`), delimitadas por `PAGE_BREAK` no texto do PDF:
+    tabelas e demais linhas do corpo nunca são removidas.
+    """
+
+    @staticmethod
+    def _edge_indices(lines: List[str], edge_lines: int) -> List[int]:
+        """Índices das primeiras e últimas `edge_lines` linhas não vazias de uma página"""
+        content = [index for index, line in enumerate(lines) if line.strip()]
+        if edge_lines <= 0:
+            return []
+        return sorted(set(content[:edge_lines] + content[-edge_lines:]))
+
+    @staticmethod
+    def _line_key(line: str) -> str:
+        """Chave de comparação de linhas de borda (ignora só a numeração no início ou no fim)"""
+        return _EDGE_NUMBER_RE.sub("#", line.strip().lower())
+
+    @staticmethod
+    def _is_repeat_candidate(line: str) -> bool:
+        """
+        Linhas que podem ser cabeçalho ou rodapé
+
+        Linhas terminadas em pontuação de frase ou hífen são preservadas, pois
+        costumam ser conteúdo (ex.: legendas, palavras quebradas) e não elementos de página.
+        """
+        stripped = line.strip()
+        return 3 <= len(stripped) <= 100 and stripped[-1] not in ".:;?!-"
+
+    @classmethod
+    def clean_page_edges(
+        cls,
+        pages: List[str],
+        edge_lines: int,
+        min_count: Optional[int],
+        remove_page_numbers: bool
+    ) -> Tuple[List[str], int, int]:
+        """
+        Remove cabeçalhos, rodapés e numeração das bordas das páginas de um PDF
+
+        As bordas (primeiras e últimas `edge_lines` linhas não vazias) são definidas
+        uma única vez, no texto original de cada página: remover uma linha não traz
+        linhas do corpo para a borda.
+
+        Args:
+            pages: Texto de cada página
+            edge_lines: Linhas examinadas no início e no fim de cada página
+            min_count: Número mínimo de páginas em que uma linha de borda se repete
+                para ser removida (None = não remove linhas repetidas)
+            remove_page_numbers: Remove linhas de borda que contêm apenas numeração
+                (ex.: "12", "Página 3 de 40", "- 7 -")
+
+        Returns:
+            Tuple[List[str], int, int]: (páginas, linhas repetidas removidas, numerações removidas)
+        """
+        page_lines = [page.split("\n") for page in pages]
+        edges = [cls._edge_indices(lines, edge_lines) for lines in page_lines]
+
+        repeated = set()
+        if min_count is not None:
+            # Cada linha conta uma vez por página
+            counts = Counter(
+                key
+                for lines, indices in zip(page_lines, edges)
+                for key in {cls._line_key(lines[i]) for i in indices if cls._is_repeat_candidate(lines[i])}
+            )
+            repeated = {key for key, count in counts.items() if count >= min_count}
+
+        repeated_removed = numbers_removed = 0
+        result = []
+        for lines, indices in zip(page_lines, edges):
+            drop = set()
+            for index in indices:
+                line = lines[index]
+                if remove_page_numbers and _PAGE_NUMBER_RE.match(line):
+                    numbers_removed += 1
+                    drop.add(index)
+                elif repeated and cls._is_repeat_candidate(line) and cls._line_key(line) in repeated:
+                    repeated_removed += 1
+                    drop.add(index)
+            result.append("\n".join(line for index, line in enumerate(lines) if index not in drop))
+        return result, repeated_removed, numbers_removed
+
+    @staticmethod
+    def join_hyphenation(text: str) -> Tuple[str, int]:
+        """
+        Junta palavras quebradas com hífen no fim da linha
+
+        O hífen só é removido quando a palavra inteira aparece em outro ponto do
+        documento ("avalia-\\nção" → "avaliação"); caso contrário é mantido, pois pode
+        ser um composto ("bem-\\nestar" → "bem-estar").
+
+        Returns:
+            Tuple[str, int]: (texto, junções realizadas)
+        """
+        vocabulary = None
+
+        def join(match: re.Match) -> str:
+            nonlocal vocabulary
+            if vocabulary is None:
+                vocabulary = {word.lower() for word in _WORD_RE.findall(text)}
+            head, tail = match.group(1), match.group(2)
+            if (head + tail).lower() in vocabulary:
+                return head + tail
+            return f"{head}-{tail}"
+
+        return _HYPHENATION_RE.subn(join, text)
+
+    @staticmethod
+    def collapse_whitespace(text: str) -> str:
+        """Colapsa sequências de espaços e linhas em branco, preservando quebras de parágrafo"""
+        text = _INLINE_WHITESPACE_RE.sub(" ", text)
+        text = _TRAILING_WHITESPACE_RE.sub("\n", text)
+        text = _BLANK_LINES_RE.sub("\n\n", text)
+        return text.strip()
+
+    @staticmethod
+    def truncate_references(text: str, max_chars: int) -> Tuple[str, int]:
+        """
+        Trunca a lista de referências final quando excede `max_chars`
+
+        Returns:
+            Tuple[str, int]: (texto, caracteres removidos)
+        """
+        start = find_references_start(text)
+        if start is None:
+            return text, 0
+
+        references = text[start:]
+        if len(references) <= max_chars:
+            return text, 0
+
+        cut = references.rfind("\n", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        omitted = len(references) - cut
+        note = f"\n[... {omitted} caracteres de referências omitidos ...]"
+        return text[:start] + references[:cut] + note, omitted
+
+    @classmethod
+    def normalize(cls, text: str, file_type: Optional[str] = None) -> Tuple[str, Dict[str, float]]:
+        """
+        Aplica as etapas de normalização habilitadas
+
+        Args:
+            text: Texto extraído do documento
+            file_type: Formato de origem (ex.: "PDF"); as etapas de página só se aplicam a PDFs
+
+        Returns:
+            Tuple[str, Dict[str, float]]: (texto normalizado, estatísticas de economia)
+        """
+        chars_before = len(text)
+        stats: Dict[str, float] = {}
+
+        if file_type == "PDF":
+            pages, repeated_removed, numbers_removed = cls.clean_page_edges(
+                text.split(PAGE_BREAK),
+                settings.normalize_page_edge_lines,
+                settings.normalize_repeated_line_min_count if settings.normalize_remove_repeated_lines else None,
+                settings.normalize_remove_page_numbers
+            )
+            if settings.normalize_remove_repeated_lines:
+                stats["normalization_repeated_lines_removed"] = repeated_removed
+            if settings.normalize_remove_page_numbers:
+                stats["normalization_page_numbers_removed"] = numbers_removed
+            text = "\n\n".join(pages)
+        if settings.normalize_join_hyphenation:
+            text, stats["normalization_hyphenations_joined"] = cls.join_hyphenation(text)
+        if settings.normalize_collapse_whitespace:
+            text = cls.collapse_whitespace(text)
+        if settings.normalize_truncate_references:
+            text, stats["normalization_reference_chars_removed"] = cls.truncate_references(
+                text, settings.normalize_references_max_chars
+            )
+
+        chars_saved = chars_before - len(text)
+        stats["normalization_chars_saved"] = chars_saved
+        stats["normalization_tokens_saved_estimate"] = chars_saved // CHARS_PER_TOKEN
+        stats["normalization_saved_ratio"] = round(chars_saved / chars_before, 4) if chars_before else 0.0
+        return text, stats
@@ -0,0 +1,128 @@
+"""
+Middleware ASGI que comprime respostas completas acima de um tamanho mínimo
+
+Apenas respostas com o corpo inteiro em uma única mensagem são comprimidas (as
+respostas JSON da API). Fluxos (SSE, NDJSON e qualquer resposta enviada em
+partes) passam intactos, para que cada evento chegue ao cliente assim que é
+gerado; respostas com `Content-Encoding` ou `ETag` (assets estáticos, servidos
+com variantes pré-comprimidas) também.
+"""
+import gzip
+from typing import Iterable, Optional
+from backend.utils.static_assets import accepted_encodings
+
+try:
+    import brotli  # opcional; requer: pip install brotli
+except ImportError:
+    brotli = None
+
+
+# Tipos de conteúdo compressíveis (prefixos)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/"
+)
+# Tipos transmitidos em fluxo, nunca comprimidos
+STREAMING_TYPES = ("text/event-stream", "application/x-ndjson")
+
+# Qualidade Brotli para respostas dinâmicas (11, a máxima, é lenta demais por requisição)
+BROTLI_QUALITY = 4
+
+
+class ResponseCompressionMiddleware:
+    """
+    Comprime com Brotli (se disponível) ou gzip as respostas acima de `minimum_size`
+
+    A codificação é escolhida pelo `Accept-Encoding` da requisição; respostas
+    elegíveis recebem `Vary: Accept-Encoding` mesmo quando enviadas sem compressão.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, excluded_paths: Iterable[str] = ()):
+        """
+        Args:
+            app: Aplicação ASGI
+            minimum_size: Tamanho mínimo do corpo (bytes) para comprimir
+            gzip_level: Nível de compressão gzip (1-9)
+            excluded_paths: Prefixos de rota nunca comprimidos (rotas em fluxo)
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.excluded_paths = tuple(excluded_paths)
+
+    def _encoding_for(self, scope) -> Optional[str]:
+        """Codificação aceita pelo cliente e disponível no servidor"""
+        for name, value in scope.get("headers") or []:
+            if name == b"accept-encoding":
+                for encoding in accepted_encodings(value.decode("latin-1")):
+                    if encoding != "br" or brotli is not None:
+                        return encoding
+                break
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    @staticmethod
+    def _compressible(headers) -> bool:
+        content_type = ""
+        for name, value in headers:
+            # Já comprimidas, ou com ETag próprio (assets estáticos, que negociam suas variantes)
+            if name in (b"content-encoding", b"etag"):
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        if content_type.startswith(STREAMING_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path", "").startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._encoding_for(scope)
+        start_message = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            # Primeira parte do corpo: decide entre comprimir e repassar
+            body = message.get("body", b"")
+            headers = list(start_message.get("headers", []))
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or not self._compressible(headers)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers = [(name, value) for name, value in headers if name != b"content-length"]
+            headers.append((b"vary", b"Accept-Encoding"))
+            if encoding is not None:
+                compressed = self._compress(body, encoding)
+                if len(compressed) < len(body):
+                    body = compressed
+                    headers.append((b"content-encoding", encoding.encode("ascii")))
+            headers.append((b"content-length", str(len(body)).encode("ascii")))
+
+            passthrough = True
+            await send({**start_message, "headers": headers})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, compressing_send)
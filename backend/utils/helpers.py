@@ -1,39 +1,261 @@
 """
 Funções auxiliares para a aplicação
 """
+import asyncio
+import hashlib
+import io
 import os
 import tempfile
-from typing import Tuple
+import zipfile
+from typing import Any, Iterable, List, NamedTuple, Optional, Union
 from fastapi import UploadFile
 from backend.config import settings
+from backend.utils.responses import dump_json
 
 
-async def save_upload_file(upload_file: UploadFile) -> Tuple[str, str]:
+class FileTooLargeError(Exception):
+    """Erro lançado quando o arquivo enviado excede o tamanho máximo permitido"""
+
+
+class ReceivedFile(NamedTuple):
+    """
+    Arquivo recebido: conteúdo em memória (bytes) ou, acima de
+    `upload_spool_max_memory_mb`, caminho de um arquivo temporário
+    """
+    source: Union[bytes, str]
+    filename: str
+    size: int
+    sha256: str
+
+
+class _Spool:
+    """Conteúdo recebido em blocos, mantido em memória até um limite e depois transferido para o disco"""
+    
+    def __init__(self, suffix: str, max_memory_bytes: int):
+        self.suffix = suffix
+        self.max_memory_bytes = max_memory_bytes
+        self.chunks: List[bytes] = []
+        self.file = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+    
+    def _accept(self, chunk: bytes) -> bool:
+        """Contabiliza o bloco e o mantém em memória; retorna True se ele deve ir para o disco"""
+        self.size += len(chunk)
+        self.digest.update(chunk)
+        if self.file is None and self.size <= self.max_memory_bytes:
+            self.chunks.append(chunk)
+            return False
+        return True
+    
+    def _write_to_disk(self, chunk: bytes):
+        if self.file is None:
+            self.file = tempfile.NamedTemporaryFile(delete=False, suffix=self.suffix)
+            self.file.writelines(self.chunks)
+            self.chunks = []
+        self.file.write(chunk)
+    
+    def write(self, chunk: bytes):
+        if self._accept(chunk):
+            self._write_to_disk(chunk)
+    
+    async def awrite(self, chunk: bytes):
+        """Versão de `write` para o loop de eventos: a gravação em disco ocorre em uma thread"""
+        if self._accept(chunk):
+            await asyncio.to_thread(self._write_to_disk, chunk)
+    
+    async def afinish(self, filename: str) -> ReceivedFile:
+        """Versão de `finish` para o loop de eventos (o fechamento do arquivo grava o buffer restante)"""
+        if self.file is None:
+            return self.finish(filename)
+        return await asyncio.to_thread(self.finish, filename)
+    
+    def finish(self, filename: str) -> ReceivedFile:
+        if self.file is None:
+            source = b"".join(self.chunks)
+        else:
+            self.file.close()
+            source = self.file.name
+        self.chunks = []
+        return ReceivedFile(source, filename, self.size, self.digest.hexdigest())
+    
+    def discard(self):
+        self.chunks = []
+        if self.file is not None:
+            self.file.close()
+            cleanup_temp_file(self.file.name)
+
+
+def _spool_max_memory_bytes() -> int:
+    return settings.upload_spool_max_memory_mb * 1024 * 1024
+
+
+async def read_upload_file(upload_file: UploadFile, max_size_bytes: Optional[int] = None) -> ReceivedFile:
     """
-    Salva arquivo enviado temporariamente
+    Recebe um arquivo enviado, lendo-o em blocos de tamanho fixo
+    
+    Arquivos de até `upload_spool_max_memory_mb` ficam em memória e são extraídos sem
+    passar pelo disco; maiores são transferidos para um arquivo temporário, gravado em
+    uma thread para não bloquear o loop de eventos. O tamanho é verificado a cada bloco
+    (rejeitando o arquivo assim que o limite é excedido) e o hash SHA-256 do conteúdo
+    é calculado na mesma passada.
     
     Args:
         upload_file: Arquivo enviado via FastAPI
+        max_size_bytes: Limite específico em bytes (padrão: `max_file_size_mb`)
         
     Returns:
-        Tuple[str, str]: (caminho_temporário, nome_original)
+        ReceivedFile: (conteúdo ou caminho_temporário, nome_original, tamanho, sha256)
+        
+    Raises:
+        FileTooLargeError: Se o arquivo exceder o limite
     """
-    # Cria arquivo temporário
-    suffix = os.path.splitext(upload_file.filename)[1]
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+    chunk_size = settings.upload_chunk_size_kb * 1024
+    if max_size_bytes is None:
+        max_size_bytes = settings.max_file_size_mb * 1024 * 1024
+    
+    # Rejeição antecipada quando o tamanho já é conhecido
+    if upload_file.size is not None and upload_file.size > max_size_bytes:
+        raise FileTooLargeError(
+            f"Arquivo muito grande. Tamanho máximo: {format_file_size(max_size_bytes)}. Tamanho enviado: {format_file_size(upload_file.size)}"
+        )
+    
+    spool = _Spool(os.path.splitext(upload_file.filename)[1], _spool_max_memory_bytes())
     
     try:
-        # Lê e salva o conteúdo
-        content = await upload_file.read()
-        temp_file.write(content)
-        temp_file.close()
+        # Lê o conteúdo em blocos
+        while True:
+            chunk = await upload_file.read(chunk_size)
+            if not chunk:
+                break
+            
+            if spool.size + len(chunk) > max_size_bytes:
+                raise FileTooLargeError(
+                    f"Arquivo muito grande. Tamanho máximo: {format_file_size(max_size_bytes)}"
+                )
+            await spool.awrite(chunk)
         
-        return temp_file.name, upload_file.filename
+        return await spool.afinish(upload_file.filename)
+    except (FileTooLargeError, asyncio.CancelledError):
+        spool.discard()
+        raise
     except Exception as e:
         # Remove arquivo temporário em caso de erro
-        if os.path.exists(temp_file.name):
-            os.unlink(temp_file.name)
-        raise Exception(f"Erro ao salvar arquivo: {str(e)}")
+        spool.discard()
+        raise Exception(f"Erro ao receber arquivo: {str(e)}")
+
+
+def expand_zip_file(
+    source: Union[bytes, str],
+    allowed_extensions: Iterable[str],
+    max_files: int,
+    max_total_bytes: int
+) -> List[ReceivedFile]:
+    """
+    Extrai os documentos de um arquivo ZIP (em memória ou, se grandes, em arquivos temporários)
+    
+    Diretórios, arquivos ocultos/metadados (ex.: `__MACOSX`) e extensões não permitidas
+    são ignorados. Os limites são verificados a partir do tamanho declarado e do
+    volume efetivamente descompactado, protegendo contra arquivos ZIP maliciosos.
+    
+    Args:
+        source: Conteúdo do ZIP ou caminho do arquivo
+        allowed_extensions: Extensões de documento aceitas
+        max_files: Número máximo de documentos
+        max_total_bytes: Tamanho máximo descompactado somando todos os documentos
+        
+    Returns:
+        List[ReceivedFile]: Documentos extraídos, com o nome original de cada um
+        
+    Raises:
+        FileTooLargeError: Se os limites forem excedidos
+        ValueError: Se o arquivo não for um ZIP válido
+    """
+    allowed = {extension.lower() for extension in allowed_extensions}
+    max_file_bytes = settings.max_file_size_mb * 1024 * 1024
+    extracted: List[ReceivedFile] = []
+    total_bytes = 0
+    spool = None
+    
+    try:
+        with zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                basename = os.path.basename(name)
+                suffix = os.path.splitext(basename)[1].lower()
+                
+                if info.is_dir() or not basename or basename.startswith(".") or name.startswith("__MACOSX/"):
+                    continue
+                if suffix not in allowed:
+                    continue
+                
+                if len(extracted) >= max_files:
+                    raise FileTooLargeError(f"O arquivo ZIP contém mais de {max_files} documentos")
+                if info.file_size > max_file_bytes:
+                    raise FileTooLargeError(
+                        f"Documento {name} muito grande. Tamanho máximo: {settings.max_file_size_mb}MB"
+                    )
+                
+                spool = _Spool(suffix, _spool_max_memory_bytes())
+                with archive.open(info) as member:
+                    while True:
+                        chunk = member.read(settings.upload_chunk_size_kb * 1024)
+                        if not chunk:
+                            break
+                        total_bytes += len(chunk)
+                        if spool.size + len(chunk) > max_file_bytes or total_bytes > max_total_bytes:
+                            raise FileTooLargeError(
+                                f"Conteúdo descompactado do ZIP excede o limite de {format_file_size(max_total_bytes)}"
+                            )
+                        spool.write(chunk)
+                extracted.append(spool.finish(name))
+                spool = None
+    except Exception as e:
+        if spool is not None:
+            spool.discard()
+        for document in extracted:
+            release_file(document.source)
+        if isinstance(e, zipfile.BadZipFile):
+            raise ValueError("Arquivo ZIP inválido ou corrompido")
+        raise
+    
+    return extracted
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcula o hash SHA-256 de um arquivo em disco, lendo-o em blocos
+    
+    Args:
+        file_path: Caminho do arquivo
+        chunk_size: Tamanho de cada bloco lido
+        
+    Returns:
+        str: Hash SHA-256 em hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_source(source: Union[bytes, bytearray, memoryview, str]) -> str:
+    """Hash SHA-256 de um conteúdo em memória ou de um arquivo em disco"""
+    if isinstance(source, str):
+        return hash_file(source)
+    return hashlib.sha256(source).hexdigest()
+
+
+def release_file(source: Union[bytes, str]):
+    """
+    Libera o conteúdo de um arquivo recebido (remove o arquivo temporário, se houver)
+    
+    Args:
+        source: Conteúdo em memória ou caminho do arquivo temporário
+    """
+    if isinstance(source, str):
+        cleanup_temp_file(source)
 
 
 def cleanup_temp_file(file_path: str):
@@ -80,3 +302,18 @@ def format_file_size(size_bytes: int) -> str:
         size_bytes /= 1024.0
     return f"{size_bytes:.1f} TB"
 
+
+
+def format_sse_event(event: str, data: Any) -> str:
+    """
+    Formata um evento Server-Sent Events
+    
+    Args:
+        event: Nome do evento
+        data: Modelo Pydantic ou dados serializáveis em JSON
+        
+    Returns:
+        str: Evento no formato `event: ...\ndata: ...\n\n`
+    """
+    payload = dump_json(data).decode("utf-8")
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,278 @@
+"""
+Interpretação tolerante de respostas JSON geradas por LLMs
+"""
+import json
+from typing import Any, List, Optional, Tuple
+
+
+# Literais no estilo Python que alguns modelos usam no lugar dos literais JSON
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+# Caracteres de controle que precisam de escape dentro de strings JSON
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+
+class JsonRepairError(ValueError):
+    """Resposta que não pôde ser interpretada como objeto JSON"""
+
+    def __init__(self, message: str, truncated: bool = False):
+        """
+        Args:
+            message: Descrição do erro
+            truncated: Indica que o objeto JSON não foi concluído (resposta cortada)
+        """
+        super().__init__(message)
+        self.truncated = truncated
+
+
+def extract_json_object(text: str) -> Tuple[str, bool]:
+    """
+    Localiza o primeiro objeto JSON em um texto com conteúdo ao redor
+
+    Ignora prosa, marcadores de código (```json) e qualquer texto após o
+    fechamento do objeto.
+
+    Args:
+        text: Resposta do modelo
+
+    Returns:
+        Tuple[str, bool]: (trecho do objeto, se o objeto foi fechado)
+
+    Raises:
+        JsonRepairError: Se não houver nenhum objeto JSON no texto
+    """
+    start = text.find("{")
+    if start < 0:
+        raise JsonRepairError("Nenhum objeto JSON encontrado na resposta")
+
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1], True
+    return text[start:], False
+
+
+def _next_significant(text: str, index: int) -> Tuple[Optional[str], bool]:
+    """Próximo caractere não branco a partir de `index` e se há quebra de linha antes dele"""
+    newline = False
+    for i in range(index, len(text)):
+        char = text[i]
+        if char == "\n":
+            newline = True
+        elif not char.isspace():
+            return char, newline
+    return None, newline
+
+
+def repair_json(text: str, close: bool = False) -> str:
+    """
+    Corrige defeitos comuns de JSON gerado por LLMs
+
+    Correções: vírgulas finais e ausentes entre membros/elementos, quebras de linha
+    e tabulações literais dentro de strings, aspas internas sem escape e literais
+    `True`/`False`/`None`.
+
+    Args:
+        text: Objeto JSON (já isolado por `extract_json_object`)
+        close: Fecha strings, objetos e listas abertos (resposta truncada)
+
+    Returns:
+        str: JSON corrigido
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # Último token significativo: "{", "[", ",", ":", "key" ou "value"
+    prev = None
+    last_comma = -1
+    in_string = False
+    escape = False
+    i = 0
+    length = len(text)
+
+    def begin_item():
+        """Insere a vírgula ausente antes de um novo membro/elemento"""
+        nonlocal last_comma
+        if prev == "value" and stack:
+            out.append(",")
+            last_comma = len(out) - 1
+
+    while i < length:
+        char = text[i]
+
+        if in_string:
+            if escape:
+                escape = False
+                out.append(char)
+            elif char == "\\":
+                escape = True
+                out.append(char)
+            elif char == '"':
+                following, newline = _next_significant(text, i + 1)
+                closing = (
+                    following is None
+                    or following in ",}]:"
+                    or (following == '"' and newline)
+                )
+                if closing:
+                    in_string = False
+                    out.append(char)
+                else:
+                    # Aspas dentro do texto sem escape
+                    out.append('\\"')
+            else:
+                out.append(_CONTROL_ESCAPES.get(char, char))
+            i += 1
+            continue
+
+        if char.isspace():
+            out.append(char)
+        elif char == '"':
+            is_key = bool(stack) and stack[-1] == "{" and prev in ("{", ",", "value")
+            begin_item()
+            prev = "key" if is_key else "value"
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            begin_item()
+            stack.append(char)
+            prev = char
+            out.append(char)
+        elif char in "}]":
+            if prev == "," and last_comma >= 0:
+                # Vírgula final antes do fechamento
+                out[last_comma] = ""
+            if stack:
+                stack.pop()
+            prev = "value"
+            out.append(char)
+        elif char == ",":
+            if prev != ",":
+                out.append(char)
+                last_comma = len(out) - 1
+            prev = ","
+        elif char == ":":
+            prev = ":"
+            out.append(char)
+        else:
+            end = i
+            while end < length and (text[end].isalnum() or text[end] in "+-._"):
+                end += 1
+            if end == i:
+                # Caractere inesperado fora de strings
+                i += 1
+                continue
+            token = text[i:end]
+            begin_item()
+            prev = "value"
+            out.append(_LITERALS.get(token, token))
+            i = end
+            continue
+        i += 1
+
+    if close:
+        if in_string:
+            if escape:
+                out.pop()
+            out.append('"')
+        if prev == "," and last_comma >= 0:
+            out[last_comma] = ""
+        elif prev == ":":
+            out.append("null")
+        elif prev == "key":
+            out.append(": null")
+        for opener in reversed(stack):
+            out.append("}" if opener == "{" else "]")
+
+    return "".join(out)
+
+
+def loads_tolerant(text: str, allow_truncated: bool = False) -> Tuple[Any, str]:
+    """
+    Interpreta a resposta do modelo como objeto JSON, corrigindo-a se necessário
+
+    Tenta, em ordem: `json.loads` direto; o objeto isolado do texto ao redor; o
+    objeto corrigido; e, com `allow_truncated`, o objeto truncado fechado à força.
+
+    Args:
+        text: Resposta do modelo
+        allow_truncated: Aceita respostas cortadas, descartando o trecho incompleto
+
+    Returns:
+        Tuple[Any, str]: (objeto, método) — `direct`, `extracted`, `repaired` ou `closed`
+
+    Raises:
+        JsonRepairError: Se a resposta não puder ser interpretada (com `truncated`
+            indicando se o objeto ficou incompleto)
+    """
+    try:
+        return json.loads(text), "direct"
+    except json.JSONDecodeError:
+        pass
+
+    fragment, complete = extract_json_object(text)
+    if complete:
+        try:
+            return json.loads(fragment), "extracted"
+        except json.JSONDecodeError:
+            pass
+        try:
+            return json.loads(repair_json(fragment)), "repaired"
+        except json.JSONDecodeError as e:
+            raise JsonRepairError(f"JSON inválido mesmo após correção: {e}")
+
+    if not allow_truncated:
+        raise JsonRepairError("Resposta JSON incompleta (truncada)", truncated=True)
+    try:
+        return json.loads(repair_json(fragment, close=True)), "closed"
+    except json.JSONDecodeError as e:
+        raise JsonRepairError(f"Resposta JSON truncada não pôde ser fechada: {e}", truncated=True)
+
+
+def merge_continuation(partial: str, continuation: str, min_overlap: int = 8, max_overlap: int = 500) -> str:
+    """
+    Junta uma resposta truncada à sua continuação
+
+    Remove marcadores de código no início da continuação e o trecho repetido
+    quando o modelo reescreve o final da parte anterior.
+
+    Args:
+        partial: Resposta truncada
+        continuation: Texto gerado a partir do ponto de parada
+        min_overlap: Menor sobreposição considerada repetição (caracteres)
+        max_overlap: Maior sobreposição verificada (caracteres)
+
+    Returns:
+        str: Resposta combinada
+    """
+    stripped = continuation.lstrip()
+    if stripped.startswith("```"):
+        stripped = stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        continuation = stripped
+    if stripped.endswith("```"):
+        continuation = continuation.rstrip()[:-3]
+
+    # O modelo recomeçou a resposta do início
+    head = partial.lstrip()[:40]
+    if len(head) == 40 and stripped.startswith(head):
+        return continuation
+
+    for size in range(min(max_overlap, len(partial), len(continuation)), min_overlap - 1, -1):
+        if partial.endswith(continuation[:size]):
+            return partial + continuation[size:]
+    return partial + continuation
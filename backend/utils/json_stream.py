@@ -0,0 +1,104 @@
+"""
+Parser incremental de JSON para respostas em streaming
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JsonObjectStream:
+    """
+    Analisa incrementalmente um objeto JSON recebido em fragmentos
+
+    Cada membro de nível superior (`"chave": valor`) é emitido assim que seu valor
+    se fecha, sem esperar o restante do documento. Texto antes da primeira chave
+    de abertura (ex.: marcadores de código ```json) é ignorado.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start: Optional[int] = None
+        self.members: Dict[str, Any] = {}
+        self.done = False
+
+    def _emit(self, start: int, end: int, events: List[Tuple[str, Any]]):
+        """Interpreta o trecho [start, end) como um membro e o registra"""
+        member = self._buffer[start:end].strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return
+        for key, value in parsed.items():
+            self.members[key] = value
+            events.append((key, value))
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Adiciona um fragmento de texto ao parser
+
+        Args:
+            chunk: Próximo fragmento da resposta
+
+        Returns:
+            List[Tuple[str, Any]]: Membros concluídos neste fragmento (chave, valor)
+        """
+        events: List[Tuple[str, Any]] = []
+        if self.done or not chunk:
+            return events
+
+        self._buffer += chunk
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._member_start = i + 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._member_start is not None:
+                    # Valor composto de nível superior concluído
+                    self._emit(self._member_start, i + 1, events)
+                    self._member_start = None
+                elif self._depth == 0:
+                    # Fim do objeto: emite eventual valor escalar pendente
+                    if self._member_start is not None:
+                        self._emit(self._member_start, i, events)
+                    self._member_start = None
+                    self.done = True
+                    self._pos = i + 1
+                    return events
+            elif char == "," and self._depth == 1:
+                if self._member_start is not None:
+                    self._emit(self._member_start, i, events)
+                self._member_start = i + 1
+
+        self._pos = len(buffer)
+        return events
+
+    @property
+    def text(self) -> str:
+        """Texto completo recebido até o momento"""
+        return self._buffer
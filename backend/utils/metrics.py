@@ -0,0 +1,303 @@
+"""
+Métricas da aplicação no formato de exposição de texto do Prometheus
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Limites (em segundos) dos histogramas de duração: de milissegundos (parsing)
+# a minutos (chamadas ao modelo com documentos longos)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# O charset é acrescentado pela resposta do Starlette
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escapa o valor de um rótulo"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Formata os rótulos no padrão `{nome="valor",...}`"""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Formata um valor numérico (inteiros sem casa decimal)"""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Base das métricas: nome, descrição e rótulos"""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Linhas de amostra no formato de exposição"""
+
+    def render(self) -> str:
+        """Renderiza a métrica com cabeçalhos `HELP` e `TYPE`"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Contador monotônico"""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        """Incrementa o contador"""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """
+    Valor instantâneo
+
+    Pode ser atualizado explicitamente (`inc`/`dec`/`set`) ou calculado no momento
+    da coleta por uma função (`set_function`), sem custo no caminho da requisição.
+    """
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: str):
+        """Define uma função avaliada a cada coleta"""
+        self._functions[self._key(labels)] = function
+
+    def _samples(self) -> Iterator[str]:
+        values = dict(self._values)
+        for key, function in self._functions.items():
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Histograma com limites fixos"""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por combinação de rótulos: [contagem por faixa (não cumulativa) + faixa +Inf, soma]
+        self._values: Dict[LabelValues, List] = {}
+
+    def observe(self, value: float, **labels: str):
+        """Registra uma observação"""
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Mede a duração do bloco `with`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> Iterator[str]:
+        bucket_names = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(bucket_names, key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expostas em `/metrics`"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Renderiza todas as métricas no formato de exposição de texto"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    "veritas_stage_duration_seconds",
+    "Duração de cada etapa da avaliação",
+    ["stage"]
+)
+REQUEST_DURATION = registry.histogram(
+    "veritas_request_duration_seconds",
+    "Duração total das requisições de avaliação por endpoint",
+    ["endpoint"]
+)
+UPSTREAM_RESPONSES = registry.counter(
+    "veritas_upstream_responses_total",
+    "Respostas da API do modelo por código de status (ou tipo de falha de transporte)",
+    ["status"]
+)
+UPSTREAM_PROMPT_CHARS = registry.counter(
+    "veritas_upstream_prompt_chars_total",
+    "Caracteres enviados à API do modelo (prompt)"
+)
+UPSTREAM_RESPONSE_CHARS = registry.counter(
+    "veritas_upstream_response_chars_total",
+    "Caracteres recebidos da API do modelo (conteúdo gerado)"
+)
+UPSTREAM_TOKENS = registry.counter(
+    "veritas_upstream_tokens_total",
+    "Tokens consumidos segundo o campo `usage` da API",
+    ["type"]
+)
+JSON_RESPONSES = registry.counter(
+    "veritas_json_responses_total",
+    "Respostas JSON do modelo por forma de interpretação (direct, extracted, repaired, continued, closed, failed)",
+    ["outcome"]
+)
+EVALUATIONS_IN_FLIGHT = registry.gauge(
+    "veritas_evaluations_in_flight",
+    "Avaliações em andamento junto à API do modelo"
+)
+EVALUATIONS_IN_FLIGHT.set(0)
+QUEUE_DEPTH = registry.gauge(
+    "veritas_queue_depth",
+    "Itens aguardando processamento por fila",
+    ["queue"]
+)
+
+
+def observe_stage(stage: str):
+    """
+    Mede a duração de uma etapa da avaliação
+
+    Uso:
+        with observe_stage("extraction"):
+            ...
+    """
+    return STAGE_DURATION.time(stage=stage)
+
+
+def record_usage(usage: Optional[Dict]):
+    """Contabiliza o campo `usage` de uma resposta da API (quando presente)"""
+    if not isinstance(usage, dict):
+        return
+    for field, label in (("prompt_tokens", "prompt"), ("completion_tokens", "completion")):
+        value = usage.get(field)
+        if isinstance(value, (int, float)):
+            UPSTREAM_TOKENS.inc(value, type=label)
+
+
+class RequestTimingMiddleware:
+    """
+    Mede a duração total das requisições de avaliação
+
+    Também registra o instante de chegada em `request.state.request_started_at`,
+    permitindo que a rota calcule o tempo gasto antes de ser chamada (recebimento
+    e parsing do corpo multipart).
+    """
+
+    def __init__(self, app, endpoints: Dict[str, str]):
+        """
+        Args:
+            app: Aplicação ASGI
+            endpoints: Mapa de caminho para o rótulo `endpoint` da métrica
+        """
+        self.app = app
+        self.endpoints = endpoints
+
+    async def __call__(self, scope, receive, send):
+        endpoint = self.endpoints.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        scope.setdefault("state", {})["request_started_at"] = started
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
@@ -0,0 +1,44 @@
+"""
+Serialização JSON rápida das respostas da API
+
+As rotas de avaliação retornam `FastJSONResponse(modelo)`: o modelo Pydantic, já
+validado na construção, é convertido diretamente em bytes, sem a revalidação pelo
+`response_model` nem o `jsonable_encoder` do FastAPI. Com o pacote `orjson`
+instalado, ele é usado na serialização; sem ele, o `model_dump_json` do
+pydantic-core.
+"""
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson  # opcional; requer: pip install orjson
+except ImportError:
+    orjson = None
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Serializa um modelo Pydantic (ou valor compatível com JSON) em bytes UTF-8 compactos
+
+    Args:
+        content: Modelo Pydantic, dicionário, lista ou valor simples
+
+    Returns:
+        bytes: JSON sem espaços entre separadores
+    """
+    if isinstance(content, BaseModel):
+        if orjson is not None:
+            return orjson.dumps(content.model_dump(mode="json"))
+        return content.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Resposta JSON serializada com `dump_json` (aceita modelos Pydantic diretamente)"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
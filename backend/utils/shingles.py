@@ -0,0 +1,81 @@
+"""
+Hashing vetorizado de shingles (n-gramas de palavras) com NumPy
+"""
+import re
+import unicodedata
+import zlib
+from typing import List, Tuple
+import numpy as np
+
+
+_WORD_RE = re.compile(r"\w+")
+
+# Base do hash polinomial que combina as palavras de um shingle
+_SHINGLE_BASE = np.uint64(1099511628211)
+
+
+def tokenize(text: str) -> Tuple[List[str], np.ndarray]:
+    """
+    Separa o texto em palavras normalizadas (minúsculas, sem acentos)
+
+    Args:
+        text: Texto a tokenizar
+
+    Returns:
+        Tuple[List[str], np.ndarray]: (palavras, posições de início e fim de cada palavra no texto, formato (n, 2))
+    """
+    words: List[str] = []
+    spans: List[Tuple[int, int]] = []
+    for match in _WORD_RE.finditer(text):
+        word = unicodedata.normalize("NFKD", match.group().lower())
+        words.append("".join(char for char in word if not unicodedata.combining(char)))
+        spans.append(match.span())
+    return words, np.asarray(spans, dtype=np.int64).reshape(-1, 2)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """Finalizador do splitmix64: espalha os bits dos hashes"""
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def word_hashes(words: List[str]) -> np.ndarray:
+    """Hash estável (independente do processo) de cada palavra"""
+    cache = {}
+    hashes = np.empty(len(words), dtype=np.uint64)
+    for index, word in enumerate(words):
+        value = cache.get(word)
+        if value is None:
+            value = cache[word] = zlib.crc32(word.encode("utf-8"))
+        hashes[index] = value
+    return hashes
+
+
+def shingle_hashes(words: List[str], size: int) -> np.ndarray:
+    """
+    Hash de 64 bits de cada sequência de `size` palavras consecutivas
+
+    Args:
+        words: Palavras normalizadas (ver `tokenize`)
+        size: Número de palavras por shingle
+
+    Returns:
+        np.ndarray: Hashes (uint64), um por posição inicial; vazio se houver menos de `size` palavras
+    """
+    hashes = word_hashes(words)
+    count = len(hashes) - size + 1
+    if count <= 0:
+        return np.empty(0, dtype=np.uint64)
+    # Overflow de uint64 é intencional (aritmética módulo 2^64)
+    with np.errstate(over="ignore"):
+        combined = hashes[:count].copy()
+        for offset in range(1, size):
+            combined = combined * _SHINGLE_BASE + hashes[offset:offset + count]
+        return _mix(combined)
+
+
+def text_shingles(text: str, size: int) -> np.ndarray:
+    """Conjunto (ordenado, sem repetição) de hashes de shingles de um texto"""
+    words, _ = tokenize(text)
+    return np.unique(shingle_hashes(words, size))
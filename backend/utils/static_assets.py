@@ -0,0 +1,389 @@
+"""
+Assets estáticos com compressão prévia, nomes com impressão digital e cache de longa duração
+
+O build (`python -m backend.build_assets`) copia os assets de `static/` para
+`STATIC_BUILD_DIR` com o hash do conteúdo no nome (ex.: `landing/styles.3f9c0a1b2d.css`),
+gera variantes gzip e Brotli e reescreve as referências nas páginas. Na
+inicialização, `StaticAssets` indexa em memória o manifesto do build e os arquivos
+de origem; os assets e as páginas do build são servidos sem consultar o sistema de
+arquivos:
+
+- assets com impressão digital: `Cache-Control: immutable` (o nome muda com o conteúdo);
+- páginas e assets pelo nome original: revalidação a cada acesso (`no-cache`);
+- variante escolhida por `Accept-Encoding` (br, depois gzip), com `Vary: Accept-Encoding`;
+- `ETag` e `Last-Modified`, com resposta 304 a `If-None-Match` e `If-Modified-Since`.
+
+As páginas HTML e os arquivos pequenos ficam em memória; os demais são servidos do
+disco sem `stat` por requisição. Os arquivos de origem (servidos pelo nome original,
+sem impressão digital) podem ser editados durante o desenvolvimento: a cada
+requisição, seu `stat` é conferido em uma thread e o arquivo é reindexado se mudou.
+"""
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from stat import S_ISREG
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Caracteres do hash SHA-256 usados na impressão digital e no ETag
+FINGERPRINT_LENGTH = 10
+
+# Codificações pré-comprimidas, em ordem de preferência, e a extensão de cada variante
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Arquivos até este tamanho são mantidos em memória
+MEMORY_MAX_BYTES = 512 * 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def content_hash(data: bytes) -> str:
+    """Hash do conteúdo usado na impressão digital e no ETag"""
+    return hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def fingerprinted_name(relative_path: str, digest: str) -> str:
+    """Nome com impressão digital (ex.: `landing/styles.css` -> `landing/styles.3f9c0a1b2d.css`)"""
+    root, extension = os.path.splitext(relative_path)
+    return f"{root}.{digest}{extension}"
+
+
+def media_type_for(path: str) -> str:
+    """Tipo MIME pela extensão"""
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def iter_files(directory: str) -> Iterator[str]:
+    """Caminhos relativos (com `/`) de todos os arquivos de um diretório, em ordem"""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.relpath(os.path.join(root, name), directory).replace(os.sep, "/")
+
+
+class _Variant(NamedTuple):
+    """Representação de um asset (identidade ou pré-comprimida)"""
+    path: str
+    stat: os.stat_result
+    content: Optional[bytes]
+
+
+class _Asset(NamedTuple):
+    """Asset indexado na inicialização"""
+    media_type: str
+    digest: str
+    last_modified: str
+    mtime: int
+    cache_control: str
+    variants: Dict[str, _Variant]  # "identity", "br", "gzip"
+
+
+@lru_cache(maxsize=64)
+def accepted_encodings(header: str) -> Tuple[str, ...]:
+    """
+    Codificações de `ENCODINGS` aceitas pelo cliente, em ordem de preferência
+
+    Args:
+        header: Valor de `Accept-Encoding` (valores distintos são poucos: o resultado é memorizado)
+    """
+    qualities: Dict[str, float] = {}
+    for item in header.lower().split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip()] = quality
+    wildcard = qualities.get("*", 0.0)
+    return tuple(
+        encoding for encoding, _ in ENCODINGS
+        if qualities.get(encoding, wildcard) > 0
+    )
+
+
+def _load_variant(path: str, in_memory: bool) -> _Variant:
+    stat = os.stat(path)
+    content = None
+    if in_memory or stat.st_size <= MEMORY_MAX_BYTES:
+        with open(path, "rb") as file:
+            content = file.read()
+    return _Variant(path, stat, content)
+
+
+class StaticAssets:
+    """
+    Índice em memória dos assets estáticos e das páginas da aplicação
+
+    Args:
+        static_dir: Diretório de origem servido em `/static`
+        build_dir: Diretório gerado por `python -m backend.build_assets` (opcional)
+        pages: Mapa de rota (ex.: "/") para o caminho da página HTML de origem
+        base_dir: Diretório base dos caminhos das páginas (chaves do manifesto)
+    """
+
+    def __init__(self, static_dir: str, build_dir: str, pages: Dict[str, str], base_dir: str):
+        self.static_dir = static_dir
+        self.build_dir = build_dir
+        self.pages = pages
+        self.base_dir = base_dir
+        self._assets: Dict[str, _Asset] = {}
+        self._pages: Dict[str, _Asset] = {}
+        # Caminhos dos arquivos de origem (sem impressão digital), reindexados quando mudam
+        self._asset_sources: Dict[str, str] = {}
+        self._page_sources: Dict[str, str] = {}
+        self.built = False
+
+    def _index(self, variants: Dict[str, _Variant], digest: str, media_type: str, cache_control: str) -> _Asset:
+        mtime = int(variants["identity"].stat.st_mtime)
+        return _Asset(
+            media_type=media_type,
+            digest=digest,
+            last_modified=formatdate(mtime, usegmt=True),
+            mtime=mtime,
+            cache_control=cache_control,
+            variants=variants
+        )
+
+    def _index_source(self, path: str, in_memory: bool, cache_control: str = REVALIDATE_CACHE_CONTROL) -> _Asset:
+        variant = _load_variant(path, in_memory)
+        content = variant.content
+        if content is None:
+            with open(path, "rb") as file:
+                content = file.read()
+        return self._index({"identity": variant}, content_hash(content), media_type_for(path), cache_control)
+
+    def _index_built(self, entry: Dict, cache_control: str, in_memory: bool) -> _Asset:
+        path = os.path.join(self.build_dir, entry["file"])
+        variants = {"identity": _load_variant(path, in_memory)}
+        for encoding, suffix in ENCODINGS:
+            if encoding in entry.get("encodings", []):
+                variants[encoding] = _load_variant(path + suffix, in_memory)
+        return self._index(variants, entry["hash"], media_type_for(path), cache_control)
+
+    def _read_manifest(self) -> Optional[Dict]:
+        path = os.path.join(self.build_dir, MANIFEST_FILE) if self.build_dir else ""
+        if not path or not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            if manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"versão {manifest.get('version')} não suportada")
+            return manifest
+        except Exception as e:
+            print(f"Aviso: Manifesto de assets estáticos inválido ({path}): {e}")
+            return None
+
+    def load(self):
+        """Indexa os arquivos de origem e, se houver, o build (chamado uma vez na inicialização)"""
+        assets: Dict[str, _Asset] = {}
+        pages: Dict[str, _Asset] = {}
+        asset_sources: Dict[str, str] = {}
+        page_sources: Dict[str, str] = {}
+        newest_source = 0.0
+
+        # Arquivos de origem, pelo nome original
+        if os.path.isdir(self.static_dir):
+            for relative in iter_files(self.static_dir):
+                path = os.path.join(self.static_dir, relative)
+                asset = self._index_source(path, in_memory=False)
+                assets[f"/static/{relative}"] = asset
+                asset_sources[f"/static/{relative}"] = path
+                newest_source = max(newest_source, asset.mtime)
+
+        manifest = self._read_manifest()
+        for route, page in self.pages.items():
+            source = os.path.join(self.base_dir, page)
+            built = (manifest or {}).get("pages", {}).get(page)
+            try:
+                if os.path.isfile(source):
+                    newest_source = max(newest_source, os.stat(source).st_mtime)
+                if built is not None:
+                    pages[route] = self._index_built(built, REVALIDATE_CACHE_CONTROL, in_memory=True)
+                else:
+                    page_sources[route] = source
+                    if os.path.isfile(source):
+                        pages[route] = self._index_source(source, in_memory=True)
+            except OSError as e:
+                print(f"Aviso: Falha ao carregar a página {page}: {e}")
+
+        # Assets com impressão digital do build
+        if manifest is not None:
+            for relative, entry in manifest.get("assets", {}).items():
+                try:
+                    assets[f"/static/{entry['file']}"] = self._index_built(entry, IMMUTABLE_CACHE_CONTROL, in_memory=False)
+                    asset_sources.pop(f"/static/{entry['file']}", None)
+                except OSError as e:
+                    print(f"Aviso: Asset do build ausente ({entry.get('file')}): {e}")
+            if newest_source > manifest.get("built_at", 0):
+                print("Aviso: Assets estáticos alterados após o build; execute `python -m backend.build_assets`")
+
+        self._assets = assets
+        self._pages = pages
+        self._asset_sources = asset_sources
+        self._page_sources = page_sources
+        self.built = manifest is not None
+
+    def _refresh(self, table: Dict[str, _Asset], key: str, path: str, in_memory: bool) -> Optional[_Asset]:
+        """
+        Confere o `stat` de um arquivo de origem e o reindexa se o tamanho ou a data mudaram
+
+        Returns:
+            Optional[_Asset]: Asset atualizado, ou None se o arquivo não existe mais
+        """
+        try:
+            stat = os.stat(path)
+            if not S_ISREG(stat.st_mode):
+                raise FileNotFoundError(path)
+            current = table.get(key)
+            if current is not None:
+                indexed = current.variants["identity"].stat
+                if (indexed.st_mtime_ns, indexed.st_size) == (stat.st_mtime_ns, stat.st_size):
+                    return current
+            asset = self._index_source(path, in_memory)
+        except OSError:
+            table.pop(key, None)
+            return None
+        table[key] = asset
+        return asset
+
+    def _find_source(self, path: str) -> Optional[str]:
+        """Arquivo de `static_dir` para um caminho de URL não indexado (ex.: criado após a inicialização)"""
+        prefix = "/static/"
+        if not path.startswith(prefix) or not os.path.isdir(self.static_dir):
+            return None
+        root = os.path.realpath(self.static_dir)
+        try:
+            candidate = os.path.realpath(os.path.join(root, path[len(prefix):]))
+        except ValueError:
+            return None
+        if os.path.commonpath([root, candidate]) != root or not os.path.isfile(candidate):
+            return None
+        return candidate
+
+    def get_stats(self) -> Dict:
+        """Resumo do índice (para diagnóstico)"""
+        return {
+            "built": self.built,
+            "assets": len(self._assets),
+            "pages": sorted(self._pages),
+            "in_memory_bytes": sum(
+                len(variant.content)
+                for asset in list(self._assets.values()) + list(self._pages.values())
+                for variant in asset.variants.values()
+                if variant.content is not None
+            )
+        }
+
+    @staticmethod
+    def _not_modified(request: Request, asset: _Asset) -> bool:
+        """Avalia `If-None-Match` (prioritário) e `If-Modified-Since`"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            for tag in if_none_match.split(","):
+                tag = tag.strip()
+                if tag == "*":
+                    return True
+                # ETags de variantes (`"<hash>-br"`) valem para o mesmo conteúdo
+                if tag.removeprefix("W/").strip('"').partition("-")[0] == asset.digest:
+                    return True
+            return False
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return asset.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def respond(self, request: Request, asset: _Asset) -> Response:
+        """
+        Resposta para um asset: variante por `Accept-Encoding`, cabeçalhos de cache e 304
+
+        Args:
+            request: Requisição (GET ou HEAD)
+            asset: Asset indexado
+        """
+        encoding = "identity"
+        for accepted in accepted_encodings(request.headers.get("accept-encoding", "")):
+            if accepted in asset.variants:
+                encoding = accepted
+                break
+        variant = asset.variants[encoding]
+
+        headers = {
+            "cache-control": asset.cache_control,
+            "etag": f'"{asset.digest}"' if encoding == "identity" else f'"{asset.digest}-{encoding}"',
+            "last-modified": asset.last_modified
+        }
+        if len(asset.variants) > 1:
+            headers["vary"] = "Accept-Encoding"
+
+        if self._not_modified(request, asset):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+        if variant.content is not None:
+            headers["content-length"] = str(len(variant.content))
+            body = b"" if request.method == "HEAD" else variant.content
+            return Response(content=body, headers=headers, media_type=asset.media_type)
+        return FileResponse(
+            variant.path,
+            headers=headers,
+            media_type=asset.media_type,
+            stat_result=variant.stat
+        )
+
+    def asset(self, path: str) -> Optional[_Asset]:
+        """
+        Asset para um caminho de URL (ex.: "/static/landing/styles.css")
+
+        Assets do build são servidos do índice; arquivos de origem têm o `stat` conferido
+        (use `aasset` no loop de eventos).
+        """
+        asset = self._assets.get(path)
+        if asset is not None and path not in self._asset_sources:
+            return asset
+        source = self._asset_sources.get(path) or self._find_source(path)
+        if source is None:
+            return None
+        self._asset_sources[path] = source
+        asset = self._refresh(self._assets, path, source, in_memory=False)
+        if asset is None:
+            self._asset_sources.pop(path, None)
+        return asset
+
+    async def aasset(self, path: str) -> Optional[_Asset]:
+        """Versão de `asset` para o loop de eventos: o acesso ao disco ocorre em uma thread"""
+        asset = self._assets.get(path)
+        if asset is not None and path not in self._asset_sources:
+            return asset
+        return await asyncio.to_thread(self.asset, path)
+
+    def page(self, route: str) -> Optional[_Asset]:
+        """Página para uma rota (ex.: "/"); páginas de origem têm o `stat` conferido (use `apage` no loop de eventos)"""
+        source = self._page_sources.get(route)
+        if source is None:
+            return self._pages.get(route)
+        return self._refresh(self._pages, route, source, in_memory=True)
+
+    async def apage(self, route: str) -> Optional[_Asset]:
+        """Versão de `page` para o loop de eventos: o acesso ao disco ocorre em uma thread"""
+        if route not in self._page_sources:
+            return self._pages.get(route)
+        return await asyncio.to_thread(self.page, route)
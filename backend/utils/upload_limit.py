@@ -0,0 +1,110 @@
+"""
+Middleware ASGI que rejeita uploads grandes antes de consumir o corpo da requisição
+"""
+import json
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+
+
+class RequestTooLargeError(HTTPException):
+    """
+    Erro lançado durante a leitura de um corpo acima do limite
+
+    Por ser uma `HTTPException`, é convertido em resposta 413 pelo FastAPI mesmo
+    quando ocorre dentro do parsing do formulário multipart.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=_too_large_message(limit)
+        )
+
+
+def _too_large_message(limit: int) -> str:
+    """Mensagem de erro para requisições acima do limite"""
+    return f"Arquivo muito grande. Tamanho máximo da requisição: {limit / (1024 * 1024):.1f}MB"
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Limita o tamanho do corpo de requisições de upload
+
+    Rejeita com HTTP 413 a partir do cabeçalho `Content-Length`, sem ler o corpo,
+    ou assim que a contagem acumulada de bytes recebidos ultrapassa o limite
+    (uploads em `Transfer-Encoding: chunked` ou com `Content-Length` incorreto).
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Args:
+            app: Aplicação ASGI
+            limits: Mapa de prefixo de rota para tamanho máximo do corpo em bytes
+        """
+        self.app = app
+        self.limits = limits
+
+    def _limit_for(self, path: str) -> Optional[int]:
+        """Obtém o limite aplicável ao caminho (prefixo mais específico)"""
+        matches = [prefix for prefix in self.limits if path.startswith(prefix)]
+        if not matches:
+            return None
+        return self.limits[max(matches, key=len)]
+
+    async def _reject(self, send, limit: int):
+        """Envia a resposta HTTP 413"""
+        body = json.dumps({"detail": _too_large_message(limit)}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close")
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("method") not in ("POST", "PUT"):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self._limit_for(scope.get("path", ""))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                if int(content_length) > limit:
+                    await self._reject(send, limit)
+                    return
+            except ValueError:
+                pass
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise RequestTooLargeError(limit)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except RequestTooLargeError:
+            if not response_started:
+                await self._reject(send, limit)
@@ -0,0 +1,155 @@
+"""
+Benchmark: extração de DOCX em fluxo x modelo de objetos do python-docx
+
+Gera TCCs sintéticos grandes, com uma tabela a cada poucos parágrafos, e compara
+a extração atual (`backend.services.extractors.docx`, leitura em fluxo de
+`word/document.xml`) com a implementação anterior, que carregava o documento
+inteiro no python-docx e percorria parágrafos e tabelas em duas passadas.
+
+Cada medição roda em um processo novo e informa o tempo (melhor de `--repeat`),
+a vazão (MB de XML descompactado e milhões de caracteres extraídos por segundo)
+e o pico de memória acima do processo já inicializado. Também confere se os dois caminhos
+produzem os mesmos parágrafos e células (a ordem difere: a extração em fluxo segue
+a ordem do documento).
+
+Uso:
+    python -m benchmarks.bench_docx [--sizes 250000,1000000,4000000] [--repeat 3] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+from collections import Counter
+from typing import Any, Dict, List
+
+from docx import Document
+
+from benchmarks.fixtures import thesis_text
+
+
+TABLE_EVERY = 12  # parágrafos entre tabelas
+TABLE_ROWS = 8
+TABLE_COLUMNS = 4
+
+PROBE = r"""
+import json, sys, time
+
+def memory(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1]) * 1024
+    return 0
+
+def legacy(file_path):
+    from docx import Document
+    doc = Document(file_path)
+    text = []
+    for paragraph in doc.paragraphs:
+        if paragraph.text.strip():
+            text.append(paragraph.text)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                if cell.text.strip():
+                    text.append(cell.text)
+    return text
+
+def streaming(file_path):
+    import zipfile
+    from backend.services.extractors import docx
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(docx.document_part_name(archive)) as document:
+            return list(docx.iter_blocks(document))
+
+extract = legacy if sys.argv[1] == "legacy" else streaming
+import docx, backend.services.extractors.docx
+baseline = memory("VmRSS:")
+timings = []
+for _ in range(int(sys.argv[3])):
+    started = time.perf_counter()
+    blocks = extract(sys.argv[2])
+    timings.append(time.perf_counter() - started)
+print(json.dumps({
+    "seconds": min(timings),
+    "peak_bytes": memory("VmHWM:") - baseline,
+    "chars": sum(len(block) for block in blocks) + 2 * max(len(blocks) - 1, 0),
+    "blocks": blocks
+}))
+"""
+
+
+def build_docx(path: str, target_chars: int):
+    """TCC sintético com uma tabela (com células mescladas) a cada `TABLE_EVERY` parágrafos"""
+    document = Document()
+    for index, paragraph in enumerate(thesis_text(target_chars, variant=0).split("\n\n")):
+        document.add_paragraph(paragraph)
+        if index % TABLE_EVERY == TABLE_EVERY - 1:
+            table = document.add_table(rows=TABLE_ROWS, cols=TABLE_COLUMNS)
+            for row in range(TABLE_ROWS):
+                for column in range(TABLE_COLUMNS):
+                    table.cell(row, column).text = f"Tabela {index} - linha {row}, coluna {column}"
+            table.cell(0, 0).merge(table.cell(0, 1))
+            table.cell(1, 3).merge(table.cell(3, 3))
+    document.save(path)
+
+
+def probe(mode: str, path: str, repeat: int) -> Dict[str, Any]:
+    """Mede uma extração em um processo novo"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, mode, path, str(repeat)],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="250000,1000000,4000000", help="Tamanhos aproximados do texto (caracteres)")
+    parser.add_argument("--repeat", type=int, default=3, help="Extrações por medição (vale a mais rápida)")
+    parser.add_argument("--json", help="Arquivo para gravar os resultados")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'caracteres':>11}{'XML (MB)':>10}  {'extrator':<10}{'tempo (s)':>10}{'MB/s':>8}"
+              f"{'Mcar/s':>8}{'pico (MB)':>11}  mesmo texto")
+        for size in (int(value) for value in args.sizes.split(",")):
+            path = os.path.join(directory, f"tcc_{size}.docx")
+            build_docx(path, size)
+            file_mb = os.path.getsize(path) / (1024 * 1024)
+            with zipfile.ZipFile(path) as archive:
+                xml_mb = archive.getinfo("word/document.xml").file_size / (1024 * 1024)
+
+            measured = {mode: probe(mode, path, args.repeat) for mode in ("legacy", "streaming")}
+            same = Counter(measured["legacy"]["blocks"]) == Counter(measured["streaming"]["blocks"])
+            for mode, result in measured.items():
+                row = {
+                    "target_chars": size,
+                    "file_mb": round(file_mb, 2),
+                    "xml_mb": round(xml_mb, 1),
+                    "extractor": mode,
+                    "seconds": round(result["seconds"], 3),
+                    "mb_per_second": round(xml_mb / result["seconds"], 1),
+                    "mchars_per_second": round(result["chars"] / result["seconds"] / 1e6, 2),
+                    "peak_mb": round(result["peak_bytes"] / (1024 * 1024), 1),
+                    "same_blocks": same
+                }
+                results.append(row)
+                print(f"{size:>11}{row['xml_mb']:>10}  {mode:<10}{row['seconds']:>10}{row['mb_per_second']:>8}"
+                      f"{row['mchars_per_second']:>8}{row['peak_mb']:>11}  {'sim' if same else 'NÃO'}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark: avaliação por seções (map-reduce) x chamada única
+
+Simula a API de chat completions com um modelo de latência proporcional ao
+tamanho do prompt (processamento da entrada) e ao número de tokens gerados,
+e compara os dois caminhos de `EvaluatorService` para TCCs sintéticos de
+tamanhos crescentes: tempo total, duração da maior chamada individual (que
+precisa caber no tempo limite de `PerplexityClient`) e volume de prompt enviado.
+
+As constantes do modelo de latência podem ser ajustadas para refletir medições reais.
+
+Uso:
+    python -m benchmarks.bench_map_reduce [--scale 0.01] [--sizes 60000,240000,480000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("PERPLEXITY_API_KEY", "benchmark")
+os.environ.setdefault("EVALUATION_CACHE_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from backend.config import settings  # noqa: E402
+from backend.services import perplexity_client  # noqa: E402
+from backend.services.evaluator import EvaluatorService  # noqa: E402
+
+
+# Modelo de latência (valores típicos de um LLM hospedado, em segundos)
+BASE_LATENCY = 1.5
+SECONDS_PER_INPUT_CHAR = 1 / 40000  # ~10k tokens/s de pré-processamento
+SECONDS_PER_OUTPUT_TOKEN = 1 / 50  # ~50 tokens/s de geração
+FINAL_OUTPUT_TOKENS = 2500
+SECTION_OUTPUT_TOKENS = 600
+
+FINAL_RESPONSE = {
+    "evaluator_1": {"name": "Avaliador 1 - Metodologia", "analysis": "Análise " * 40, "score": 2.5},
+    "evaluator_2": {"name": "Avaliador 2 - Escrita Acadêmica e ABNT", "analysis": "Análise " * 40, "score": 1.5},
+    "evaluator_3": {"name": "Avaliador 3 - Originalidade e Coerência Científica", "analysis": "Análise " * 40, "score": 1.5},
+    "final_verdict": {"summary": "Síntese " * 50, "final_score": 5.5, "recommendations": "Recomendação " * 30}
+}
+SECTION_RESPONSE = {
+    "methodology_notes": "Nota " * 30,
+    "writing_notes": "Nota " * 30,
+    "originality_notes": "Nota " * 30,
+    "strengths": "Ponto forte " * 10,
+    "weaknesses": "Ponto fraco " * 10
+}
+
+
+def build_thesis(target_chars: int) -> str:
+    """Gera um TCC sintético com cabeçalhos de seção e o tamanho aproximado indicado"""
+    headings = ["RESUMO", "1 INTRODUÇÃO", "2 FUNDAMENTAÇÃO TEÓRICA", "3 METODOLOGIA",
+                "4 RESULTADOS E DISCUSSÃO", "5 CONSIDERAÇÕES FINAIS", "REFERÊNCIAS"]
+    weights = [0.03, 0.12, 0.3, 0.15, 0.25, 0.07, 0.08]
+    paragraph = ("Este trabalho investiga a aplicação de modelos de linguagem na avaliação "
+                 "de trabalhos acadêmicos, considerando critérios de metodologia e escrita. ") * 4
+    parts = []
+    for heading, weight in zip(headings, weights):
+        body_size = int(target_chars * weight)
+        repeats = max(1, body_size // (len(paragraph) + 2))
+        parts.append(heading + "\n\n" + "\n\n".join([paragraph] * repeats))
+    return "\n\n".join(parts)
+
+
+def make_transport(scale: float, counters: dict) -> httpx.MockTransport:
+    """Cria um transporte HTTP simulado com latência proporcional à carga"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        prompt = payload["messages"][-1]["content"]
+        is_section = "## SEÇÃO:" in prompt
+        output_tokens = SECTION_OUTPUT_TOKENS if is_section else FINAL_OUTPUT_TOKENS
+        output_tokens = min(output_tokens, payload["max_tokens"])
+
+        latency = BASE_LATENCY + len(prompt) * SECONDS_PER_INPUT_CHAR + output_tokens * SECONDS_PER_OUTPUT_TOKEN
+        counters["calls"] += 1
+        counters["prompt_chars"] += len(prompt)
+        counters["max_call_seconds"] = max(counters["max_call_seconds"], latency)
+        await asyncio.sleep(latency * scale)
+
+        content = json.dumps(SECTION_RESPONSE if is_section else FINAL_RESPONSE, ensure_ascii=False)
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    return httpx.MockTransport(handler)
+
+
+async def run_once(text: str, map_reduce: bool, scale: float) -> dict:
+    """Executa uma avaliação pelo caminho indicado e mede o tempo"""
+    counters = {"calls": 0, "prompt_chars": 0, "max_call_seconds": 0.0}
+    perplexity_client._http_client = httpx.AsyncClient(transport=make_transport(scale, counters))
+    settings.map_reduce_enabled = map_reduce
+    settings.map_reduce_threshold_chars = 0
+
+    service = EvaluatorService()
+    started = time.perf_counter()
+    await service.evaluate(text, use_cache=False)
+    elapsed = (time.perf_counter() - started) / scale
+
+    await perplexity_client.close_http_client()
+    return {"seconds": elapsed, **counters}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.01, help="Fator de aceleração do tempo simulado")
+    parser.add_argument("--sizes", default="60000,240000,480000", help="Tamanhos de texto (caracteres)")
+    args = parser.parse_args()
+
+    print(f"Tempo limite por chamada: {settings.perplexity_timeout_seconds:.0f}s")
+    print(f"{'caracteres':>10} | {'caminho':<10} | {'tempo (s)':>9} | {'maior chamada (s)':>17} | {'chamadas':>8} | {'prompt (chars)':>14}")
+    print("-" * 84)
+    for size in (int(value) for value in args.sizes.split(",")):
+        text = build_thesis(size)
+        for label, map_reduce in (("único", False), ("map-reduce", True)):
+            result = await run_once(text, map_reduce, args.scale)
+            print(
+                f"{len(text):>10} | {label:<10} | {result['seconds']:>9.1f} | {result['max_call_seconds']:>17.1f} | "
+                f"{result['calls']:>8} | {result['prompt_chars']:>14}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
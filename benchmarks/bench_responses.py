@@ -0,0 +1,214 @@
+"""
+Benchmark: serialização e bytes trafegados das respostas de avaliação
+
+Monta `EvaluationResponse` e `JobStatusResponse` com análises longas em português
+(pareceres sintéticos, pouco repetitivos) e compara:
+
+    anterior  `response_model` do FastAPI (revalidação + `jsonable_encoder` +
+              `json.dumps`), sem compressão
+    atual     `FastJSONResponse` (orjson, se instalado, ou `model_dump_json`) e
+              `ResponseCompressionMiddleware`
+
+Informa o tempo de CPU da serialização por resposta (também com
+`model_dump_json`, para instalações sem orjson), o tempo de CPU da compressão e os
+bytes do corpo na rede por resposta (identidade, gzip e, se o pacote brotli estiver
+instalado, Brotli), além da latência de ponta a ponta de uma requisição
+dentro do processo (sem rede: inclui o custo da compressão, mas não o ganho na
+transferência).
+
+Uso:
+    python -m benchmarks.bench_responses [--analysis-chars 2500] [--iterations 2000] [--json resultado.json]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Callable, Dict
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+
+from backend.models import EvaluationResponse, JobStatusResponse
+from backend.utils import responses
+from backend.utils.compression import ResponseCompressionMiddleware, brotli
+
+
+# Vocabulário das análises sintéticas (texto pouco repetitivo, que comprime como um parecer real)
+WORDS = (
+    "o trabalho apresenta objetivos metodologia coerente análise resultados discussão referências "
+    "citações ABNT amostra entrevistas questionário estatística descritiva inferencial hipótese "
+    "problema pesquisa fundamentação teórica autores revisão literatura lacuna contribuição área "
+    "conclusões limitações estudo futuro sugere-se aprofundar justificar escolha instrumento coleta "
+    "dados validade confiabilidade redação clara coesa parágrafos extensos formatação tabelas figuras "
+    "legendas fonte originalidade plágio indícios trechos paráfrase adequada inadequada consistente "
+    "frágil relevante pertinente insuficiente detalhada superficial quantitativa qualitativa capítulo "
+    "introdução seção resumo abstract palavras-chave norma NBR 6023 10520 14724 orientador banca nota "
+    "critério pontuação escrita acadêmica coerência científica argumento evidência procedimento ético"
+).split()
+
+
+def _analysis(rng: random.Random, chars: int) -> str:
+    """Parecer sintético com frases de tamanhos variados"""
+    sentences, size = [], 0
+    while size < chars:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 22)))
+        sentence = sentence[0].upper() + sentence[1:] + rng.choice((".", ".", ".", ";", ":"))
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)[:chars]
+
+
+def build_evaluation(analysis_chars: int) -> EvaluationResponse:
+    """Avaliação com textos distintos (e pouco repetitivos) em cada campo"""
+    rng = random.Random(42)
+    parts = [_analysis(rng, analysis_chars) for _ in range(5)]
+    return EvaluationResponse(
+        evaluator_1={"name": "Avaliador 1 - Metodologia", "analysis": parts[0], "score": 2.5},
+        evaluator_2={"name": "Avaliador 2 - Escrita Acadêmica e ABNT", "analysis": parts[1], "score": 1.5},
+        evaluator_3={"name": "Avaliador 3 - Originalidade e Coerência Científica", "analysis": parts[2], "score": 1.5},
+        final_verdict={"summary": parts[3], "final_score": 8.0, "recommendations": parts[4]},
+        message="Arquivo tcc.pdf (PDF) processado com sucesso",
+        processing={"extraction_seconds": 0.412, "normalization_seconds": 0.018, "removed_lines": 37.0}
+    )
+
+
+def build_job(evaluation: EvaluationResponse) -> JobStatusResponse:
+    """Job concluído com a avaliação como resultado"""
+    now = time.time()
+    return JobStatusResponse(
+        job_id="3f6c2a9e8b7d4c1e9a0b5d2f7e6c1a3b",
+        status="completed",
+        created_at=now - 42.0,
+        started_at=now - 40.5,
+        finished_at=now,
+        result=evaluation
+    )
+
+
+def cpu_per_call(function: Callable[[], Any], iterations: int) -> float:
+    """Tempo de CPU médio (µs) por chamada"""
+    started = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - started) / iterations * 1e6
+
+
+def legacy_serialization(model, iterations: int) -> float:
+    """Tempo de CPU médio (µs) do caminho `response_model` + `JSONResponse` do FastAPI"""
+    field = create_response_field(name="response", type_=type(model), mode="serialization")
+
+    async def run():
+        started = time.process_time()
+        for _ in range(iterations):
+            content = await serialize_response(field=field, response_content=model, is_coroutine=True)
+            JSONResponse(content)
+        return (time.process_time() - started) / iterations * 1e6
+
+    return asyncio.run(run())
+
+
+def wire_bytes(models: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Bytes do corpo na rede por resposta e codificação aceita, passando pelo middleware"""
+    app = FastAPI()
+    app.add_middleware(ResponseCompressionMiddleware)
+
+    @app.get("/{name}")
+    async def serve(name: str):
+        return responses.FastJSONResponse(models[name])
+
+    client = TestClient(app)
+    encodings = {"identidade": "identity", "gzip": "gzip"}
+    if brotli is not None:
+        encodings["br"] = "br"
+    result = {}
+    for name in models:
+        result[name] = {}
+        for label, accept in encodings.items():
+            with client.stream("GET", f"/{name}", headers={"accept-encoding": accept}) as response:
+                result[name][label] = len(b"".join(response.iter_raw()))
+    return result
+
+
+def request_latency(model, iterations: int) -> Dict[str, float]:
+    """Latência média (ms) de uma requisição em processo, antes e depois"""
+    legacy = FastAPI()
+
+    @legacy.get("/", response_model=type(model))
+    async def legacy_route():
+        return model
+
+    current = FastAPI()
+    current.add_middleware(ResponseCompressionMiddleware)
+
+    @current.get("/", response_model=type(model))
+    async def current_route():
+        return responses.FastJSONResponse(model)
+
+    result = {}
+    for label, app in (("anterior", legacy), ("atual", current)):
+        client = TestClient(app)
+        client.get("/", headers={"accept-encoding": "gzip"})
+        started = time.perf_counter()
+        for _ in range(iterations):
+            client.get("/", headers={"accept-encoding": "gzip"})
+        result[label] = round((time.perf_counter() - started) / iterations * 1000, 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analysis-chars", type=int, default=2500, help="Tamanho de cada análise da avaliação")
+    parser.add_argument("--iterations", type=int, default=2000, help="Serializações medidas por caminho")
+    parser.add_argument("--json", help="Arquivo para gravar os resultados")
+    args = parser.parse_args()
+
+    evaluation = build_evaluation(args.analysis_chars)
+    models = {"EvaluationResponse": evaluation, "JobStatusResponse": build_job(evaluation)}
+    middleware = ResponseCompressionMiddleware(None)
+
+    results: Dict[str, Any] = {"orjson": responses.orjson is not None, "serialization_us": {}, "compression_us": {}}
+    for name, model in models.items():
+        orjson = responses.orjson
+        timings = {"anterior": legacy_serialization(model, args.iterations)}
+        timings["atual"] = cpu_per_call(lambda: responses.dump_json(model), args.iterations)
+        responses.orjson = None
+        timings["atual (sem orjson)"] = cpu_per_call(lambda: responses.dump_json(model), args.iterations)
+        responses.orjson = orjson
+        results["serialization_us"][name] = {label: round(value, 1) for label, value in timings.items()}
+
+        body = responses.dump_json(model)
+        compression = {"gzip": cpu_per_call(lambda: middleware._compress(body, "gzip"), args.iterations // 4 or 1)}
+        if brotli is not None:
+            compression["br"] = cpu_per_call(lambda: middleware._compress(body, "br"), args.iterations // 4 or 1)
+        results["compression_us"][name] = {label: round(value, 1) for label, value in compression.items()}
+    results["wire_bytes"] = wire_bytes(models)
+    results["request_ms"] = request_latency(evaluation, max(args.iterations // 4, 1))
+
+    print(f"orjson: {'instalado' if results['orjson'] else 'não instalado'}; "
+          f"brotli: {'instalado' if brotli is not None else 'não instalado'}\n")
+    print("CPU de serialização por resposta (µs)")
+    for name, timings in results["serialization_us"].items():
+        print(f"  {name:<20}" + "".join(f"{label} {value:>8}   " for label, value in timings.items()))
+    print("\nCPU de compressão por resposta (µs)")
+    for name, timings in results["compression_us"].items():
+        print(f"  {name:<20}" + "".join(f"{label} {value:>8}   " for label, value in timings.items()))
+    print("\nBytes do corpo na rede por resposta")
+    for name, sizes in results["wire_bytes"].items():
+        identity = sizes["identidade"]
+        print(f"  {name:<20}" + "".join(
+            f"{label} {size:>7} ({size / identity:.0%})   " for label, size in sizes.items()
+        ))
+    print("\nLatência por requisição, EvaluationResponse com gzip aceito (ms): " +
+          ", ".join(f"{label} {value}" for label, value in results["request_ms"].items()))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: tempo de inicialização e memória de um worker com extratores importados sob demanda
+
+Cada medição roda em um processo Python novo (inicialização a frio) e informa o
+tempo de importação da aplicação (`backend.main`) e o RSS logo após a
+importação, em dois modos:
+
+    lazy   comportamento atual: nenhum extrator é importado até o primeiro arquivo
+    eager  todos os extratores importados na inicialização, como fazia o
+           `file_processor` ao importar PyPDF2 e python-docx no carregamento do módulo
+
+Também mede o custo do primeiro uso de cada extrator (importação do módulo e de
+suas dependências), pago uma única vez por processo.
+
+Uso:
+    python -m benchmarks.bench_startup [--runs 7] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+
+PROBE = r"""
+import json, os, sys, time
+os.environ.setdefault("PERPLEXITY_API_KEY", "benchmark")
+started = time.perf_counter()
+import backend.main
+from backend.services import extractors
+if {eager}:
+    for name in ("PDF", "DOCX", "ODT", "RTF", "HTML", "MD", "TXT"):
+        extractors.load(extractors._REGISTRY[name])
+elapsed = time.perf_counter() - started
+
+def rss():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return None
+
+result = {{
+    "import_seconds": elapsed,
+    "rss_bytes": rss(),
+    "modules": len(sys.modules),
+    "heavy_modules": sorted(name for name in ("PyPDF2", "docx", "lxml") if name in sys.modules),
+    "first_use_seconds": {{}}
+}}
+if not {eager}:
+    for name in ("PDF", "DOCX", "ODT", "RTF", "HTML", "MD", "TXT"):
+        started = time.perf_counter()
+        extractors.load(extractors._REGISTRY[name])
+        result["first_use_seconds"][name] = time.perf_counter() - started
+print(json.dumps(result))
+"""
+
+
+def probe(eager: bool) -> Dict[str, Any]:
+    """Mede um processo novo"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(eager=eager)],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Medianas das medições de um modo"""
+    summary = {
+        "import_ms": round(statistics.median(sample["import_seconds"] for sample in samples) * 1000, 1),
+        "rss_mb": None,
+        "modules": samples[0]["modules"],
+        "heavy_modules": samples[0]["heavy_modules"]
+    }
+    rss = [sample["rss_bytes"] for sample in samples if sample["rss_bytes"]]
+    if rss:
+        summary["rss_mb"] = round(statistics.median(rss) / (1024 * 1024), 1)
+    first_use = samples[0]["first_use_seconds"]
+    if first_use:
+        summary["first_use_ms"] = {
+            name: round(statistics.median(sample["first_use_seconds"][name] for sample in samples) * 1000, 1)
+            for name in first_use
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Processos medidos por modo")
+    parser.add_argument("--json", help="Arquivo para gravar os resultados")
+    args = parser.parse_args()
+
+    # Aquece o cache de bytecode e de disco antes de medir
+    probe(eager=True)
+
+    results = {}
+    for mode in ("eager", "lazy"):
+        results[mode] = summarize([probe(eager=mode == "eager") for _ in range(args.runs)])
+
+    print(f"{'modo':<8}{'importação (ms)':>18}{'RSS (MB)':>12}{'módulos':>10}  dependências pesadas")
+    for mode, summary in results.items():
+        print(
+            f"{mode:<8}{summary['import_ms']:>18}{summary['rss_mb'] or '-':>12}{summary['modules']:>10}  "
+            f"{', '.join(summary['heavy_modules']) or '-'}"
+        )
+    eager, lazy = results["eager"], results["lazy"]
+    print(f"\nEconomia na inicialização: {eager['import_ms'] - lazy['import_ms']:.1f} ms", end="")
+    if eager["rss_mb"] and lazy["rss_mb"]:
+        print(f", {eager['rss_mb'] - lazy['rss_mb']:.1f} MB de RSS por worker", end="")
+    print("\n\nPrimeiro uso de cada extrator (ms):")
+    for name, value in lazy["first_use_ms"].items():
+        print(f"  {name:<6}{value:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
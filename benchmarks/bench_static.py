@@ -0,0 +1,149 @@
+"""
+Benchmark: bytes e requisições de uma visita à landing page, antes e depois do build de assets
+
+Simula um navegador (cache HTTP respeitando `Cache-Control`, `ETag` e
+`Last-Modified`) visitando `/` duas vezes, com `Accept-Encoding: gzip, br`:
+
+    anterior  `FileResponse` por página e `StaticFiles` em `/static`, como antes
+    atual     `StaticAssets` com o build de `python -m backend.build_assets`
+
+Informa, para a primeira visita e para a repetição, o número de requisições, as
+respostas 304 e os bytes transferidos no corpo, além da latência média de
+servir a página (`/`) dentro do processo.
+
+Uso:
+    python -m benchmarks.bench_static [--requests 2000] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, Tuple
+
+os.environ.setdefault("PERPLEXITY_API_KEY", "benchmark")
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+
+from backend import build_assets
+from backend.utils.static_assets import StaticAssets
+
+
+_REFERENCE = re.compile(r'(?:src|href)="(/static/[^"]+)"')
+
+
+def legacy_app() -> FastAPI:
+    """Aplicação com as rotas de páginas e o mount de `/static` anteriores"""
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory=build_assets.STATIC_DIR), name="static")
+
+    @app.get("/")
+    async def serve_landing():
+        landing_index = os.path.join(build_assets.STATIC_DIR, "landing", "index.html")
+        if os.path.exists(landing_index):
+            return FileResponse(landing_index)
+        return {"message": "Landing page não encontrada"}
+
+    return app
+
+
+def current_app(build_dir: str) -> FastAPI:
+    """Aplicação com as rotas atuais, servindo o build em `build_dir`"""
+    app = FastAPI()
+    assets = StaticAssets(build_assets.STATIC_DIR, build_dir, build_assets.PAGES, build_assets.BASE_DIR)
+    assets.load()
+
+    @app.api_route("/static/{asset_path:path}", methods=["GET", "HEAD"])
+    async def serve_static(asset_path: str, request: Request):
+        return assets.respond(request, await assets.aasset(f"/static/{asset_path}"))
+
+    @app.get("/")
+    async def serve_landing(request: Request):
+        return assets.respond(request, await assets.apage("/"))
+
+    return app
+
+
+class Browser:
+    """Cache HTTP mínimo: reutiliza respostas `immutable` e revalida as demais"""
+
+    def __init__(self, client: TestClient):
+        self.client = client
+        self.cache: Dict[str, Tuple[Dict[str, str], bytes]] = {}
+
+    def fetch(self, path: str, stats: Dict[str, int]) -> bytes:
+        cached = self.cache.get(path)
+        if cached and "immutable" in cached[0].get("cache-control", ""):
+            return cached[1]
+
+        headers = {"accept-encoding": "gzip, br"}
+        if cached:
+            if "etag" in cached[0]:
+                headers["if-none-match"] = cached[0]["etag"]
+            if "last-modified" in cached[0]:
+                headers["if-modified-since"] = cached[0]["last-modified"]
+        # Corpo como trafegado (sem descompressão) para medir os bytes na rede
+        with self.client.stream("GET", path, headers=headers) as response:
+            raw = b"".join(response.iter_raw())
+            stats["requests"] += 1
+            stats["bytes"] += len(raw)
+            if response.status_code == 304:
+                stats["not_modified"] += 1
+                return cached[1]
+            body = httpx.Response(200, headers=response.headers, content=raw).content
+            self.cache[path] = (dict(response.headers), body)
+            return body
+
+    def visit(self) -> Dict[str, int]:
+        stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+        page = self.fetch("/", stats).decode("utf-8")
+        for reference in dict.fromkeys(_REFERENCE.findall(page)):
+            self.fetch(reference, stats)
+        return stats
+
+
+def page_latency(client: TestClient, requests: int) -> float:
+    """Latência média (ms) de servir `/` com gzip aceito"""
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get("/", headers={"accept-encoding": "gzip, br"})
+    return (time.perf_counter() - started) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requisições para medir a latência da página")
+    parser.add_argument("--json", help="Arquivo para gravar os resultados")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as build_dir:
+        build_assets.build(build_dir)
+        for mode, app in (("anterior", legacy_app()), ("atual", current_app(build_dir))):
+            client = TestClient(app)
+            browser = Browser(client)
+            results[mode] = {
+                "first_visit": browser.visit(),
+                "repeat_visit": browser.visit(),
+                "page_ms": round(page_latency(client, args.requests), 3)
+            }
+
+    print(f"{'modo':<10}{'visita':<11}{'requisições':>12}{'304':>6}{'KB':>10}")
+    for mode, result in results.items():
+        for visit, label in (("first_visit", "primeira"), ("repeat_visit", "repetição")):
+            stats = result[visit]
+            print(f"{mode:<10}{label:<11}{stats['requests']:>12}{stats['not_modified']:>6}{stats['bytes'] / 1024:>10.1f}")
+    print("\nLatência da página (ms): " + ", ".join(f"{mode} {result['page_ms']}" for mode, result in results.items()))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
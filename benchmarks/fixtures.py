@@ -0,0 +1,112 @@
+"""
+Geração de documentos de teste (TXT, PDF e DOCX) para os benchmarks
+
+Os arquivos são gerados sob demanda a partir de um TCC sintético; os DOCX são
+montados com o python-docx. Cada variante recebe um
+identificador no texto, de modo que o cache e o agrupamento de requisições
+idênticas não mascarem o custo real de cada avaliação.
+"""
+import os
+import textwrap
+from typing import Dict, List
+from docx import Document
+
+from benchmarks.bench_map_reduce import build_thesis
+
+
+FIXTURE_TYPES = ("txt", "pdf", "docx")
+
+LINES_PER_PAGE = 48
+CHARS_PER_LINE = 95
+
+
+def thesis_text(target_chars: int, variant: int) -> str:
+    """TCC sintético com um identificador de variante no início"""
+    return f"Trabalho de Conclusão de Curso - exemplar {variant}\n\n" + build_thesis(target_chars)
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(text: str) -> bytes:
+    """
+    Monta um PDF mínimo (fonte Helvetica, WinAnsiEncoding) com o texto paginado
+
+    Cabeçalho e numeração de página são incluídos, como em documentos reais.
+    """
+    lines: List[str] = []
+    for paragraph in text.split("\n"):
+        lines.extend(textwrap.wrap(paragraph, CHARS_PER_LINE) or [""])
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+    ]
+    for number, page_lines in enumerate(pages, start=1):
+        content_lines = ["Universidade Federal - Trabalho de Conclusão de Curso"] + page_lines + [str(number)]
+        stream = "BT /F1 9 Tf 14 TL 50 800 Td " + " ".join(
+            f"({_pdf_escape(line)}) Tj T*" for line in content_lines
+        ) + " ET"
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * (number - 1)} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream.encode('latin-1', 'replace'))} >>\nstream\n{stream}\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for index, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{index} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    output += b"".join(f"{offset:010d} 00000 n \n".encode("ascii") for offset in offsets)
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(output)
+
+
+def write_fixture(directory: str, file_type: str, target_chars: int, variant: int) -> str:
+    """
+    Gera um documento de teste
+
+    Args:
+        directory: Diretório de destino
+        file_type: `txt`, `pdf` ou `docx`
+        target_chars: Tamanho aproximado do texto
+        variant: Identificador da variante
+
+    Returns:
+        str: Caminho do arquivo gerado
+    """
+    text = thesis_text(target_chars, variant)
+    path = os.path.join(directory, f"tcc_{variant:04d}.{file_type}")
+
+    if file_type == "txt":
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif file_type == "pdf":
+        with open(path, "wb") as f:
+            f.write(build_pdf(text))
+    elif file_type == "docx":
+        document = Document()
+        for paragraph in text.split("\n\n"):
+            document.add_paragraph(paragraph)
+        document.save(path)
+    else:
+        raise ValueError(f"Tipo de fixture não suportado: {file_type}")
+
+    return path
+
+
+def build_fixture_set(directory: str, file_types: List[str], count: int, target_chars: int) -> Dict[str, List[str]]:
+    """Gera `count` variantes de cada tipo de documento"""
+    os.makedirs(directory, exist_ok=True)
+    return {
+        file_type: [write_fixture(directory, file_type, target_chars, variant) for variant in range(count)]
+        for file_type in file_types
+    }
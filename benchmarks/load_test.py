@@ -0,0 +1,273 @@
+"""
+Teste de carga da API de avaliação contra o servidor simulado do Perplexity
+
+Sobe o servidor simulado (`benchmarks.mock_perplexity`) e a aplicação em
+processos separados, gera documentos de teste (TXT, PDF e DOCX) e dispara
+requisições a `/api/evaluation/text` e `/api/evaluation/file` em níveis de
+concorrência fixos. Para cada cenário informa vazão (req/s), latências p50, p95
+e p99, erros e o pico de memória (RSS) da aplicação, somando os processos de
+extração.
+
+O cache de avaliações é desativado e cada requisição usa um documento distinto,
+de modo que todas as avaliações percorram o caminho completo.
+
+Uso:
+    python -m benchmarks.load_test [--scenarios text,txt,pdf,docx] [--concurrency 1,4,16]
+        [--requests 40] [--doc-chars 30000] [--mock-latency lognormal:0.5,0.4] [--json resultado.json]
+
+    # contra uma aplicação já em execução (o servidor simulado não é iniciado)
+    python -m benchmarks.load_test --app-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fixtures import FIXTURE_TYPES, build_fixture_set, thesis_text
+
+
+MIME_TYPES = {
+    "txt": "text/plain",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+}
+
+
+def free_port() -> int:
+    """Obtém uma porta TCP livre"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, timeout: float = 30.0):
+    """Aguarda o servidor responder"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Servidor não respondeu em {timeout:g}s: {url}")
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Soma o RSS (bytes) de um processo e de seus descendentes (Linux, via /proc)"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            if current == pid:
+                return None
+    return total
+
+
+class RssSampler:
+    """Amostra periodicamente o RSS da aplicação e registra o pico"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak, rss)
+            self._stop.wait(self.interval)
+
+    def reset(self):
+        self.peak = 0
+
+    def start(self):
+        if self.pid is not None:
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil pelo método do posto mais próximo"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: str,
+    concurrency: int,
+    requests: int,
+    fixtures: Dict[str, List[str]],
+    doc_chars: int,
+    variant_offset: int
+) -> Dict[str, float]:
+    """Dispara `requests` requisições de um cenário com a concorrência indicada"""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_index = iter(range(requests))
+
+    async def send(index: int) -> httpx.Response:
+        if scenario == "text":
+            text = thesis_text(doc_chars, variant_offset + index)
+            return await client.post("/api/evaluation/text", json={"text": text, "force_refresh": True})
+        path = fixtures[scenario][index % len(fixtures[scenario])]
+        with open(path, "rb") as f:
+            content = f.read()
+        files = {"file": (os.path.basename(path), content, MIME_TYPES[scenario])}
+        return await client.post("/api/evaluation/file", files=files, params={"force_refresh": "true"})
+
+    async def worker():
+        for index in next_index:
+            started = time.perf_counter()
+            try:
+                response = await send(index)
+                key = str(response.status_code)
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(count for key, count in statuses.items() if key != "200"),
+        "statuses": statuses,
+        "rps": requests / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99)
+    }
+
+
+def start_servers(args) -> Tuple[str, subprocess.Popen, List[subprocess.Popen]]:
+    """Inicia o servidor simulado e a aplicação; retorna (URL da aplicação, processo da aplicação, processos)"""
+    mock_port, app_port = free_port(), free_port()
+    processes = []
+
+    mock = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.mock_perplexity",
+        "--port", str(mock_port),
+        "--latency", args.mock_latency,
+        "--error-rate", str(args.mock_error_rate),
+        "--malformed-rate", str(args.mock_malformed_rate)
+    ])
+    processes.append(mock)
+
+    env = dict(
+        os.environ,
+        PERPLEXITY_API_KEY="mock",
+        PERPLEXITY_API_URL=f"http://127.0.0.1:{mock_port}/chat/completions",
+        EVALUATION_CACHE_ENABLED="false"
+    )
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(app_port), "--log-level", "warning"],
+        env=env
+    )
+    processes.append(app)
+
+    wait_until_ready(f"http://127.0.0.1:{mock_port}/stats")
+    app_url = f"http://127.0.0.1:{app_port}"
+    wait_until_ready(f"{app_url}/api/evaluation/health")
+    return app_url, app, processes
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app-url", help="URL de uma aplicação já em execução")
+    parser.add_argument("--scenarios", default="text," + ",".join(FIXTURE_TYPES), help="Cenários: text, txt, pdf, docx")
+    parser.add_argument("--concurrency", default="1,4,16", help="Níveis de concorrência")
+    parser.add_argument("--requests", type=int, default=40, help="Requisições por cenário e nível")
+    parser.add_argument("--doc-chars", type=int, default=30000, help="Tamanho aproximado dos documentos")
+    parser.add_argument("--mock-latency", default="lognormal:0.5,0.4", help="Distribuição de latência do servidor simulado")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-malformed-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="Tempo limite por requisição")
+    parser.add_argument("--json", help="Arquivo para gravar os resultados (comparação entre versões)")
+    args = parser.parse_args()
+
+    scenarios = [value.strip() for value in args.scenarios.split(",") if value.strip()]
+    levels = [int(value) for value in args.concurrency.split(",") if value]
+
+    processes: List[subprocess.Popen] = []
+    app_process = None
+    if args.app_url:
+        app_url = args.app_url.rstrip("/")
+    else:
+        app_url, app_process, processes = start_servers(args)
+
+    sampler = RssSampler(app_process.pid if app_process else None)
+    sampler.start()
+    results = []
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="veritas-bench-") as directory:
+            file_types = [scenario for scenario in scenarios if scenario in FIXTURE_TYPES]
+            fixtures = build_fixture_set(directory, file_types, args.requests, args.doc_chars)
+
+            limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+            async with httpx.AsyncClient(base_url=app_url, timeout=args.timeout, limits=limits) as client:
+                print(f"{'cenário':<8} | {'conc.':>5} | {'req/s':>7} | {'p50 (s)':>8} | {'p95 (s)':>8} | {'p99 (s)':>8} | {'erros':>5} | {'pico RSS (MB)':>13}")
+                print("-" * 83)
+                variant_offset = 0
+                for scenario in scenarios:
+                    for concurrency in levels:
+                        sampler.reset()
+                        result = await run_scenario(
+                            client, scenario, concurrency, args.requests, fixtures, args.doc_chars, variant_offset
+                        )
+                        variant_offset += args.requests
+                        result["peak_rss_mb"] = round(sampler.peak / (1024 * 1024), 1) if sampler.peak else None
+                        results.append(result)
+                        rss = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] else "-"
+                        print(
+                            f"{scenario:<8} | {concurrency:>5} | {result['rps']:>7.2f} | {result['p50']:>8.3f} | "
+                            f"{result['p95']:>8.3f} | {result['p99']:>8.3f} | {result['errors']:>5} | {rss:>13}"
+                        )
+    finally:
+        sampler.stop()
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+        print(f"Resultados gravados em {args.json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
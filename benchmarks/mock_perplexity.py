@@ -0,0 +1,215 @@
+"""
+Servidor local que simula a API de chat completions do Perplexity
+
+Permite exercitar a aplicação sem chave de API nem custo: a latência segue uma
+distribuição configurável e falhas podem ser injetadas (erros HTTP, JSON
+malformado ou truncado). Suporta respostas em streaming (`"stream": true`),
+pedidos de continuação de respostas truncadas e informa o campo `usage`, como a
+API real.
+
+Uso:
+    python -m benchmarks.mock_perplexity --port 8765 --latency lognormal:1.5,0.4 --error-rate 0.02
+
+    # em outro terminal
+    PERPLEXITY_API_KEY=mock PERPLEXITY_API_URL=http://127.0.0.1:8765/chat/completions \\
+        python -m backend.main
+
+Distribuições de latência (segundos):
+    fixed:S            sempre S
+    uniform:A,B        uniforme entre A e B
+    lognormal:M,SIGMA  log-normal com mediana M (cauda longa, típica de LLMs)
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+from dataclasses import dataclass, field
+from typing import List, Tuple
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+EVALUATION_RESPONSE = {
+    "evaluator_1": {
+        "name": "Avaliador 1 - Metodologia",
+        "analysis": "Os objetivos estão claramente definidos e a metodologia descrita é adequada ao problema proposto. " * 3,
+        "score": 2.5
+    },
+    "evaluator_2": {
+        "name": "Avaliador 2 - Escrita Acadêmica e ABNT",
+        "analysis": "O texto é coeso e as citações seguem, em geral, a NBR 10520, com pequenas inconsistências nas referências. " * 3,
+        "score": 1.5
+    },
+    "evaluator_3": {
+        "name": "Avaliador 3 - Originalidade e Coerência Científica",
+        "analysis": "Não foram identificados indícios relevantes de plágio; as conclusões decorrem dos resultados apresentados. " * 3,
+        "score": 1.5
+    },
+    "final_verdict": {
+        "summary": "Trabalho consistente, com metodologia adequada e boa redação, que apresenta contribuição relevante para a área. " * 3,
+        "final_score": 8.0,
+        "recommendations": "Revisar a formatação das referências e aprofundar a discussão das limitações do estudo. " * 3
+    }
+}
+
+SECTION_RESPONSE = {
+    "methodology_notes": "Métodos descritos de forma objetiva nesta seção.",
+    "writing_notes": "Redação clara; citações conforme a ABNT.",
+    "originality_notes": "Sem trechos suspeitos (risco Baixo).",
+    "strengths": "Boa fundamentação.",
+    "weaknesses": "Poucos dados quantitativos."
+}
+
+
+@dataclass
+class MockConfig:
+    """Comportamento do servidor simulado"""
+    latency: str = "lognormal:1.5,0.4"
+    error_rate: float = 0.0
+    error_statuses: List[int] = field(default_factory=lambda: [429, 500, 503])
+    retry_after: float = 1.0
+    malformed_rate: float = 0.0
+    stream_chunk_chars: int = 24
+    seed: int = 0
+
+
+def parse_latency(spec: str) -> Tuple[str, List[float]]:
+    """Interpreta a especificação da distribuição de latência (ex.: `uniform:0.5,2`)"""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+    if kind not in expected or len(values) != expected[kind]:
+        raise ValueError(f"Distribuição de latência inválida: {spec}")
+    return kind, values
+
+
+def sample_latency(rng: random.Random, kind: str, params: List[float]) -> float:
+    """Sorteia uma latência da distribuição configurada"""
+    if kind == "fixed":
+        return params[0]
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1])
+    median, sigma = params
+    return rng.lognormvariate(math.log(median), sigma)
+
+
+def malform(content: str, rng: random.Random) -> Tuple[str, str]:
+    """Corrompe o JSON gerado de formas comuns em respostas de LLMs; retorna (conteúdo, finish_reason)"""
+    choice = rng.randrange(3)
+    if choice == 0:
+        return content[: len(content) * 2 // 3], "length"  # resposta truncada
+    if choice == 1:
+        return "Segue a avaliação solicitada:\n" + content + "\nEspero ter ajudado.", "stop"
+    return content.replace('",\n', '"\n', 1), "stop"  # vírgula ausente
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    """Cria a aplicação do servidor simulado"""
+    app = FastAPI(title="Perplexity mock")
+    rng = random.Random(config.seed)
+    kind, params = parse_latency(config.latency)
+    stats = {"requests": 0, "errors": 0, "malformed": 0, "continuations": 0, "streams": 0}
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        stats["requests"] += 1
+        prompt = payload["messages"][-1]["content"]
+        latency = sample_latency(rng, kind, params)
+
+        if rng.random() < config.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(min(latency, 0.05))
+            status = rng.choice(config.error_statuses)
+            headers = {"Retry-After": f"{config.retry_after:g}"} if status in (429, 503) else None
+            return JSONResponse({"error": {"message": "mock error", "code": status}}, status_code=status, headers=headers)
+
+        messages = payload["messages"]
+        first_prompt = next(message["content"] for message in messages if message["role"] == "user")
+        body = SECTION_RESPONSE if "## SEÇÃO:" in first_prompt else EVALUATION_RESPONSE
+        content = json.dumps(body, ensure_ascii=False, indent=2)
+        finish_reason = "stop"
+        if len(messages) >= 2 and messages[-2]["role"] == "assistant":
+            # Pedido de continuação de uma resposta truncada
+            stats["continuations"] += 1
+            partial = messages[-2]["content"]
+            if content.startswith(partial):
+                content = content[len(partial):]
+        elif rng.random() < config.malformed_rate:
+            stats["malformed"] += 1
+            content, finish_reason = malform(content, rng)
+
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4
+        }
+
+        if not payload.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": "mock",
+                "model": payload.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+                "usage": usage
+            }
+
+        stats["streams"] += 1
+        size = max(1, config.stream_chunk_chars)
+        pieces = [content[i:i + size] for i in range(0, len(content), size)]
+
+        async def events():
+            # Metade da latência até o primeiro fragmento, o restante distribuído na geração
+            await asyncio.sleep(latency / 2)
+            delay = latency / 2 / max(1, len(pieces))
+            for piece in pieces:
+                chunk = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(delay)
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.head("/")
+    async def head_root():
+        return None
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default=MockConfig.latency, help="Distribuição de latência (ver acima)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas com erro HTTP")
+    parser.add_argument("--error-statuses", default="429,500,503", help="Códigos de erro sorteados")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Valor de Retry-After em 429/503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fração de respostas com JSON malformado")
+    parser.add_argument("--stream-chunk-chars", type=int, default=24, help="Tamanho dos fragmentos em streaming")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_statuses=[int(value) for value in args.error_statuses.split(",") if value],
+        retry_after=args.retry_after,
+        malformed_rate=args.malformed_rate,
+        stream_chunk_chars=args.stream_chunk_chars,
+        seed=args.seed
+    )
+    parse_latency(config.latency)
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Servidor local compatível com Redis (subconjunto do protocolo RESP2)
+
+Substitui um Redis real em desenvolvimento e testes do estado compartilhado
+entre workers (`SHARED_STATE_BACKEND=redis`), sem instalar nada. Mantém os dados
+apenas em memória e implementa somente os comandos usados pela aplicação:
+PING, ECHO, AUTH, SELECT, GET, SET (EX/PX/NX/XX), DEL, EXISTS, DBSIZE, FLUSHDB e
+transações otimistas (WATCH, UNWATCH, MULTI, EXEC, DISCARD).
+
+Uso:
+    python -m benchmarks.mock_redis --port 6380
+
+    # em outro terminal
+    SHARED_STATE_BACKEND=redis SHARED_STATE_REDIS_URL=redis://127.0.0.1:6380/0 \\
+        python -m backend.serve --workers 4
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RespError(Exception):
+    """Erro devolvido ao cliente como resposta `-ERR`"""
+
+
+def encode(value: Any) -> bytes:
+    """Codifica uma resposta no formato RESP2"""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, bool):
+        return f":{int(value)}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, str):
+        return f"+{value}\r\n".encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    raise TypeError(f"Tipo sem codificação RESP: {type(value)}")
+
+
+class Database:
+    """Chaves de um banco lógico, com expiração e versão por chave (para o WATCH)"""
+
+    def __init__(self):
+        self.values: Dict[bytes, Tuple[bytes, float]] = {}
+        self.versions: Dict[bytes, int] = {}
+        self._clock = 0
+
+    def touch(self, key: bytes):
+        self._clock += 1
+        self.versions[key] = self._clock
+
+    def version(self, key: bytes) -> int:
+        self.get(key)
+        return self.versions.get(key, 0)
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at and expires_at <= time.time():
+            del self.values[key]
+            self.touch(key)
+            return None
+        return value
+
+    def set(self, key: bytes, value: bytes, expires_at: float = 0.0):
+        self.values[key] = (value, expires_at)
+        self.touch(key)
+
+    def delete(self, key: bytes) -> bool:
+        if self.get(key) is None:
+            return False
+        del self.values[key]
+        self.touch(key)
+        return True
+
+
+class MockRedis:
+    """Estado do servidor e execução dos comandos"""
+
+    def __init__(self, databases: int = 16, password: Optional[str] = None):
+        self.databases = [Database() for _ in range(databases)]
+        self.password = password.encode() if password else None
+        self.commands = 0
+
+    def execute(self, session: Dict[str, Any], args: List[bytes]) -> Any:
+        """Executa um comando fora de transação"""
+        name = args[0].upper().decode()
+        self.commands += 1
+
+        if self.password and not session["authenticated"] and name not in ("AUTH", "PING", "QUIT"):
+            return RespError("NOAUTH Authentication required.")
+        if session["multi"] is not None and name not in ("EXEC", "DISCARD", "MULTI", "WATCH"):
+            session["multi"].append(args)
+            return "QUEUED"
+
+        db = self.databases[session["db"]]
+        if name == "PING":
+            return args[1] if len(args) > 1 else "PONG"
+        if name == "ECHO":
+            return args[1]
+        if name == "QUIT":
+            return "OK"
+        if name == "AUTH":
+            if self.password is None or args[-1] == self.password:
+                session["authenticated"] = True
+                return "OK"
+            return RespError("WRONGPASS invalid username-password pair")
+        if name == "SELECT":
+            index = int(args[1])
+            if not 0 <= index < len(self.databases):
+                return RespError("ERR DB index is out of range")
+            session["db"] = index
+            return "OK"
+        if name == "WATCH":
+            if session["multi"] is not None:
+                return RespError("ERR WATCH inside MULTI is not allowed")
+            for key in args[1:]:
+                session["watched"].append((session["db"], key, db.version(key)))
+            return "OK"
+        if name == "UNWATCH":
+            session["watched"].clear()
+            return "OK"
+        if name == "MULTI":
+            if session["multi"] is not None:
+                return RespError("ERR MULTI calls can not be nested")
+            session["multi"] = []
+            return "OK"
+        if name == "DISCARD":
+            if session["multi"] is None:
+                return RespError("ERR DISCARD without MULTI")
+            session["multi"] = None
+            session["watched"].clear()
+            return "OK"
+        if name == "EXEC":
+            if session["multi"] is None:
+                return RespError("ERR EXEC without MULTI")
+            queued, session["multi"] = session["multi"], None
+            watched, session["watched"] = session["watched"], []
+            if any(self.databases[index].version(key) != version for index, key, version in watched):
+                return None
+            return [self._run(db, command) for command in queued]
+        return self._run(db, args)
+
+    def _run(self, db: Database, args: List[bytes]) -> Any:
+        """Executa um comando de dados"""
+        name = args[0].upper().decode()
+        try:
+            if name == "GET":
+                return db.get(args[1])
+            if name == "SET":
+                return self._set(db, args)
+            if name == "DEL":
+                return sum(db.delete(key) for key in args[1:])
+            if name == "EXISTS":
+                return sum(db.get(key) is not None for key in args[1:])
+            if name == "DBSIZE":
+                return sum(db.get(key) is not None for key in list(db.values))
+            if name == "FLUSHDB":
+                for key in list(db.values):
+                    db.delete(key)
+                return "OK"
+        except (IndexError, ValueError):
+            return RespError(f"ERR wrong arguments for '{name.lower()}' command")
+        return RespError(f"ERR unknown command '{name.lower()}'")
+
+    @staticmethod
+    def _set(db: Database, args: List[bytes]) -> Any:
+        key, value = args[1], args[2]
+        expires_at = 0.0
+        only_new = only_existing = False
+        options = [option.upper() for option in args[3:]]
+        i = 0
+        while i < len(options):
+            option = options[i]
+            if option in (b"EX", b"PX"):
+                amount = float(args[3 + i + 1])
+                expires_at = time.time() + (amount if option == b"EX" else amount / 1000)
+                i += 1
+            elif option == b"NX":
+                only_new = True
+            elif option == b"XX":
+                only_existing = True
+            else:
+                return RespError("ERR syntax error")
+            i += 1
+
+        exists = db.get(key) is not None
+        if (only_new and exists) or (only_existing and not exists):
+            return None
+        db.set(key, value, expires_at)
+        return "OK"
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    """Lê um comando (array RESP ou comando em linha); None ao fim da conexão"""
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        header = await reader.readline()
+        size = int(header[1:-2])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument("--password", default=None)
+    args = parser.parse_args()
+
+    server = MockRedis(password=args.password)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = {"db": 0, "authenticated": False, "multi": None, "watched": []}
+        try:
+            while True:
+                command = await read_command(reader)
+                if not command:
+                    break
+                writer.write(encode(server.execute(session, command)))
+                await writer.drain()
+                if command[0].upper() == b"QUIT":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve():
+        listener = await asyncio.start_server(handle, args.host, args.port)
+        print(f"Servidor compatível com Redis em redis://{args.host}:{args.port}/0")
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
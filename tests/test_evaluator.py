@@ -0,0 +1,112 @@
+"""
+Testes do agrupamento de avaliações idênticas simultâneas (backend/services/evaluator.py)
+"""
+import asyncio
+import json
+import pytest
+from benchmarks.mock_perplexity import EVALUATION_RESPONSE
+from backend.config import settings
+from backend.services.evaluator import EvaluatorService
+
+
+TEXT = "Texto do trabalho de conclusão de curso avaliado em requisições simultâneas. " * 20
+
+
+class FakeUpstream:
+    """Substitui as chamadas à API; as respostas só são liberadas com `release`"""
+
+    def __init__(self):
+        self.evaluate_calls = 0
+        self.stream_calls = 0
+        self.gate = asyncio.Event()
+
+    def release(self):
+        self.gate.set()
+
+    async def evaluate_text(self, text, originality=None):
+        self.evaluate_calls += 1
+        await self.gate.wait()
+        return json.loads(json.dumps(EVALUATION_RESPONSE))
+
+    async def stream_evaluation(self, text, originality=None):
+        self.stream_calls += 1
+        content = json.dumps(EVALUATION_RESPONSE, ensure_ascii=False)
+        middle = len(content) // 2
+        yield content[:middle]
+        await self.gate.wait()
+        yield content[middle:]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "evaluation_cache_enabled", False)
+    monkeypatch.setattr(settings, "revision_index_enabled", False)
+    monkeypatch.setattr(settings, "map_reduce_enabled", False)
+    return EvaluatorService()
+
+
+def install(service: EvaluatorService) -> FakeUpstream:
+    upstream = FakeUpstream()
+    service.perplexity_client.evaluate_text = upstream.evaluate_text
+    service.perplexity_client.stream_evaluation = upstream.stream_evaluation
+    return upstream
+
+
+async def collect(stream) -> list:
+    return [event async for event in stream]
+
+
+def test_identical_requests_share_one_upstream_call(service):
+    async def scenario():
+        upstream = install(service)
+        tasks = [asyncio.ensure_future(service.evaluate(TEXT)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        upstream.release()
+        return upstream, await asyncio.gather(*tasks)
+
+    upstream, results = asyncio.run(scenario())
+    assert upstream.evaluate_calls == 1
+    assert results[0] == results[1] == results[2]
+    assert results[0] is not results[1]
+    assert service.get_cache_stats()["coalesced"] == 2
+    assert service.get_cache_stats()["in_flight"] == 0
+
+
+def test_stream_is_coalesced_with_identical_requests(service):
+    async def scenario():
+        upstream = install(service)
+        first = asyncio.ensure_future(collect(service.evaluate_stream(TEXT)))
+        await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(collect(service.evaluate_stream(TEXT)))
+        regular = asyncio.ensure_future(service.evaluate(TEXT))
+        await asyncio.sleep(0.01)
+        upstream.release()
+        return upstream, await first, await second, await regular
+
+    upstream, first, second, regular = asyncio.run(scenario())
+    assert upstream.stream_calls == 1
+    assert upstream.evaluate_calls == 0
+    for events in (first, second):
+        assert [name for name, _ in events] == [*EvaluatorService.STREAM_SECTIONS, "result"]
+        assert events[-1][1].final_verdict == regular.final_verdict
+    assert service.get_cache_stats()["coalesced"] == 2
+
+
+def test_waiting_requests_evaluate_on_their_own_if_stream_is_abandoned(service):
+    async def scenario():
+        upstream = install(service)
+        stream = service.evaluate_stream(TEXT)
+        await stream.__anext__()
+        waiting = asyncio.ensure_future(service.evaluate(TEXT))
+        await asyncio.sleep(0.01)
+
+        # O cliente do streaming desconecta antes do fim da resposta
+        await stream.aclose()
+        upstream.release()
+        return upstream, await waiting
+
+    upstream, result = asyncio.run(scenario())
+    assert upstream.stream_calls == 1
+    assert upstream.evaluate_calls == 1
+    assert result.success
+    assert service.get_cache_stats()["in_flight"] == 0
@@ -0,0 +1,161 @@
+"""
+Testes da fila de avaliações assíncronas e dos armazenamentos de jobs (backend/services/jobs.py)
+"""
+import asyncio
+import time
+import uuid
+import pytest
+from backend.models import JobStatus
+from backend.services.jobs import (
+    ORPHANED_JOB_ERROR,
+    InMemoryJobStore,
+    JobManager,
+    SQLiteJobStore,
+    SharedStateJobStore
+)
+from backend.services.shared_state import SQLiteSharedState
+
+
+def new_job(owner: str = "worker-a", seq: int = 0) -> dict:
+    return {
+        "job_id": uuid.uuid4().hex,
+        "seq": seq or time.time_ns(),
+        "status": JobStatus.QUEUED.value,
+        "owner": owner,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "error": None,
+        "result": None
+    }
+
+
+@pytest.fixture(params=["sqlite", "shared"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    else:
+        store = SharedStateJobStore(SQLiteSharedState(str(tmp_path / "shared.db")), retention_seconds=60)
+    yield store
+    store.close()
+
+
+def test_create_get_update(store):
+    job = new_job()
+    store.create(job)
+
+    assert store.get(job["job_id"])["status"] == JobStatus.QUEUED.value
+    assert store.get("inexistente") is None
+
+    store.update(job["job_id"], status=JobStatus.RUNNING.value, started_at=1.0)
+    assert store.count_by_status(JobStatus.RUNNING) == 1
+
+    store.update(job["job_id"], status=JobStatus.COMPLETED.value, finished_at=2.0, result={"score": 8.5})
+    saved = store.get(job["job_id"])
+    assert saved["status"] == JobStatus.COMPLETED.value
+    assert saved["result"] == {"score": 8.5}
+    assert store.count_by_status(JobStatus.RUNNING) == 0
+
+
+def test_queue_position_follows_sequence(store):
+    jobs = [new_job(seq=seq) for seq in (10, 20, 30)]
+    for job in jobs:
+        store.create(job)
+
+    assert [store.queue_position(job["job_id"]) for job in jobs] == [1, 2, 3]
+
+    store.update(jobs[0]["job_id"], status=JobStatus.RUNNING.value)
+    assert store.queue_position(jobs[0]["job_id"]) is None
+    assert store.queue_position(jobs[2]["job_id"]) == 2
+    assert store.count_by_status(JobStatus.QUEUED) == 2
+
+
+def test_unfinished_jobs_of_dead_workers_are_failed(store):
+    alive, dead = new_job(owner="alive"), new_job(owner="dead")
+    finished = new_job(owner="dead")
+    for job in (alive, dead, finished):
+        store.create(job)
+    store.update(finished["job_id"], status=JobStatus.COMPLETED.value, finished_at=time.time())
+
+    store.heartbeat("alive", 30)
+    store.heartbeat("dead", 30)
+    store.heartbeat("dead", 0)
+
+    assert store.fail_unfinished(ORPHANED_JOB_ERROR) == 1
+    orphan = store.get(dead["job_id"])
+    assert orphan["status"] == JobStatus.FAILED.value
+    assert orphan["error"] == ORPHANED_JOB_ERROR
+    assert store.get(alive["job_id"])["status"] == JobStatus.QUEUED.value
+    assert store.get(finished["job_id"])["status"] == JobStatus.COMPLETED.value
+
+
+def test_sqlite_deletes_jobs_after_retention(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    old, recent = new_job(), new_job()
+    for job, finished_at in ((old, 100.0), (recent, 300.0)):
+        store.create(job)
+        store.update(job["job_id"], status=JobStatus.COMPLETED.value, finished_at=finished_at)
+
+    assert store.delete_finished_before(200.0) == 1
+    assert store.get(old["job_id"]) is None
+    assert store.get(recent["job_id"]) is not None
+
+
+class FakeEvaluation:
+    def __init__(self, score: float):
+        self.score = score
+
+    def model_dump(self, mode: str = "json") -> dict:
+        return {"score": self.score}
+
+
+def test_manager_runs_jobs_and_records_results():
+    async def scenario():
+        manager = JobManager(InMemoryJobStore(), workers=1, max_queue_size=10)
+        await manager.start()
+        cleaned = []
+
+        async def succeed():
+            return FakeEvaluation(9.0)
+
+        async def fail():
+            raise ValueError("texto inválido")
+
+        ok = await manager.submit(succeed, cleanup=lambda: cleaned.append("ok"))
+        bad = await manager.submit(fail)
+        assert ok["queue_position"] == 1
+        await manager._queue.join()
+
+        results = await manager.get(ok["job_id"]), await manager.get(bad["job_id"])
+        stats = await manager.get_stats()
+        await manager.stop()
+        return results, stats, cleaned
+
+    (ok, bad), stats, cleaned = asyncio.run(scenario())
+    assert ok["status"] == JobStatus.COMPLETED.value
+    assert ok["result"] == {"score": 9.0}
+    assert bad["status"] == JobStatus.FAILED.value
+    assert bad["error"] == "texto inválido"
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert cleaned == ["ok"]
+
+
+def test_manager_fails_queued_jobs_on_shutdown(tmp_path):
+    async def scenario():
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+        manager = JobManager(store, workers=1, max_queue_size=10)
+        await manager.start()
+        blocker = asyncio.Event()
+
+        async def wait_forever():
+            await blocker.wait()
+
+        running = await manager.submit(wait_forever)
+        queued = await manager.submit(wait_forever)
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        return store.get(running["job_id"]), store.get(queued["job_id"])
+
+    running, queued = asyncio.run(scenario())
+    assert running["status"] == JobStatus.FAILED.value
+    assert queued["status"] == JobStatus.FAILED.value
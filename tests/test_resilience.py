@@ -0,0 +1,185 @@
+"""
+Testes do circuit breaker e das chamadas protegidas à API (backend/services/resilience.py)
+"""
+import asyncio
+import httpx
+import pytest
+from backend.services import resilience
+from backend.services.resilience import CircuitBreaker, TokenBucket, UpstreamGuard, UpstreamUnavailableError
+
+
+RECOVERY_SECONDS = 0.02
+
+
+class FakeClock:
+    """Relógio monotônico controlado pelo teste"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeServer:
+    """API local simulada: responde com os status da fila, um por requisição"""
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.requests = 0
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        status = self.statuses.pop(0)
+        headers = {"retry-after": "0"} if status == 429 else {}
+        return httpx.Response(status, headers=headers, json={"status": status})
+
+    async def send(self) -> httpx.Response:
+        return await self.client.post("http://upstream.test/chat/completions")
+
+
+def make_guard(**kwargs) -> UpstreamGuard:
+    options = {
+        "max_retries": 0,
+        "breaker_failure_threshold": 1,
+        "breaker_recovery_seconds": RECOVERY_SECONDS
+    }
+    options.update(kwargs)
+    return UpstreamGuard(**options)
+
+
+async def open_breaker(guard: UpstreamGuard):
+    """Abre o circuito com um 500 e aguarda o tempo de recuperação"""
+    with pytest.raises(UpstreamUnavailableError):
+        await guard.send(FakeServer(500).send)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    await asyncio.sleep(RECOVERY_SECONDS * 2)
+    assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", fake)
+    return fake
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_seconds=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 1
+    assert not breaker.allow_request()
+    assert breaker.retry_after() == pytest.approx(30)
+
+
+def test_breaker_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_breaker_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    clock.now += 29
+    assert not breaker.allow_request()
+
+
+def test_breaker_disabled_never_opens(clock):
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow_request()
+
+
+def test_guard_retries_until_success():
+    async def scenario():
+        guard = make_guard(max_retries=2, breaker_failure_threshold=5, backoff_base_seconds=0.001)
+        server = FakeServer(503, 429, 200)
+        response = await guard.send(server.send)
+        return guard, server, response
+
+    guard, server, response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert server.requests == 3
+    assert guard.get_stats()["retries_by_reason"] == {"503": 1, "429": 1}
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limited_probe_releases_half_open_breaker():
+    async def scenario():
+        guard = make_guard()
+        await open_breaker(guard)
+
+        # O 429 da chamada de teste não é falha do servidor nem sucesso: apenas libera o teste
+        with pytest.raises(UpstreamUnavailableError):
+            await guard.send(FakeServer(429).send)
+        assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+
+        response = await guard.send(FakeServer(200).send)
+        return guard, response
+
+    guard, response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_probe_releases_half_open_breaker():
+    async def scenario():
+        guard = make_guard()
+        await open_breaker(guard)
+
+        # Cancelada durante a requisição (ex.: hedge perdedor)
+        started = asyncio.Event()
+
+        async def hanging_request():
+            started.set()
+            await asyncio.Event().wait()
+
+        task = asyncio.ensure_future(guard.send(hanging_request))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # Cancelada na espera do limite de taxa
+        guard.rate_limiter = TokenBucket(rate=1, capacity=1)
+        guard.rate_limiter.pause(60)
+        task = asyncio.ensure_future(guard.send(FakeServer(200).send))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        guard.rate_limiter = TokenBucket(rate=0, capacity=1)
+        response = await guard.send(FakeServer(200).send)
+        return guard, response
+
+    guard, response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+    assert guard.get_stats()["rejected_by_breaker"] == 0
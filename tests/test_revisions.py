@@ -0,0 +1,107 @@
+"""
+Testes do índice de versões revisadas (backend/services/revisions.py)
+"""
+import random
+import pytest
+from backend.services.revisions import RevisionIndex, document_sections
+
+
+WORDS = (
+    "análise método pesquisa dados resultado estudo teoria prática ensino aluno escola "
+    "processo gestão ambiente saúde política social cultura trabalho tecnologia rede"
+).split()
+
+SECTIONS = ("1 INTRODUÇÃO", "2 REFERENCIAL TEÓRICO", "3 METODOLOGIA", "4 RESULTADOS", "5 CONCLUSÃO")
+
+
+def paragraph(rng: random.Random, words: int = 120) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)) + "."
+
+
+def make_document(seed: int) -> dict:
+    rng = random.Random(seed)
+    return {title: "\n\n".join(paragraph(rng) for _ in range(3)) for title in SECTIONS}
+
+
+def render(document: dict) -> str:
+    return "\n\n".join(f"{title}\n\n{body}" for title, body in document.items())
+
+
+def register(index: RevisionIndex, document_id: str, text: str):
+    index.add(document_id, index.signature(text), document_sections(text), {"final_verdict": {"score": 8}})
+
+
+def test_document_sections_hash_content_per_section():
+    document = make_document(1)
+    sections = document_sections(render(document))
+    assert len(sections) == len(SECTIONS)
+
+    document["5 CONCLUSÃO"] = paragraph(random.Random(99))
+    revised = document_sections(render(document))
+    changed = [new.id for old, new in zip(sections, revised) if old.hash != new.hash]
+    assert changed == [sections[-1].id]
+
+
+def test_revised_version_matches_previous_document():
+    index = RevisionIndex(threshold=0.5)
+    original = make_document(1)
+    register(index, "original", render(original))
+    register(index, "outro", render(make_document(2)))
+
+    original["5 CONCLUSÃO"] = paragraph(random.Random(99))
+    revised = render(original)
+    match = index.find(index.signature(revised))
+
+    assert match is not None
+    assert match.document_id == "original"
+    assert match.similarity >= 0.5
+    assert set(match.record["sections"]) == {section.id for section in document_sections(revised)}
+    assert index.find(index.signature(render(make_document(3)))) is None
+
+
+def test_find_ignores_the_document_itself():
+    index = RevisionIndex()
+    text = render(make_document(1))
+    register(index, "documento", text)
+
+    assert index.find(index.signature(text)).similarity == pytest.approx(1.0)
+    assert index.find(index.signature(text), exclude="documento") is None
+
+
+def test_oldest_documents_are_evicted():
+    index = RevisionIndex(max_entries=2)
+    texts = {f"doc{seed}": render(make_document(seed)) for seed in range(3)}
+    for document_id, text in texts.items():
+        register(index, document_id, text)
+
+    assert index.get_stats()["documents"] == 2
+    assert index.find(index.signature(texts["doc0"])) is None
+    assert index.find(index.signature(texts["doc2"])).document_id == "doc2"
+
+
+def test_records_persist_and_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / "revisions.jsonl")
+    first, second = RevisionIndex(path=path), RevisionIndex(path=path)
+    text = render(make_document(1))
+    register(first, "documento", text)
+
+    # Outro worker lê os registros acrescentados ao arquivo na consulta seguinte
+    match = second.find(second.signature(text))
+    assert match is not None and match.document_id == "documento"
+    assert RevisionIndex(path=path).get_stats()["documents"] == 1
+
+
+def test_file_is_compacted_on_load(tmp_path):
+    path = tmp_path / "revisions.jsonl"
+    index = RevisionIndex(path=str(path), max_entries=3)
+    texts = [render(make_document(seed)) for seed in range(120)]
+    for seed, text in enumerate(texts):
+        register(index, f"doc{seed}", text)
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 120
+
+    reloaded = RevisionIndex(path=str(path), max_entries=3)
+
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+    assert reloaded.get_stats()["documents"] == 3
+    assert reloaded.find(reloaded.signature(texts[-1])).document_id == "doc119"
+    assert reloaded.find(reloaded.signature(texts[0])) is None
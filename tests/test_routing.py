@@ -0,0 +1,118 @@
+"""
+Testes do roteamento entre destinos da API com cobertura e troca de destino (backend/services/routing.py)
+"""
+import asyncio
+import pytest
+from backend.services.resilience import UpstreamGuard
+from backend.services.routing import TargetConfig, TargetRouter, UpstreamTarget
+
+
+class FakeTargets:
+    """Chamadas simuladas: cada destino responde após um atraso ou falha"""
+
+    def __init__(self, **behaviors):
+        self.behaviors = behaviors
+        self.calls = []
+        self.cancelled = []
+
+    async def call(self, target: UpstreamTarget) -> str:
+        self.calls.append(target.model)
+        delay, error = self.behaviors[target.model]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(target.model)
+            raise
+        if error is not None:
+            raise error
+        return target.model
+
+
+def make_router(*models: str, **kwargs) -> TargetRouter:
+    targets = [
+        UpstreamTarget(TargetConfig(f"http://{model}.test/chat/completions", model), UpstreamGuard())
+        for model in models
+    ]
+    options = {"hedge_default_delay_seconds": 0.05, "hedge_min_delay_seconds": 0.01}
+    options.update(kwargs)
+    return TargetRouter(targets, **options)
+
+
+def target(router: TargetRouter, model: str) -> UpstreamTarget:
+    return next(item for item in router.targets if item.model == model)
+
+
+def test_failed_target_fails_over_to_next():
+    router = make_router("a", "b", hedging_enabled=False)
+    fake = FakeTargets(a=(0, RuntimeError("erro 500")), b=(0, None))
+
+    assert asyncio.run(router.run(fake.call)) == "b"
+    assert fake.calls == ["a", "b"]
+    assert router.get_stats()["failovers"] == 1
+    assert target(router, "a").failures == 1
+    assert target(router, "a").latencies("default") == []
+    assert len(target(router, "b").latencies("default")) == 1
+
+    # O destino com falhas passa para o fim da ordem
+    assert [item.model for item in router.ranked("default")] == ["b", "a"]
+
+
+def test_first_error_is_raised_when_all_targets_fail():
+    router = make_router("a", "b")
+    fake = FakeTargets(a=(0, RuntimeError("primeiro")), b=(0, RuntimeError("segundo")))
+
+    with pytest.raises(RuntimeError, match="primeiro"):
+        asyncio.run(router.run(fake.call))
+    assert fake.calls == ["a", "b"]
+
+
+def test_slow_primary_is_hedged_and_loser_cancelled():
+    router = make_router("a", "b")
+    fake = FakeTargets(a=(5, None), b=(0, None))
+
+    assert asyncio.run(router.run(fake.call)) == "b"
+    assert fake.cancelled == ["a"]
+    stats = router.get_stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+    # A cobertura perdida registra o tempo decorrido como limite inferior da latência
+    (lower_bound,) = target(router, "a").latencies("default")
+    assert lower_bound >= 0.05
+
+
+def test_fast_primary_is_not_hedged():
+    router = make_router("a", "b")
+    fake = FakeTargets(a=(0, None), b=(0, None))
+
+    assert asyncio.run(router.run(fake.call)) == "a"
+    assert fake.calls == ["a"]
+    assert router.get_stats()["hedges"] == 0
+
+
+def test_cancelled_run_records_no_latency():
+    router = make_router("a", "b")
+    fake = FakeTargets(a=(5, None), b=(5, None))
+
+    async def scenario():
+        task = asyncio.ensure_future(router.run(fake.call))
+        await asyncio.sleep(0.1)
+        # Cliente desconectou com as duas requisições em andamento
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert sorted(fake.cancelled) == ["a", "b"]
+    assert target(router, "a").latencies("default") == []
+    assert target(router, "b").latencies("default") == []
+
+
+def test_hedge_delay_uses_recent_latency_percentile():
+    router = make_router("a", "b", hedge_min_samples=10, hedge_percentile=0.9)
+    primary = target(router, "a")
+    assert router.hedge_delay(primary, "default") == 0.05
+
+    for index in range(10):
+        primary.record_latency("default", 0.1 * (index + 1))
+    assert router.hedge_delay(primary, "default") == pytest.approx(1.0)
+    assert router.hedge_delay(primary, "outro") == 0.05
@@ -0,0 +1,160 @@
+"""
+Testes do estado compartilhado entre workers (backend/services/shared_state.py)
+
+O backend Redis é testado contra o servidor local de `benchmarks.mock_redis`.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from backend.services.shared_state import (
+    RedisSharedState,
+    SQLiteSharedState,
+    SharedStateConnectionError,
+    SharedStateError,
+    json_updater
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def redis_url():
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.mock_redis", "--port", str(port)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                pytest.skip("Servidor benchmarks.mock_redis indisponível")
+            time.sleep(0.05)
+    yield f"redis://127.0.0.1:{port}/0"
+    process.terminate()
+    process.wait(timeout=5)
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_state(request, tmp_path):
+    """Cria conexões independentes para o mesmo armazenamento (um por worker simulado)"""
+    states = []
+    if request.param == "sqlite":
+        path = str(tmp_path / "shared.db")
+        factory = lambda: SQLiteSharedState(path)
+    else:
+        url = request.getfixturevalue("redis_url")
+        prefix = f"test:{tmp_path.name}:"
+        factory = lambda: RedisSharedState(url, prefix)
+
+    def make():
+        state = factory()
+        states.append(state)
+        return state
+
+    yield make
+    for state in states:
+        state.close()
+
+
+def test_get_set_add_delete(make_state):
+    state = make_state()
+
+    assert state.get("chave") is None
+    state.set("chave", "a")
+    assert state.get("chave") == "a"
+    assert not state.add("chave", "b")
+    assert state.add("outra", "b")
+    state.delete("chave")
+    assert state.get("chave") is None
+
+
+def test_keys_expire(make_state):
+    state = make_state()
+    state.set("temporaria", "x", ttl_seconds=0.05)
+    assert state.get("temporaria") == "x"
+    time.sleep(0.1)
+    assert state.get("temporaria") is None
+    assert state.add("temporaria", "y")
+
+
+def test_update_is_atomic_between_workers(make_state):
+    workers = [make_state() for _ in range(4)]
+
+    def increment(counter):
+        counter["value"] = counter.get("value", 0) + 1
+        return counter, counter["value"]
+
+    def run(state):
+        for _ in range(25):
+            state.update("contador", json_updater(increment))
+
+    threads = [threading.Thread(target=run, args=(state,)) for state in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert json.loads(workers[0].get("contador")) == {"value": 100}
+
+
+def test_failed_updater_leaves_value_unchanged(make_state):
+    state = make_state()
+    state.set("chave", "original")
+
+    def broken(_):
+        raise ValueError("falha no updater")
+
+    with pytest.raises(ValueError):
+        state.update("chave", broken)
+    assert state.get("chave") == "original"
+    assert state.update("chave", lambda value: (None, value)) == "original"
+    assert state.get("chave") is None
+
+
+def test_redis_update_restarts_watch_cycle_after_disconnect(redis_url):
+    state = RedisSharedState(redis_url, "test:reconnect:")
+    state.set("n", "0")
+    calls = []
+
+    def increment(value):
+        calls.append(value)
+        if len(calls) == 1:
+            # Conexão cai após o WATCH/GET: MULTI/EXEC não podem ser reenviados sem o WATCH
+            state._conn._sock.shutdown(socket.SHUT_RDWR)
+        return str(int(value) + 1), int(value) + 1
+
+    assert state.update("n", increment) == 1
+    assert state.get("n") == "1"
+    assert calls == ["0", "0"]
+    assert state.get_stats()["update_reconnects"] == 1
+
+    def drop_always(value):
+        state._conn._sock.shutdown(socket.SHUT_RDWR)
+        return value, None
+
+    with pytest.raises(SharedStateConnectionError):
+        state.update("n", drop_always)
+    assert state.get("n") == "1"
+    state.close()
+
+
+def test_redis_unreachable_raises_shared_state_error():
+    state = RedisSharedState(f"redis://127.0.0.1:{free_port()}/0")
+    with pytest.raises(SharedStateError):
+        state.get("chave")
@@ -0,0 +1,99 @@
+"""
+Testes do índice de assets estáticos (backend/utils/static_assets.py)
+"""
+import asyncio
+import json
+import os
+import pytest
+from starlette.requests import Request
+from backend.utils.static_assets import MANIFEST_FILE, MANIFEST_VERSION, MEMORY_MAX_BYTES, StaticAssets, content_hash
+
+
+def write(path, data: bytes, mtime: float):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+    os.utime(path, (mtime, mtime))
+
+
+def get_request() -> Request:
+    return Request({"type": "http", "method": "GET", "headers": []})
+
+
+@pytest.fixture
+def site(tmp_path):
+    static_dir = tmp_path / "static"
+    write(str(static_dir / "landing" / "styles.css"), b"body { color: red; }", 1_000_000)
+    write(str(tmp_path / "index.html"), b"<h1>v1</h1>", 1_000_000)
+    assets = StaticAssets(str(static_dir), str(tmp_path / "build"), {"/": "index.html"}, str(tmp_path))
+    assets.load()
+    return assets, tmp_path
+
+
+def test_edited_source_files_are_reindexed(site):
+    assets, root = site
+    original = assets.asset("/static/landing/styles.css")
+    assert original.variants["identity"].content == b"body { color: red; }"
+    assert assets.asset("/static/landing/styles.css") is original
+
+    write(str(root / "static" / "landing" / "styles.css"), b"body { color: blue; }", 1_000_100)
+    write(str(root / "index.html"), b"<h1>v2</h1>", 1_000_100)
+
+    edited = assets.asset("/static/landing/styles.css")
+    assert edited.variants["identity"].content == b"body { color: blue; }"
+    assert edited.digest != original.digest and edited.mtime == 1_000_100
+    assert asyncio.run(assets.apage("/")).variants["identity"].content == b"<h1>v2</h1>"
+
+
+def test_large_source_file_is_served_with_current_stat(site):
+    assets, root = site
+    path = str(root / "static" / "video.bin")
+    write(path, b"a" * (MEMORY_MAX_BYTES + 1), 1_000_000)
+    assert assets.asset("/static/video.bin").variants["identity"].content is None
+
+    write(path, b"b" * (MEMORY_MAX_BYTES + 10), 1_000_100)
+    response = assets.respond(get_request(), assets.asset("/static/video.bin"))
+    assert response.headers["content-length"] == str(MEMORY_MAX_BYTES + 10)
+
+
+def test_created_and_removed_source_files(site):
+    assets, root = site
+    assert assets.asset("/static/novo.js") is None
+
+    write(str(root / "static" / "novo.js"), b"console.log(1)", 1_000_000)
+    assert asyncio.run(assets.aasset("/static/novo.js")).variants["identity"].content == b"console.log(1)"
+
+    os.remove(root / "static" / "novo.js")
+    os.remove(root / "index.html")
+    assert assets.asset("/static/novo.js") is None
+    assert assets.page("/") is None
+
+
+def test_paths_outside_static_dir_are_not_served(site):
+    assets, root = site
+    write(str(root / "secret.txt"), b"segredo", 1_000_000)
+    assert assets.asset("/static/../secret.txt") is None
+    assert assets.asset("/static/landing/\x00.css") is None
+
+
+def test_fingerprinted_build_assets_are_served_from_the_index(tmp_path):
+    build_dir = tmp_path / "build"
+    data = b"body { color: red; }"
+    digest = content_hash(data)
+    write(str(build_dir / f"styles.{digest}.css"), data, 1_000_000)
+    with open(build_dir / MANIFEST_FILE, "w", encoding="utf-8") as file:
+        json.dump({
+            "version": MANIFEST_VERSION,
+            "built_at": 2_000_000,
+            "assets": {"styles.css": {"file": f"styles.{digest}.css", "hash": digest}},
+            "pages": {}
+        }, file)
+    assets = StaticAssets(str(tmp_path / "static"), str(build_dir), {}, str(tmp_path))
+    assets.load()
+
+    asset = assets.asset(f"/static/styles.{digest}.css")
+    assert asset.cache_control.endswith("immutable")
+
+    # Sem consulta ao disco: o asset continua indexado mesmo sem o arquivo
+    os.remove(build_dir / f"styles.{digest}.css")
+    assert asyncio.run(assets.aasset(f"/static/styles.{digest}.css")) is asset
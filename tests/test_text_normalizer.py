@@ -0,0 +1,113 @@
+"""
+Testes da normalização do texto extraído (backend/services/text_normalizer.py)
+"""
+import pytest
+from backend.config import settings
+from backend.services.extractors import PAGE_BREAK
+from backend.services.text_normalizer import TextNormalizer
+
+
+# Tabela extraída de DOCX/TXT: valores, rótulos e fontes repetidos são conteúdo
+TABLE_TEXT = "\n".join([
+    "Tabela 1 - Resultados por grupo",
+    "Grupo", "Média", "Amostra", "Sim",
+    "A", "12,5", "Amostra", "Sim",
+    "B", "13,7", "Amostra", "Sim",
+    "C", "14,2", "Amostra", "Sim",
+    "Fonte: Autor (2023)",
+    "Tabela 2 - Resultados por turno",
+    "Manhã", "12,5", "13,7", "14,2",
+    "Fonte: Autor (2023)",
+    "Tabela 3 - Resultados por curso",
+    "Noite", "12,5", "13,7", "14,2",
+    "Fonte: Autor (2023)",
+    "2023",
+    "Os resultados indicam diferença entre os grupos avaliados na pesquisa."
+])
+
+HEADER = "Universidade Federal - Trabalho de Conclusão de Curso"
+
+
+def pdf_page(number: int, body: str) -> str:
+    """Página de PDF com cabeçalho, corpo e rodapé com numeração"""
+    return f"{HEADER}\n{body}\nVeritas.AI {number}\n{number}"
+
+
+def pdf_text(bodies) -> str:
+    """Texto de PDF no formato de `join_pages`"""
+    return f"\n{PAGE_BREAK}\n".join(pdf_page(number, body) for number, body in enumerate(bodies, start=1))
+
+
+@pytest.fixture(autouse=True)
+def default_settings(monkeypatch):
+    """Configuração padrão da normalização, independente do .env"""
+    monkeypatch.setattr(settings, "normalize_remove_repeated_lines", True)
+    monkeypatch.setattr(settings, "normalize_repeated_line_min_count", 3)
+    monkeypatch.setattr(settings, "normalize_remove_page_numbers", True)
+    monkeypatch.setattr(settings, "normalize_page_edge_lines", 2)
+    monkeypatch.setattr(settings, "normalize_join_hyphenation", True)
+    monkeypatch.setattr(settings, "normalize_collapse_whitespace", True)
+    monkeypatch.setattr(settings, "normalize_truncate_references", False)
+
+
+@pytest.mark.parametrize("file_type", ["DOCX", "TXT", "MD", "HTML"])
+def test_table_is_preserved_outside_pdf(file_type):
+    text, stats = TextNormalizer.normalize(TABLE_TEXT, file_type)
+
+    assert text.split("\n") == TABLE_TEXT.split("\n")
+    assert "normalization_repeated_lines_removed" not in stats
+    assert "normalization_page_numbers_removed" not in stats
+
+
+def test_table_inside_pdf_pages_is_preserved():
+    body = TABLE_TEXT.replace("\n2023\n", "\n")
+    bodies = [f"Seção {number}: continuação da análise na página.\n{body}" for number in range(1, 5)]
+    text, stats = TextNormalizer.normalize(pdf_text(bodies), "PDF")
+
+    assert text.count("Fonte: Autor (2023)") == 4 * 3
+    for cell in ("12,5", "13,7", "14,2", "Amostra", "Sim"):
+        assert text.count(f"\n{cell}\n") == body.count(f"\n{cell}\n") * 4
+    assert HEADER not in text
+    assert "Veritas.AI" not in text
+    assert stats["normalization_repeated_lines_removed"] == 4 * 2
+    assert stats["normalization_page_numbers_removed"] == 4
+
+
+def test_year_and_numbers_in_page_body_are_preserved():
+    body = "Introdução ao estudo\nAno de referência:\n2023\n42\nO estudo foi conduzido em três etapas sucessivas.\nConclusão parcial"
+    text, _ = TextNormalizer.normalize(pdf_text([body] * 3), "PDF")
+
+    # Remover cabeçalho e rodapé não traz o corpo (ano, tabela) para a borda da página
+    assert text.count("\n2023\n") == 3
+    assert text.count("\n42\n") == 3
+
+
+def test_header_with_different_numbers_is_not_merged():
+    pages = [f"Capítulo {chapter} - Resultados\ncorpo da página {chapter}" for chapter in (1, 2, 3)]
+    text, _ = TextNormalizer.normalize(f"\n{PAGE_BREAK}\n".join(pages), "PDF")
+
+    for chapter in (1, 2, 3):
+        assert f"Capítulo {chapter} - Resultados" in text
+
+
+def test_page_break_is_removed_from_pdf_text():
+    text, _ = TextNormalizer.normalize(pdf_text(["Primeira página.", "Segunda página."]), "PDF")
+
+    assert PAGE_BREAK not in text
+    assert "Veritas.AI 1\n\nUniversidade" in text
+
+
+def test_compound_word_keeps_hyphen():
+    text, stats = TextNormalizer.normalize("O programa promove o bem-\nestar dos estudantes.", "TXT")
+
+    assert "bem-estar" in text
+    assert "bemestar" not in text
+    assert stats["normalization_hyphenations_joined"] == 1
+
+
+def test_hyphenation_joined_when_word_is_confirmed():
+    source = "A avalia-\nção da banca considera a avaliação anterior e o guarda-\nchuva teórico."
+    text, _ = TextNormalizer.normalize(source, "PDF")
+
+    assert "A avaliação da banca" in text
+    assert "guarda-chuva" in text